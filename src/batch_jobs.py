@@ -0,0 +1,426 @@
+#!/usr/bin/env python
+
+"""
+Resumable batch tile download jobs
+
+A job downloads every tile of an area (lon/lat extent) over a zoom range. Its
+state is a small JSON checkpoint journal in queue_files/batch_jobs:
+
+- job id, tile URL, output store, extent, zoom range and download rate
+- per zoom: tile count, cursor and completed / skipped / failed counts
+
+Tiles of a zoom level are numbered in a fixed order (x major, then y) from
+integer tile-range math, so the cursor maps straight back to a tile. Every
+tile before the cursor is finished; tiles finished out of order after it
+(at most one download window) are listed in the checkpoint too. A resumed job
+starts at the cursor, with no tile listing, stat or download repeated.
+
+python batch_jobs.py create <tileurl> <output_dir> --extent min_lon min_lat max_lon max_lat --minzoom 0 --maxzoom 16
+python batch_jobs.py run [job_id]
+python batch_jobs.py list
+python batch_jobs.py estimate <output_dir> --extent min_lon min_lat max_lon max_lat --minzoom 0 --maxzoom 16
+"""
+
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+import datetime, json, math, os, threading, time, uuid
+from tile_fetch import REQUESTS_PER_SEC, WINDOW, FetchEngine
+from tile_store import open_tile_store
+
+# default upstream request budget of batch jobs (requests/sec)
+BATCH_REQUESTS_PER_SEC = 40.0
+# checkpoint journal directory of batch jobs
+JOB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'queue_files', 'batch_jobs')
+# seconds between checkpoints of a running job
+CHECKPOINT_SEC = 2.0
+# failed tiles listed in the journal (counts are kept for all of them)
+MAX_FAILED_TILES = 10000
+# Web Mercator latitude limit
+MAX_LATITUDE = 85.0511287798066
+# tile size assumed before any job has measured one
+DEFAULT_TILE_BYTES = 20 * 1024
+# most recent jobs whose measured throughput is averaged by estimates
+THROUGHPUT_JOBS = 5
+
+def lonlat_to_tile(lon: float, lat: float, zoom: int) -> tuple:
+    """
+    XYZ tile containing a coordinate
+
+    Parameters
+    ----------
+    lon : float
+        Longitude in degrees.
+    lat : float
+        Latitude in degrees (clamped to the Web Mercator limits).
+    zoom : int
+        Zoom level.
+
+    Returns
+    -------
+    tuple
+        (x, y) tile indices.
+
+    """
+    n = 1 << zoom
+    lat = min(max(lat, -MAX_LATITUDE), MAX_LATITUDE)
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+def get_tile_range(extent, zoom: int) -> tuple:
+    """
+    XYZ tile range covering an extent
+
+    Parameters
+    ----------
+    extent : list of length 4
+        [min_lon, min_lat, max_lon, max_lat].
+    zoom : int
+        Zoom level.
+
+    Returns
+    -------
+    tuple
+        (x_min, y_min, x_max, y_max) inclusive tile indices.
+
+    """
+    min_lon, min_lat, max_lon, max_lat = extent
+    x_min, y_min = lonlat_to_tile(min_lon, max_lat, zoom)
+    x_max, y_max = lonlat_to_tile(max_lon, min_lat, zoom)
+    return x_min, y_min, x_max, y_max
+
+def count_tiles(extent, zoom: int) -> int:
+    """Number of tiles covering an extent at a zoom level"""
+    x_min, y_min, x_max, y_max = get_tile_range(extent, zoom)
+    return (x_max - x_min + 1) * (y_max - y_min + 1)
+
+@dataclass
+class BatchJob:
+    """Batch download job and its checkpoint state"""
+    job_id: str
+    tileurl: str
+    output_dir: str
+    extent: list
+    minzoom: int
+    maxzoom: int
+    parallel: int = 4
+    requests_per_sec: float = BATCH_REQUESTS_PER_SEC
+    tms: bool = False
+    overwrite: bool = False
+    # 'queued', 'running', 'interrupted' or 'complete'
+    status: str = 'queued'
+    # per zoom level (str keys): total, cursor, done_ahead, completed, skipped, failed
+    zooms: dict = field(default_factory=dict)
+    failed_tiles: list = field(default_factory=list)
+    # measured throughput: time spent downloading and bytes downloaded
+    download_sec: float = 0.0
+    downloaded_bytes: int = 0
+    created: str = ''
+    updated: str = ''
+
+    @property
+    def num_tiles(self) -> int:
+        return sum(state['total'] for state in self.zooms.values())
+
+    @property
+    def num_finished(self) -> int:
+        return sum(state['cursor'] + len(state['done_ahead']) for state in self.zooms.values())
+
+def get_job_path(job_id: str, journal_dir: str = JOB_DIR) -> str:
+    return os.path.join(journal_dir, f'{job_id}.json')
+
+def save_job(job: BatchJob, journal_dir: str = JOB_DIR) -> None:
+    """Writes the job checkpoint (atomically: a crash never leaves a partial journal)"""
+    os.makedirs(journal_dir, exist_ok=True)
+    job.updated = datetime.datetime.now().isoformat(timespec='seconds')
+    job_path = get_job_path(job.job_id, journal_dir)
+    with open(job_path + '.tmp', mode='w') as file:
+        json.dump(asdict(job), file, default=sorted)
+    os.replace(job_path + '.tmp', job_path)
+
+def load_job(job_id: str, journal_dir: str = JOB_DIR) -> BatchJob:
+    with open(get_job_path(job_id, journal_dir), mode='r') as file:
+        return BatchJob(**json.load(file))
+
+def list_jobs(journal_dir: str = JOB_DIR) -> list:
+    """Jobs in the journal directory, oldest first"""
+    if not os.path.isdir(journal_dir): return []
+    jobs = [load_job(file_name[:-5], journal_dir) for file_name in os.listdir(journal_dir) if file_name.endswith('.json')]
+    return sorted(jobs, key=lambda job: (job.created, job.job_id))
+
+def get_unfinished_jobs(journal_dir: str = JOB_DIR) -> list:
+    return [job for job in list_jobs(journal_dir) if job.status != 'complete']
+
+def create_job(tileurl: str, output_dir: str, extent, minzoom: int, maxzoom: int, parallel: int = 4,
+               requests_per_sec: float = BATCH_REQUESTS_PER_SEC, tms: bool = False, overwrite: bool = False, journal_dir: str = JOB_DIR) -> BatchJob:
+    """
+    Creates and journals a queued batch download job
+
+    Parameters
+    ----------
+    tileurl : str
+        xyz-tile url in {z}/{x}/{y} template.
+    output_dir : str
+        Tile directory or MBTiles file.
+    extent : list of length 4
+        [min_lon, min_lat, max_lon, max_lat].
+    minzoom : int
+        Lowest zoom level.
+    maxzoom : int
+        Highest zoom level.
+    parallel : int, optional
+        Concurrent downloads. The default is 4.
+    requests_per_sec : float, optional
+        Upstream request budget. The default is BATCH_REQUESTS_PER_SEC.
+    tms : bool, optional
+        The tile URL uses TMS rows. The default is False.
+    overwrite : bool, optional
+        Download tiles that are already stored. The default is False.
+    journal_dir : str, optional
+        Checkpoint journal directory. The default is JOB_DIR.
+
+    Returns
+    -------
+    BatchJob
+        The new job.
+
+    """
+    now = datetime.datetime.now()
+    job = BatchJob(job_id=f"{now:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}", tileurl=tileurl, output_dir=output_dir,
+                   extent=[float(v) for v in extent], minzoom=int(minzoom), maxzoom=int(maxzoom), parallel=int(parallel),
+                   requests_per_sec=float(requests_per_sec), tms=tms, overwrite=overwrite,
+                   created=now.isoformat(timespec='seconds'))
+    for zoom in range(job.minzoom, job.maxzoom + 1):
+        job.zooms[str(zoom)] = {'total': count_tiles(job.extent, zoom), 'cursor': 0, 'done_ahead': [],
+                                'completed': 0, 'skipped': 0, 'failed': 0}
+    save_job(job, journal_dir)
+    return job
+
+def run_job(job: BatchJob, engine: FetchEngine = None, window: int = WINDOW, checkpoint_sec: float = CHECKPOINT_SEC, journal_dir: str = JOB_DIR) -> BatchJob:
+    """
+    Runs (or resumes) a batch job from its checkpoint
+
+    Parameters
+    ----------
+    job : BatchJob
+        Job to run.
+    engine : FetchEngine, optional
+        Fetch engine. The default is an engine with the job's rate and parallelism.
+    window : int, optional
+        Maximum tiles pending. The default is 1000.
+    checkpoint_sec : float, optional
+        Seconds between checkpoints. The default is 2.0.
+    journal_dir : str, optional
+        Checkpoint journal directory. The default is JOB_DIR.
+
+    Returns
+    -------
+    BatchJob
+        The job, 'complete' unless interrupted.
+
+    """
+    basepath = job.tileurl.split("/")[-1]  # ?foo=bar&z={z}.ext
+    segments = basepath.split(".")
+    ext = "." + segments[-1] if len(segments) > 1 else ".png"
+    store = open_tile_store(job.output_dir, ext)
+    own_engine = engine is None
+    if own_engine: engine = FetchEngine(requests_per_sec=job.requests_per_sec, per_host=job.parallel)
+    job.status = 'running'
+    save_job(job, journal_dir)
+    t1 = time.time(); num_finished_start = job.num_finished; num_tiles = job.num_tiles
+    download_sec_start = job.download_sec; downloaded_bytes_start = job.downloaded_bytes; engine_bytes_start = engine.bytes
+    # on_done runs on the engine's loop thread: job state changes and checkpoints hold the lock
+    lock = threading.Lock()
+
+    def measure():
+        job.download_sec = download_sec_start + time.time() - t1
+        job.downloaded_bytes = downloaded_bytes_start + engine.bytes - engine_bytes_start
+    try:
+        for zoom in range(job.minzoom, job.maxzoom + 1):
+            state = job.zooms[str(zoom)]
+            if state['cursor'] >= state['total']: continue
+            x_min, y_min, x_max, y_max = get_tile_range(job.extent, zoom)
+            height = y_max - y_min + 1
+            # finished tiles past the cursor (a set while running, a sorted list in the journal)
+            done_ahead = state['done_ahead'] = {i for i in state['done_ahead'] if i >= state['cursor']}
+            last_checkpoint = time.time()
+
+            def generate_indices(start=state['cursor'], total=state['total'], done_ahead=frozenset(done_ahead)):
+                for i in range(start, total):
+                    if i not in done_ahead: yield i
+
+            def make_request(i, zoom=zoom, x_min=x_min, y_min=y_min, height=height):
+                x = x_min + i // height; y = y_min + i % height
+                if not job.overwrite and store.has_tile(zoom, x, y): return None
+                url_y = (1 << zoom) - 1 - y if job.tms else y
+                url = job.tileurl.replace(r"{x}", str(x)).replace(r"{y}", str(url_y)).replace(r"{z}", str(zoom))
+                return url, lambda data: store.put_tile(zoom, x, y, data)
+
+            def on_done(i, error, zoom=zoom, state=state, done_ahead=done_ahead, x_min=x_min, y_min=y_min, height=height):
+                nonlocal last_checkpoint
+                with lock:
+                    if error is None: state['completed'] += 1
+                    elif error == 'skipped': state['skipped'] += 1
+                    else:
+                        state['failed'] += 1
+                        if len(job.failed_tiles) < MAX_FAILED_TILES: job.failed_tiles.append([zoom, x_min + i // height, y_min + i % height])
+                    # advance the cursor over every contiguous finished tile
+                    done_ahead.add(i)
+                    while state['cursor'] in done_ahead:
+                        done_ahead.discard(state['cursor']); state['cursor'] += 1
+                    now = time.time()
+                    if now - last_checkpoint < checkpoint_sec: return
+                    last_checkpoint = now
+                    measure()
+                    save_job(job, journal_dir)
+                    num_done = job.num_finished - num_finished_start
+                    rate = num_done / max(now - t1, 1e-9)
+                    eta = f"{(num_tiles - job.num_finished) / rate:,.0f} sec" if rate > 0 else "N/A"
+                    print(f"\rJob {job.job_id} zoom {zoom}: {job.num_finished:,} / {num_tiles:,} tiles ({rate:,.1f} tiles/sec, ETA {eta})", end='', flush=True)
+
+            engine.run(generate_indices(), make_request, window=window, on_done=on_done)
+            with lock:
+                measure()
+                save_job(job, journal_dir)
+        job.status = 'complete'
+    finally:
+        # stop the engine before the last checkpoint, so no tile finishes after it
+        if own_engine: engine.close()
+        with lock:
+            # interrupted jobs keep their last cursor and resume from it
+            if job.status != 'complete': job.status = 'interrupted'
+            measure()
+            save_job(job, journal_dir)
+        store.close()
+        print()
+    failed = sum(state['failed'] for state in job.zooms.values())
+    print(f"Job {job.job_id} {job.status}: {job.num_finished:,} / {num_tiles:,} tiles, {failed:,} failed")
+    return job
+
+def get_throughput(journal_dir: str = JOB_DIR, num_jobs: int = THROUGHPUT_JOBS) -> tuple:
+    """
+    Download throughput measured by the most recent batch jobs
+
+    Journals are only parsed again after one of them was written.
+
+    Returns
+    -------
+    tuple
+        (tiles/sec, bytes/tile), or (None, None) before any job has downloaded tiles.
+
+    """
+    try:
+        journals = tuple(sorted((entry.name, entry.stat().st_mtime_ns, entry.stat().st_size) for entry in os.scandir(journal_dir) if entry.name.endswith('.json')))
+    except FileNotFoundError:
+        journals = ()
+    return get_journal_throughput(journal_dir, num_jobs, journals)
+
+@lru_cache(maxsize=4)
+def get_journal_throughput(journal_dir: str, num_jobs: int, journals: tuple) -> tuple:
+    """
+    Cached get_throughput for a snapshot of the journal names, modification times and sizes
+    """
+    jobs = [job for job in list_jobs(journal_dir) if job.download_sec > 0 and job.downloaded_bytes > 0][-num_jobs:]
+    num_downloaded = sum(state['completed'] for job in jobs for state in job.zooms.values())
+    if num_downloaded == 0: return None, None
+    return num_downloaded / sum(job.download_sec for job in jobs), sum(job.downloaded_bytes for job in jobs) / num_downloaded
+
+def estimate_download(output_dir: str, extent, minzoom: int, maxzoom: int, ext: str = '.png',
+                      requests_per_sec: float = None, journal_dir: str = JOB_DIR) -> dict:
+    """
+    Estimates the tiles, bytes and time a batch download still needs
+
+    Tile counts come from integer tile-range math, and missing tiles from a
+    range count on the local tile store (one listing per tile column, or one
+    index query for MBTiles), so no tile is enumerated or stat'ed.
+
+    Parameters
+    ----------
+    output_dir : str
+        Tile directory or MBTiles file.
+    extent : list of length 4
+        [min_lon, min_lat, max_lon, max_lat].
+    minzoom : int
+        Lowest zoom level.
+    maxzoom : int
+        Highest zoom level.
+    ext : str, optional
+        Tile file extension of directory stores. The default is '.png'.
+    requests_per_sec : float, optional
+        Request budget of the download; caps the measured rate. The default is None.
+    journal_dir : str, optional
+        Checkpoint journal directory of the jobs measuring throughput. The default is JOB_DIR.
+
+    Returns
+    -------
+    dict
+        'zooms' (total and missing tiles by zoom level), 'tiles', 'missing',
+        'bytes', 'tiles_per_sec', 'eta_sec' and 'measured' (False if the rate
+        and tile size are defaults rather than measured).
+
+    """
+    store = open_tile_store(output_dir, ext)
+    zooms = {}
+    try:
+        for zoom in range(int(minzoom), int(maxzoom) + 1):
+            x_min, y_min, x_max, y_max = get_tile_range(extent, zoom)
+            total = (x_max - x_min + 1) * (y_max - y_min + 1)
+            zooms[zoom] = {'total': total, 'missing': total - store.count_stored(zoom, x_min, y_min, x_max, y_max)}
+    finally:
+        store.close()
+    tiles_per_sec, tile_bytes = get_throughput(journal_dir)
+    measured = tiles_per_sec is not None
+    if not measured: tiles_per_sec, tile_bytes = requests_per_sec or REQUESTS_PER_SEC, DEFAULT_TILE_BYTES
+    elif requests_per_sec: tiles_per_sec = min(tiles_per_sec, requests_per_sec)
+    missing = sum(counts['missing'] for counts in zooms.values())
+    return {'zooms': zooms,
+            'tiles': sum(counts['total'] for counts in zooms.values()),
+            'missing': missing,
+            'bytes': int(missing * tile_bytes),
+            'tiles_per_sec': tiles_per_sec,
+            'eta_sec': missing / tiles_per_sec,
+            'measured': measured}
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="resumable batch tile downloads")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    create_parser = subparsers.add_parser("create", help="queue a new job")
+    create_parser.add_argument("tileurl", help=r"xyz-tile url in {z}/{x}/{y} template")
+    create_parser.add_argument("output_dir", help="output dir, or .mbtiles file")
+    create_parser.add_argument("--extent", required=True, nargs=4, type=float, help="min_lon min_lat max_lon max_lat, whitespace delimited")
+    create_parser.add_argument("--minzoom", default=0, type=int, help="default to 0")
+    create_parser.add_argument("--maxzoom", default=16, type=int, help="default to 16")
+    create_parser.add_argument("--parallel", default=4, type=int, help="num of parallel requests, default to 4")
+    create_parser.add_argument("--rate", default=BATCH_REQUESTS_PER_SEC, type=float, help=f"max requests per second, default to {BATCH_REQUESTS_PER_SEC:g}")
+    create_parser.add_argument("--tms", help="if set, parse z/x/y as TMS", action="store_true")
+    create_parser.add_argument("--overwrite", help="overwrite existing files", action="store_true")
+    run_parser = subparsers.add_parser("run", help="run (or resume) one job, or every unfinished job")
+    run_parser.add_argument("job_id", nargs="?", default=None)
+    subparsers.add_parser("list", help="list jobs")
+    estimate_parser = subparsers.add_parser("estimate", help="estimate the tiles, bytes and time of a download")
+    estimate_parser.add_argument("output_dir", help="output dir, or .mbtiles file")
+    estimate_parser.add_argument("--extent", required=True, nargs=4, type=float, help="min_lon min_lat max_lon max_lat, whitespace delimited")
+    estimate_parser.add_argument("--minzoom", default=0, type=int, help="default to 0")
+    estimate_parser.add_argument("--maxzoom", default=16, type=int, help="default to 16")
+    estimate_parser.add_argument("--rate", default=None, type=float, help="max requests per second")
+    args = parser.parse_args()
+    if args.command == "create":
+        job = create_job(args.tileurl, args.output_dir, args.extent, args.minzoom, args.maxzoom, parallel=args.parallel,
+                         requests_per_sec=args.rate, tms=args.tms, overwrite=args.overwrite)
+        print(f"Job {job.job_id} queued: {job.num_tiles:,} tiles")
+    elif args.command == "run":
+        for job in ([load_job(args.job_id)] if args.job_id else get_unfinished_jobs()):
+            run_job(job)
+    elif args.command == "estimate":
+        estimate = estimate_download(args.output_dir, args.extent, args.minzoom, args.maxzoom, requests_per_sec=args.rate)
+        for zoom, counts in estimate['zooms'].items():
+            print(f"zoom {zoom}: {counts['missing']:,} / {counts['total']:,} tiles missing")
+        print(f"{estimate['missing']:,} tiles, {estimate['bytes'] / 1024 / 1024:,.1f} MB, "
+              f"{estimate['eta_sec']:,.0f} sec at {estimate['tiles_per_sec']:,.1f} tiles/sec ({'measured' if estimate['measured'] else 'default rate'})")
+    else:
+        for job in list_jobs():
+            print(f"{job.job_id}  {job.status:<11}  zoom {job.minzoom}-{job.maxzoom}  {job.num_finished:,} / {job.num_tiles:,} tiles")
+
+if __name__ == "__main__":
+    main()
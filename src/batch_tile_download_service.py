@@ -1,4 +1,5 @@
 import datetime, logging, os, subprocess, time
+from batch_jobs import get_unfinished_jobs, run_job
 from utilities import check_internet_connection, read_csv, write_csv
 
 def delete_small_files_and_empty_dirs(directory, size_limit_kb, dry_run=False):
@@ -70,6 +71,13 @@ if __name__ == "__main__":
         if not check_internet_connection():
             time.sleep(5)
             if not check_internet_connection(): print('No public internet connection... terminating service'); break
+        # resumable batch jobs continue from their last checkpoint
+        for job in get_unfinished_jobs():
+            print(f'Running batch job {job.job_id} (zoom {job.minzoom}-{job.maxzoom}, {job.num_finished:,} / {job.num_tiles:,} tiles done)')
+            try:
+                run_job(job)
+            except Exception as e:
+                print(f'Error running batch job {job.job_id}: {e}',end='\n')
         if len(cmd_queue) > 0:
             for cmd in cmd_queue:
                 command = cmd[0]
@@ -1,26 +1,33 @@
-import datetime, os, time, ssl
-from utilities import check_internet_connection, read_csv, write_csv
+import datetime, os, sys, time
+from tile_fetch import get_fetch_engine
+from tile_queue import get_tile_queue
+from tile_store import get_tile_store
+from utilities import check_internet_connection
 
-def download_tile(tile,
-             output_dir="\\".join(os.path.dirname(os.path.abspath(__file__)).split('\\')[:-1])+'/map_tiles/ESRI/',
-             tileurl='https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}.png',
-             bool_overwrite=False,
-             timeout_num=5,
-             interval_num=100):
-    import os, time, urllib, urllib.request
+# upstream request budget of the service (requests/sec, bytes/sec)
+REQUESTS_PER_SEC = 10
+BYTES_PER_SEC = None
+# default tile store (tiles queued without a store location are downloaded here)
+TILE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'map_tiles', 'ESRI')
+# imagery tile server
+TILE_URL = 'https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}.png'
+
+def get_tile_request(tile,
+             output_dir=TILE_DIR,
+             tileurl=TILE_URL,
+             bool_overwrite=False):
     basepath = tileurl.split("/")[-1]  # ?foo=bar&z={z}.ext
     segments = basepath.split(".")
     ext = "." + segments[-1] if len(segments) > 1 else ".png"
     val_z = str(tile["Z"])
     val_y = str(tile["Y"])
     val_x = str(tile['X'])
-    # for tkintermapview, tile segment order is Z, X, Y !!! (must save in z/x/y.png format)
-    write_dir = os.path.join(output_dir, val_z, val_x)
-    write_filepath = os.path.join(write_dir, val_y) + ext
+    # tile directory (saved in z/x/y.png format) or MBTiles file
+    store = get_tile_store(output_dir, ext)
 
-    if os.path.exists(write_filepath) and not bool_overwrite:
+    if not bool_overwrite and store.has_tile(val_z, val_x, val_y):
         # skip if already exists when not-overwrite mode
-        return
+        return None
     
     url = (
         tileurl
@@ -28,82 +35,92 @@ def download_tile(tile,
         .replace(r"{y}", val_y)
         .replace(r"{z}", val_z)
     )
-    
-    data = None
-    while True:
-        try:
-            ctx = ssl.create_default_context()
-            ctx.check_hostname = False
-            ctx.verify_mode = ssl.CERT_NONE
-            data = urllib.request.urlopen(url, timeout=timeout_num, context=ctx)
-            # data = requests.get(url, verify=False)
-            break
-        except urllib.error.HTTPError as e:
-            raise Exception(str(e) + ":" + url)
-        except Exception as e:
-            if (
-                str(e.args)
-                == "(timeout('_ssl.c:1091: The handshake operation timed out'),)"
-            ):
-                print("timeout, retrying... :" + url)
-            else:
-                raise Exception(str(e) + ":" + url)
-    if data is not None:
-        # print(f'Downloading {tile[2]}/{tile[0]}/{tile[1]}.png')
-        os.makedirs(write_dir, exist_ok=True)
-        with open(write_filepath, mode="wb") as f:
-            f.write(data.read())
-        time.sleep(interval_num / 1000)
+    # for tkintermapview, tile segment order is Z, X, Y !!!
+    return url, lambda data: store.put_tile(val_z, val_x, val_y, data)
+
+def download_tile(tile,
+             output_dir=TILE_DIR,
+             tileurl=TILE_URL,
+             bool_overwrite=False,
+             timeout_num=5,
+             engine=None):
+    request = get_tile_request(tile, output_dir, tileurl, bool_overwrite)
+    if request is None: return
+    url, write_tile = request
+    # shared rate-limited fetch engine (certificates are not verified)
+    if engine is None: engine = get_fetch_engine(REQUESTS_PER_SEC, BYTES_PER_SEC, verify=False)
+    try:
+        # timeouts and dropped keep-alive connections are retried by the client
+        engine.submit(url, write_tile, timeout=timeout_num).result()
+    except Exception as e:
+        raise Exception(str(e) + ":" + url)
+
+def main(output_dir=TILE_DIR, batch_size=100):
+    """
+    Downloads the tiles of the missing tile queue until the service is stopped
+
+    Parameters
+    ----------
+    output_dir : str, optional
+        Tile directory or MBTiles file for tiles queued without a store
+        location. Tiles queued by the map server are downloaded into the
+        store of the layer that queued them. The default is TILE_DIR.
+    batch_size : int, optional
+        Tiles fetched per store and batch. The default is 100.
 
-def main():
-    queue_file_name = os.path.dirname(os.path.abspath(__file__))+"\\queue_files\\dynamic_tile_queue.csv"
-    if not os.path.isfile(queue_file_name): 
-        with open(queue_file_name, mode='w', newline='') as file:
-            print("Creating batch queue file...\n") 
+    """
+    tile_queue = get_tile_queue()
+    engine = get_fetch_engine(REQUESTS_PER_SEC, BYTES_PER_SEC, verify=False)
+    # carry over tiles left in the legacy csv queue
+    num_imported = tile_queue.import_csv()
+    if num_imported > 0: print(f'Imported {num_imported:,} tiles from the csv queue file\n')
     wait_interval_sec = 10
     time.sleep(2)
     try:
         while True:
-            downloaded_tile_list = []
             t1 = datetime.datetime.today()
             try:
-                tile_queue = read_csv(queue_file_name)
+                # one batch per tile store with queued tiles
+                store_batches = [(store, tile_queue.get_batch(batch_size, store)) for store in tile_queue.stores()]
             except Exception as e:
-                print(f'Error reading batch queue file: {e}',end='\n')
+                print(f'Error reading dynamic queue: {e}',end='\n')
                 time.sleep(5)
                 continue
             if not check_internet_connection():
                 time.sleep(5)
                 if not check_internet_connection(): print('No public internet connection... terminating service'); break
-            if len(tile_queue) > 0:
-                print(tile_queue)
-                for tile in tile_queue:
-                    download_tile(tile)
-                    print(f"Tile {tile} downloaded")
-                    downloaded_tile_list.append(tile)
-                tile_queue = read_csv(queue_file_name)
-                tile_queue_updated = []
-                for tile in tile_queue:
-                    if tile in downloaded_tile_list:
-                        continue
-                    else:
-                        tile_queue_updated.append(tile)
-                write_csv(queue_file_name,tile_queue_updated)
+            if any(len(tile_batch) > 0 for _, tile_batch in store_batches):
+                for store, tile_batch in store_batches:
+                    def tile_done(tile, error, store=store):
+                        zxy = (tile["Z"], tile["X"], tile["Y"])
+                        if error is not None and error != 'skipped':
+                            print(f"Tile {tile} failed: {error}")
+                            tile_queue.fail([zxy], store)
+                            return
+                        tile_queue.done([zxy], store)
+                        if error is None: print(f"Tile {tile} downloaded")
+                    # download into the store the tiles were queued for
+                    location = store or output_dir
+                    # the whole batch is fetched concurrently within the engine's rate limits
+                    engine.run(({"Z":z,"Y":y,"X":x} for z, x, y in tile_batch), lambda tile: get_tile_request(tile, location), on_done=tile_done)
+                # keep draining a full queue without waiting
+                if any(len(tile_batch) == batch_size for _, tile_batch in store_batches): continue
             else:
                 print('Dynamic download queue is empty.\n')
             t2 = datetime.datetime.today()
-            t_delta = t1 - t2
+            t_delta = t2 - t1
             if t_delta.total_seconds() < wait_interval_sec:
                 print(f'Waiting: {wait_interval_sec - t_delta.total_seconds():,.2f} seconds...',end='\n')
                 time.sleep(min(wait_interval_sec - t_delta.total_seconds(),10))
             else:
                 time.sleep(1)
     except:
-        main()
+        main(output_dir, batch_size)
 
 if __name__ == "__main__":
     print('Starting Dynamic Tile Download Service:\n')
-    main()
+    # optional default tile store: python dynamic_tile_download_service.py ../map_tiles/ESRI.mbtiles
+    main(sys.argv[1] if len(sys.argv) > 1 else TILE_DIR)
 
 time.sleep(5)
 
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+
+import numpy as np
+from local_frame import get_frame_for_coords
+
+def confidence_scale(confidence: float) -> float:
+    """
+    Scale factor from 1-sigma to a 2D confidence ellipse
+
+    Parameters
+    ----------
+    confidence : float
+        Probability contained by the ellipse (0-1).
+
+    Returns
+    -------
+    float
+        Multiplier applied to the 1-sigma semi-axes.
+
+    """
+    return float(np.sqrt(-2 * np.log(1 - confidence)))
+
+def solve_fix(sensor_coords, azimuths, sigmas, iterations=5, confidence=0.95, initial_coord=None) -> (dict,None):
+    """
+    Weighted least-squares (Stansfield) emitter fix from N bearings
+
+    Each bearing contributes the perpendicular miss distance of the fix from its
+    LOB, weighted by 1/(sigma*range)^2. The weights are refined from the current
+    fix over a fixed number of iterations, so the Python overhead does not depend
+    on the number of bearings (repeated bearings from one sensor are simply rows).
+
+    Parameters
+    ----------
+    sensor_coords : array-like of shape (N,2)
+        Sensor coordinates in [lat,lon] format.
+    azimuths : array-like of shape (N,)
+        Measured bearings in degrees.
+    sigmas : float or array-like of shape (N,)
+        Bearing standard deviation in degrees.
+    iterations : int, optional
+        Number of range re-weighting iterations (at least 1). The default is 5.
+    confidence : float, optional
+        Probability contained by the error ellipse. The default is 0.95.
+    initial_coord : list, optional
+        Starting estimate in [lat,lon] format. The default is the unweighted solution.
+
+    Returns
+    -------
+    dict or None
+        'coord' : fix in [lat,lon] format
+        'covariance_m2' : 2x2 east/north covariance in square meters
+        'ellipse' : semi-major/semi-minor axes (m) and orientation (degrees from north) at the confidence level
+        'residuals_deg' : bearing residual of each LOB in degrees
+        'ahead' : whether the fix is in front of each sensor
+        None if fewer than two non-parallel bearings are supplied.
+
+    """
+    sensor_coords = np.atleast_2d(np.asarray(sensor_coords, dtype=float))
+    azimuths = np.asarray(azimuths, dtype=float).ravel()
+    sigmas = np.broadcast_to(np.radians(np.asarray(sigmas, dtype=float)), azimuths.shape)
+    if len(azimuths) < 2: return None
+    frame = get_frame_for_coords(sensor_coords)
+    sensors = frame.to_local(sensor_coords)
+    # LOB headings in the frame (great circles are straight lines there)
+    theta = np.radians(frame.local_azimuth(sensor_coords, azimuths))
+    # unit normal of each LOB in east/north coordinates
+    normals = np.stack([np.cos(theta), -np.sin(theta)], axis=-1)
+    # projection matrices n n^T and their products with the sensor positions
+    nnT = normals[:, :, None] * normals[:, None, :]
+    nnT_s = np.einsum('nij,nj->ni', nnT, sensors)
+    weights = 1 / sigmas ** 2
+    fix = None if initial_coord is None else frame.to_local(initial_coord)
+    for i in range(max(int(iterations), 1)):
+        if fix is not None:
+            # ranges from each sensor to the current estimate (floor avoids divide by zero)
+            ranges = np.maximum(np.hypot(*(fix - sensors).T), 1.0)
+            weights = 1 / (sigmas * ranges) ** 2
+        A = np.einsum('n,nij->ij', weights, nnT)
+        b = np.einsum('n,ni->i', weights, nnT_s)
+        if abs(np.linalg.det(A)) < 1e-12 * np.trace(A) ** 2: return None
+        fix = np.linalg.solve(A, b)
+    # covariance from the range-scaled weights at the final fix (square meters for any number of iterations)
+    ranges = np.maximum(np.hypot(*(fix - sensors).T), 1.0)
+    A = np.einsum('n,nij->ij', 1 / (sigmas * ranges) ** 2, nnT)
+    if abs(np.linalg.det(A)) < 1e-12 * np.trace(A) ** 2: return None
+    covariance = np.linalg.inv(A)
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+    scale = confidence_scale(confidence)
+    major = eigenvectors[:, 1]
+    offsets = fix - sensors
+    residuals = (np.degrees(np.arctan2(offsets[:, 0], offsets[:, 1]) - theta) + 180) % 360 - 180
+    return {'coord': frame.to_geodetic(fix).tolist(),
+            'covariance_m2': covariance.tolist(),
+            'ellipse': {'semi_major_m': float(scale * np.sqrt(max(eigenvalues[1], 0))),
+                        'semi_minor_m': float(scale * np.sqrt(max(eigenvalues[0], 0))),
+                        'orientation_deg': float(np.degrees(np.arctan2(major[0], major[1])) % 180),
+                        'confidence': confidence},
+            'residuals_deg': residuals.tolist(),
+            'ahead': (np.einsum('ni,ni->n', offsets, np.stack([np.sin(theta), np.cos(theta)], axis=-1)) > 0).tolist()}
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+# mean earth radius in meters (same radius used by the haversine library)
+EARTH_RADIUS_M = 6371008.8
+
+def destination(lat, lon, azimuth_degrees, distance_m) -> tuple:
+    """
+    Great-circle destination point(s) from starting coordinate(s)
+
+    All inputs broadcast against each other, so one sensor can be projected
+    along many bearings/distances (or many sensors along one) in a single call.
+
+    Parameters
+    ----------
+    lat : float or np.ndarray
+        Starting latitude(s) in degrees.
+    lon : float or np.ndarray
+        Starting longitude(s) in degrees.
+    azimuth_degrees : float or np.ndarray
+        Bearing(s) in degrees from north.
+    distance_m : float or np.ndarray
+        Distance(s) in meters.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        Destination latitude(s) and longitude(s) in degrees.
+
+    """
+    lat1 = np.radians(lat)
+    lon1 = np.radians(lon)
+    theta = np.radians(azimuth_degrees)
+    delta = np.asarray(distance_m, dtype=float) / EARTH_RADIUS_M
+    sin_lat1 = np.sin(lat1); cos_lat1 = np.cos(lat1)
+    sin_delta = np.sin(delta); cos_delta = np.cos(delta)
+    sin_lat2 = sin_lat1 * cos_delta + cos_lat1 * sin_delta * np.cos(theta)
+    lat2 = np.arcsin(np.clip(sin_lat2, -1.0, 1.0))
+    lon2 = lon1 + np.arctan2(np.sin(theta) * sin_delta * cos_lat1, cos_delta - sin_lat1 * sin_lat2)
+    # normalize longitude to [-180, 180)
+    return np.degrees(lat2), (np.degrees(lon2) + 540.0) % 360.0 - 180.0
+
+def distance(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Haversine distance(s) between coordinate(s) in meters
+
+    Parameters
+    ----------
+    lat1, lon1 : float or np.ndarray
+        Origin latitude(s) and longitude(s) in degrees.
+    lat2, lon2 : float or np.ndarray
+        Destination latitude(s) and longitude(s) in degrees.
+
+    Returns
+    -------
+    np.ndarray
+        Distance(s) in meters.
+
+    """
+    phi1 = np.radians(lat1); phi2 = np.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = np.radians(np.asarray(lon2, dtype=float) - lon1)
+    a = np.sin(d_phi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def bearing(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Initial bearing(s) from origin coordinate(s) to target coordinate(s)
+
+    Parameters
+    ----------
+    lat1, lon1 : float or np.ndarray
+        Origin latitude(s) and longitude(s) in degrees.
+    lat2, lon2 : float or np.ndarray
+        Target latitude(s) and longitude(s) in degrees.
+
+    Returns
+    -------
+    np.ndarray
+        Bearing(s) in range [0-360).
+
+    """
+    phi1 = np.radians(lat1); phi2 = np.radians(lat2)
+    d_lambda = np.radians(np.asarray(lon2, dtype=float) - lon1)
+    x = np.cos(phi2) * np.sin(d_lambda)
+    y = np.cos(phi1) * np.sin(phi2) - np.sin(phi1) * np.cos(phi2) * np.cos(d_lambda)
+    return np.degrees(np.arctan2(x, y)) % 360
+
+def destination_coords(coords, azimuth_degrees, distance_m) -> np.ndarray:
+    """
+    Great-circle destination(s) for coordinate arrays in [lat,lon] format
+
+    Parameters
+    ----------
+    coords : array-like of shape (...,2)
+        Starting coordinate(s) in [lat,lon] format.
+    azimuth_degrees : float or array-like
+        Bearing(s) in degrees from north.
+    distance_m : float or array-like
+        Distance(s) in meters.
+
+    Returns
+    -------
+    np.ndarray
+        Destination coordinate(s) of shape (...,2) in [lat,lon] format.
+
+    """
+    coords = np.asarray(coords, dtype=float)
+    return np.stack(destination(coords[..., 0], coords[..., 1], azimuth_degrees, distance_m), axis=-1)
+
+def distance_between_coords(coords1, coords2) -> np.ndarray:
+    """
+    Distance(s) between coordinate arrays in [lat,lon] format
+
+    Parameters
+    ----------
+    coords1 : array-like of shape (...,2)
+        Origin coordinate(s) in [lat,lon] format.
+    coords2 : array-like of shape (...,2)
+        Destination coordinate(s) in [lat,lon] format.
+
+    Returns
+    -------
+    np.ndarray
+        Distance(s) in meters.
+
+    """
+    coords1 = np.asarray(coords1, dtype=float); coords2 = np.asarray(coords2, dtype=float)
+    return distance(coords1[..., 0], coords1[..., 1], coords2[..., 0], coords2[..., 1])
+
+def bearing_between_coords(coords1, coords2) -> np.ndarray:
+    """
+    Bearing(s) between coordinate arrays in [lat,lon] format
+
+    Parameters
+    ----------
+    coords1 : array-like of shape (...,2)
+        Origin coordinate(s) in [lat,lon] format.
+    coords2 : array-like of shape (...,2)
+        Target coordinate(s) in [lat,lon] format.
+
+    Returns
+    -------
+    np.ndarray
+        Bearing(s) in range [0-360).
+
+    """
+    coords1 = np.asarray(coords1, dtype=float); coords2 = np.asarray(coords2, dtype=float)
+    return bearing(coords1[..., 0], coords1[..., 1], coords2[..., 0], coords2[..., 1])
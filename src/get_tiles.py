@@ -1,15 +1,16 @@
-import os
-
+from batch_jobs import count_tiles
+from tile_client import TileClient
+from tile_fetch import WINDOW, FetchEngine
+from tile_store import open_tile_store
 from utilities import import_libraries
-import_libraries([["tiletanic"],["argparse"],["urllib.request"],["json"],
-                  ["concurrent.futures",["ThreadPoolExecutor"]],["shapely"],
+import_libraries([["tiletanic"],["argparse"],["json"],["shapely"],
                   ["pyproj",["Transformer"]]])
 
 def get_args():
     import argparse
     parser = argparse.ArgumentParser(description="xyz-tile download tool")
     parser.add_argument("tileurl", help=r"xyz-tile url in {z}/{x}/{y} template")
-    parser.add_argument("output_dir", help="output dir")
+    parser.add_argument("output_dir", help="output dir, or .mbtiles file")
     parser.add_argument(
         "--extent",
         help="min_lon min_lat max_lon max_lat, whitespace delimited",
@@ -24,7 +25,17 @@ def get_args():
     parser.add_argument(
         "--interval",
         default="100",
-        help="time taken after each-request, set as miliseconds in interger, default to 300",
+        help="time taken after each-request per parallel request, set as miliseconds in interger, default to 100 (sets --rate if not given)",
+    )
+    parser.add_argument(
+        "--rate",
+        default=None,
+        help="max requests per second over all parallel requests, default to parallel * 1000 / interval",
+    )
+    parser.add_argument(
+        "--byterate",
+        default=None,
+        help="max downloaded bytes per second, default to unlimited",
     )
     parser.add_argument(
         "--overwrite", help="overwrite existing files", action="store_true"
@@ -35,6 +46,11 @@ def get_args():
         help="wait response until this value, set as seconds in integer, default to 5",
     )
     parser.add_argument("--parallel", default="1", help="num of parallel requests")
+    parser.add_argument(
+        "--poolsize",
+        default=None,
+        help="keep-alive connections per tile host, default to --parallel",
+    )
     parser.add_argument("--tms", help="if set, parse z/x/y as TMS", action="store_true")
     args = parser.parse_args()
 
@@ -49,6 +65,9 @@ def get_args():
         "overwrite": args.overwrite,
         "timeout": int(args.timeout),
         "parallel": int(args.parallel),
+        "poolsize": int(args.poolsize) if args.poolsize is not None else int(args.parallel),
+        "rate": float(args.rate) if args.rate is not None else (int(args.parallel) * 1000 / int(args.interval) if int(args.interval) > 0 else None),
+        "byterate": float(args.byterate) if args.byterate is not None else None,
         "tms": args.tms,
     }
 
@@ -64,12 +83,63 @@ def get_args():
     return verified_args
 
 
+def download_tiles(tiles, make_request, engine, window=WINDOW, num_expected=None, report_sec=1.0):
+    """
+    Downloads tiles through the rate-limited fetch engine with live progress
+
+    Tiles are pulled from the (lazy) tile iterable only as the pending window
+    frees up, so the tile cover is never held in memory.
+
+    Parameters
+    ----------
+    tiles : iterable
+        Tiles to download (consumed lazily).
+    make_request : callable
+        Returns (url, process) for a tile, or None to skip it (see FetchEngine.fetch_many).
+    engine : FetchEngine
+        Fetch engine (rate limits and per-host concurrency).
+    window : int, optional
+        Maximum tiles pending. The default is 1000.
+    num_expected : int, optional
+        Expected number of tiles, for the progress ETA. The default is None.
+    report_sec : float, optional
+        Progress report interval in seconds. The default is 1.0.
+
+    Returns
+    -------
+    dict
+        Counts of 'downloaded', 'skipped' and 'failed' tiles, 'elapsed_sec',
+        and 'errors': a list of (tile, error message) for failed tiles.
+
+    """
+    import time
+    t1 = time.time(); last_report = t1
+    counts = {'done': 0, 'failed': 0}
+
+    def report(tile, error):
+        nonlocal last_report
+        counts['done'] += 1
+        if error is not None and error != 'skipped': counts['failed'] += 1
+        now = time.time()
+        if now - last_report < report_sec: return
+        last_report = now
+        num_done = counts['done']
+        rate = num_done / max(now - t1, 1e-9)
+        if num_expected:
+            eta = f"{max(num_expected - num_done, 0) / rate:,.0f} sec" if rate > 0 else "N/A"
+            progress = f"{num_done:,} / ~{num_expected:,} tiles, ETA {eta}"
+        else:
+            progress = f"{num_done:,} tiles"
+        print(f"\r{progress} ({rate:,.1f} tiles/sec, {counts['failed']:,} failed)", end='', flush=True)
+
+    results = engine.run(tiles, make_request, window=window, on_done=report)
+    print()
+    return results
+
 def main():
-    import urllib.request, json, shapely, tiletanic
-    from concurrent.futures import ThreadPoolExecutor
+    import json, shapely, tiletanic
     from pyproj import Transformer
     args = get_args()
-    num_tiles = 0
     if args["extent"] is not None:
         geometry = shapely.geometry.shape(
             {
@@ -101,21 +171,21 @@ def main():
     transformer = Transformer.from_crs(4326, 3857, always_xy=True)
     geom_3857 = shapely.ops.transform(transformer.transform, geometry)
 
-    def download(tile):
-        import time
-        basepath = args["tileurl"].split("/")[-1]  # ?foo=bar&z={z}.ext
-        segments = basepath.split(".")
-        ext = "." + segments[-1] if len(segments) > 1 else ".png"
-
-        write_dir = os.path.join(args["output_dir"], str(tile[2]), str(tile[0]))
-        write_filepath = os.path.join(write_dir, str(tile[1]) + ext)
-
-        if os.path.exists(write_filepath) and not args["overwrite"]:
+    basepath = args["tileurl"].split("/")[-1]  # ?foo=bar&z={z}.ext
+    segments = basepath.split(".")
+    ext = "." + segments[-1] if len(segments) > 1 else ".png"
+    # tile directory (z/x/y.ext files) or MBTiles file
+    store = open_tile_store(args["output_dir"], ext)
+    # rate-limited fetch engine over keep-alive connections
+    engine = FetchEngine(requests_per_sec=args["rate"], bytes_per_sec=args["byterate"], per_host=args["parallel"],
+                         client=TileClient(pool_size=args["poolsize"], timeout=args["timeout"]))
+
+    def make_request(tile):
+        # the store is addressed in XYZ rows; --tms tiles (and their URLs) use TMS rows
+        y = (1 << tile[2]) - 1 - tile[1] if args["tms"] else tile[1]
+        if not args["overwrite"] and store.has_tile(tile[2], tile[0], y):
             # skip if already exists when not-overwrite mode
-            '''
-            print something saying that the tile is already downloaded?
-            '''
-            return
+            return None
 
         url = (
             args["tileurl"]
@@ -123,28 +193,8 @@ def main():
             .replace(r"{y}", str(tile[1]))
             .replace(r"{z}", str(tile[2]))
         )
-        
-        data = None
-        while True:
-            try:
-                data = urllib.request.urlopen(url, timeout=args["timeout"])
-                break
-            except urllib.error.HTTPError as e:
-                raise Exception(str(e) + ":" + url)
-            except Exception as e:
-                if (
-                    str(e.args)
-                    == "(timeout('_ssl.c:1091: The handshake operation timed out'),)"
-                ):
-                    print("timeout, retrying... :" + url)
-                else:
-                    raise Exception(str(e) + ":" + url)
-        if data is not None:
-            print(f'Downloading {tile[2]}/{tile[0]}/{tile[1]}.png')
-            os.makedirs(write_dir, exist_ok=True)
-            with open(write_filepath, mode="wb") as f:
-                f.write(data.read())
-            time.sleep(args["interval"] / 1000)
+        # write the tile on the engine's worker thread
+        return url, lambda data: store.put_tile(tile[2], tile[0], y, data)
 
     tilescheme = (
         tiletanic.tileschemes.WebMercatorBL()
@@ -152,17 +202,22 @@ def main():
         else tiletanic.tileschemes.WebMercator()
     )
 
-    with ThreadPoolExecutor(max_workers=args["parallel"]) as executor:
+    def generate_tiles():
+        # stream the tile cover zoom by zoom (never held in memory)
         for zoom in range(args["minzoom"], args["maxzoom"] + 1):
-            generator = tiletanic.tilecover.cover_geometry(tilescheme, geom_3857, zoom)
-            for tile in generator:
-                future = executor.submit(download, tile)
-                num_tiles += 1
-                if future.exception() is not None:
-                    print(future.exception())
-                    # bar()
-
-    print(f"Download Finished: {num_tiles:,} tiles downloaded")
+            yield from tiletanic.tilecover.cover_geometry(tilescheme, geom_3857, zoom)
+
+    # tiles in the bounding tile range (exact for extents, an upper bound of the tile cover for other shapes)
+    num_expected = sum(count_tiles(geometry.bounds, zoom) for zoom in range(args["minzoom"], args["maxzoom"] + 1))
+    results = download_tiles(generate_tiles(), make_request, engine, num_expected=num_expected)
+
+    engine.close(); store.close()
+    num_tiles = results['downloaded'] + results['skipped'] + results['failed']
+    print(f"Download Finished: {results['downloaded']:,} tiles downloaded, {results['skipped']:,} already present, "
+          f"{results['failed']:,} failed of {num_tiles:,} tiles in {results['elapsed_sec']:,.1f} sec")
+    for tile, error in results['errors'][:20]:
+        print(f"Failed {tile[2]}/{tile[0]}/{tile[1]}: {error}")
+    if len(results['errors']) > 20: print(f"... and {len(results['errors']) - 20:,} more failed tiles")
 
 if __name__ == "__main__":
     main()
@@ -963,11 +963,18 @@ class App(customtkinter.CTk):
             sticky="we")
         # bind zoom range entry "Right Click" to copy (if selection exists) / paste function (otherwise)
         self.batch_download_zoom_range.bind("<Button-3>", lambda cTk_obj: self.paste_from_clipboard(self.batch_download_zoom_range))
+        # update the download estimate on "Return" / leaving the batch download entries
+        for batch_download_entry in (self.batch_download_center_mgrs, self.batch_download_radius, self.batch_download_zoom_range):
+            batch_download_entry.bind("<Return>", self.estimate_batch_download)
+            batch_download_entry.bind("<FocusOut>", self.estimate_batch_download)
         # define target error attributes
         self.label_batch_download_time_estimate = customtkinter.CTkLabel(
             master=self.frame_right, 
             text="Est. Download Time: N/A",
             text_color='white')
+        # inputs of the displayed download estimate (not re-estimated while they are unchanged)
+        self.batch_download_estimate_inputs = None
+        self.batch_download_estimate = None
         # assign target error attributes grid position
         self.label_batch_download_time_estimate.grid(
             row=2,
@@ -1651,254 +1658,105 @@ class App(customtkinter.CTk):
                 self.target_coord = f'{" | ".join(target_coord_list)}'
 
     def ewt_function(self,*args):
-        from utilities import check_if_point_in_polygon, check_for_intersection, convert_coords_to_mgrs, convert_mgrs_to_coords, format_readable_DTG, format_readable_mgrs, generate_DTG, get_center_coord, get_coords_from_LOBs, get_distance_between_coords, get_emission_distance, get_intersection, get_line, get_polygon_area, organize_polygon_coords
-        def plot_lobs(s1lnmc,s1lfmc,s2lnmc,s2lfmc,s3lnmc,s3lfmc,plot_ewt1_lob_tgt_bool=True,plot_ewt2_lob_tgt_bool=True,plot_ewt3_lob_tgt_bool=True):
-            import numpy as np
-            num_lobs = 3-[self.sensor1_mgrs_val,self.sensor2_mgrs_val,self.sensor3_mgrs_val].count(None)
+        from utilities import convert_coords_to_mgrs, convert_mgrs_to_coords, format_readable_DTG, format_readable_mgrs, generate_DTG
+        from targeting_engine import EmitterParameters, SensorReport, solve
+        def plot_lobs(lob_results):
+            """
+            Render the LOB results of the targeting engine
+            """
+            num_lobs = len(lob_results)
             # assess if there is no target class
             if self.target_class == '':
                 # set target class
                 self.target_class = f'({num_lobs} {"LOB" if num_lobs == 1 else "LOBs"})'
                 # set target grid label to include target classification
                 self.label_target_grid.configure(text=f'TARGET GRIDs {self.target_class}'.strip(),text_color='red')
-            # assess if sensor 1 has non-None values
-            if self.sensor1_mgrs_val != None and self.sensor1_grid_azimuth_val != None and self.sensor1_power_received_dBm_val != None:
-                # calculate sensor 1 target coordinate
-                self.sensor1_target_coord = [np.average([s1lnmc[0],s1lfmc[0]]),np.average([s1lnmc[1],s1lfmc[1]])]
-                # calculate sensor 1 target MGRS
-                sensor1_target_mgrs = convert_coords_to_mgrs(self.sensor1_target_coord)
-                # calculate sensor 1 LOB error (in acres)
-                self.sensor1_lob_error_acres = get_polygon_area(self.sensor1_lob_polygon)
-                # define sensor 1 LOB description
-                sensor1_lob_description = f"EWT 1 at {format_readable_mgrs(self.sensor1_mgrs_val)} with a LOB at bearing {int(self.sensor1_grid_azimuth_val)}° between {self.generate_sensor_distance_text(self.sensor1_min_distance_m)} and {self.generate_sensor_distance_text(self.sensor1_max_distance_m)} with {self.sensor1_lob_error_acres:,.0f} acres of error"
-                # define and set sensor 1 marker on the map
-                
-                ew_team1_marker = self.map_widget.set_marker(
-                    self.sensor1_coord[0], 
-                    self.sensor1_coord[1],
-                    text="",
-                    image_zoom_visibility=(10, float("inf")),
-                    marker_color_circle='white',
-                    text_color='black',
-                    icon=self.ew_team1_image,
-                    command=self.marker_click,
-                    data=f'EWT 1\n{format_readable_mgrs(self.sensor1_mgrs_val)}\nat {format_readable_DTG(generate_DTG())}')
-                # add sensor 1 marker to EWT marker list
-                self.append_object(ew_team1_marker,"EWT")
-                # define and set sensor 1 center line
-                sensor1_lob = self.map_widget.set_polygon(
-                    position_list=[(self.sensor1_coord[0],self.sensor1_coord[1]),(s1lfmc[0],s1lfmc[1])],
-                    fill_color=App.DEFAULT_VALUES['LOB Fill Color'],
-                    outline_color=App.DEFAULT_VALUES['LOB Center Line Color'],
-                    border_width=App.DEFAULT_VALUES['Border Width'],
-                    command=self.polygon_click,
-                    data="LOB Line\n"+sensor1_lob_description)
-                # add sensor 1 LOB center-line to polygon list
-                self.append_object(sensor1_lob,"LOB")
-                # define and set sensor 1 LOB area
-                sensor1_lob_area = self.map_widget.set_polygon(
-                    position_list=self.sensor1_lob_polygon,
-                    fill_color=App.DEFAULT_VALUES['LOB Fill Color'],
-                    outline_color=App.DEFAULT_VALUES['LOB Area Outline Color'],
-                    border_width=App.DEFAULT_VALUES['Border Width'],
-                    command=self.polygon_click,
-                    data="LOB Area\n"+sensor1_lob_description)
-                # add sensor 1 LOB area to polygon list
-                self.append_object(sensor1_lob_area,"LOB")
-                if plot_ewt1_lob_tgt_bool:
-                    # define and set sensor 1 target marker
-                    target1_marker = self.map_widget.set_marker(
-                        deg_x=self.sensor1_target_coord[0], 
-                        deg_y=self.sensor1_target_coord[1], 
-                        text=f'{format_readable_mgrs(sensor1_target_mgrs)}', 
-                        image_zoom_visibility=(10, float("inf")),
-                        marker_color_circle='white',
-                        icon=self.target_image_LOB,
-                        command=self.marker_click,
-                        data=f'TGT (LOB)\nEWT 1\n{format_readable_mgrs(sensor1_target_mgrs)}\nat {format_readable_DTG(generate_DTG())}')
-                    # add sensor 1 target marker to target marker list
-                    self.append_object(target1_marker,"TGT")
-                # calculate sensor 1 distance to target 1
-                self.sensor1_distance_val = int(get_distance_between_coords(self.sensor1_coord,self.sensor1_target_coord))
-                # generate sensor 1 distance from target text     
-                dist_sensor1_text = self.generate_sensor_distance_text(self.sensor1_distance_val)
-                # set sensor 1 distance field
-                self.sensor1_distance.configure(text=dist_sensor1_text,text_color='white')
-            else:
-                sensor1_target_mgrs = None
-                self.sensor1_lob_error_acres = None
-                self.sensor1_target_coord = None
-                self.sensor1_distance.configure(text="N/A",text_color='white')
-            # assess if sensor 2 has non-None values
-            if self.sensor2_mgrs_val != None and self.sensor2_grid_azimuth_val != None and self.sensor2_power_received_dBm_val != None:
-                # calculate sensor 2 target coordinate
-                self.sensor2_target_coord = [np.average([s2lnmc[0],s2lfmc[0]]),np.average([s2lnmc[1],s2lfmc[1]])]
-                # calculate sensor 2 target MGRS
-                sensor2_target_mgrs = convert_coords_to_mgrs(self.sensor2_target_coord)
-                # calculate LOB 2 sensor error (in acres)
-                self.sensor2_lob_error_acres = get_polygon_area(self.sensor2_lob_polygon)
-                # define LOB 2 description
-                sensor2_lob_description = f"EWT 2 at {format_readable_mgrs(self.sensor2_mgrs_val)} with a LOB at bearing {int(self.sensor2_grid_azimuth_val)}° between {self.generate_sensor_distance_text(self.sensor2_min_distance_m)} and {self.generate_sensor_distance_text(self.sensor2_max_distance_m)} with {self.sensor2_lob_error_acres:,.0f} acres of error"
-                # define and set sensor 2 marker on the map
-                ew_team2_marker = self.map_widget.set_marker(
-                    deg_x=self.sensor2_coord[0], 
-                    deg_y=self.sensor2_coord[1], 
+            # define EWT icons by sensor number
+            ew_team_images = {1:self.ew_team1_image,2:self.ew_team2_image,3:self.ew_team3_image}
+            for sensor_num in [1,2,3]:
+                # assess if sensor has no LOB result
+                if sensor_num not in lob_results:
+                    setattr(self,f'sensor{sensor_num}_lob_error_acres',None)
+                    setattr(self,f'sensor{sensor_num}_target_coord',None)
+                    getattr(self,f'sensor{sensor_num}_distance').configure(text="N/A",text_color='white')
+                    continue
+                lob = lob_results[sensor_num]
+                sensor_mgrs_val = getattr(self,f'sensor{sensor_num}_mgrs_val')
+                # set sensor target coordinate
+                setattr(self,f'sensor{sensor_num}_target_coord',lob.target_coord)
+                # calculate sensor target MGRS
+                sensor_target_mgrs = convert_coords_to_mgrs(lob.target_coord)
+                # set sensor LOB error (in acres)
+                setattr(self,f'sensor{sensor_num}_lob_error_acres',lob.error_acres)
+                # define sensor LOB description
+                sensor_lob_description = f"EWT {sensor_num} at {format_readable_mgrs(sensor_mgrs_val)} with a LOB at bearing {int(lob.azimuth)}° between {self.generate_sensor_distance_text(lob.min_distance_m)} and {self.generate_sensor_distance_text(lob.max_distance_m)} with {lob.error_acres:,.0f} acres of error"
+                # define and set sensor marker on the map
+                ew_team_marker = self.map_widget.set_marker(
+                    deg_x=lob.sensor_coord[0], 
+                    deg_y=lob.sensor_coord[1], 
                     text="", 
                     image_zoom_visibility=(10, float("inf")),
                     marker_color_circle='white',
                     text_color='black',
-                    icon=self.ew_team2_image,
+                    icon=ew_team_images[sensor_num],
                     command=self.marker_click,
-                    data=f'EWT 2\n{format_readable_mgrs(self.sensor2_mgrs_val)}\nat {format_readable_DTG(generate_DTG())}')
-                # add sensor 2 marker to EWT marker list
-                self.append_object(ew_team2_marker,"EWT")
-                # define and set sensor 2 LOB area
-                sensor2_lob = self.map_widget.set_polygon(
-                    position_list=[(self.sensor2_coord[0],self.sensor2_coord[1]),(s2lfmc[0],s2lfmc[1])],
+                    data=f'EWT {sensor_num}\n{format_readable_mgrs(sensor_mgrs_val)}\nat {format_readable_DTG(generate_DTG())}')
+                # add sensor marker to EWT marker list
+                self.append_object(ew_team_marker,"EWT")
+                # define and set sensor LOB center line
+                sensor_lob = self.map_widget.set_polygon(
+                    position_list=[tuple(lob.sensor_coord),tuple(lob.far_center_coord)],
                     fill_color=App.DEFAULT_VALUES['LOB Fill Color'],
                     outline_color=App.DEFAULT_VALUES['LOB Center Line Color'],
                     border_width=App.DEFAULT_VALUES['Border Width'],
                     command=self.polygon_click,
-                    data="LOB Line\n"+sensor2_lob_description)
-                # add sensor 2 LOB area to polygon list
-                self.append_object(sensor2_lob,"LOB")
-                # define and set sensor 2 LOB area
-                sensor2_lob_area = self.map_widget.set_polygon(
-                    position_list=self.sensor2_lob_polygon,
+                    data="LOB Line\n"+sensor_lob_description)
+                # add sensor LOB center-line to polygon list
+                self.append_object(sensor_lob,"LOB")
+                # define and set sensor LOB area
+                sensor_lob_area = self.map_widget.set_polygon(
+                    position_list=lob.polygon,
                     fill_color=App.DEFAULT_VALUES['LOB Fill Color'],
                     outline_color=App.DEFAULT_VALUES['LOB Area Outline Color'],
                     border_width=App.DEFAULT_VALUES['Border Width'],
                     command=self.polygon_click,
-                    data="LOB Area\n"+sensor2_lob_description)
-                # add LOB area to polygon list
-                self.append_object(sensor2_lob_area,"LOB")
-                if plot_ewt2_lob_tgt_bool:
-                    # define and set sensor 2 target marker
-                    target2_marker = self.map_widget.set_marker(
-                        deg_x=self.sensor2_target_coord[0], 
-                        deg_y=self.sensor2_target_coord[1], 
-                        text=f'{format_readable_mgrs(sensor2_target_mgrs)}', 
+                    data="LOB Area\n"+sensor_lob_description)
+                # add sensor LOB area to polygon list
+                self.append_object(sensor_lob_area,"LOB")
+                # assess if the LOB target is not part of a CUT / FIX
+                if lob.plot_target:
+                    # define and set sensor target marker
+                    target_marker = self.map_widget.set_marker(
+                        deg_x=lob.target_coord[0], 
+                        deg_y=lob.target_coord[1], 
+                        text=f'{format_readable_mgrs(sensor_target_mgrs)}', 
                         image_zoom_visibility=(10, float("inf")),
                         marker_color_circle='white',
                         icon=self.target_image_LOB,
                         command=self.marker_click,
-                        data=f'TGT (LOB)\nEWT 2\n{format_readable_mgrs(sensor2_target_mgrs)}\nat {format_readable_DTG(generate_DTG())}')
-                    # add sensor 2 target marker to tarket marker list
-                    self.append_object(target2_marker,"TGT")
-                # calculate sensor 1 distance to target 2
-                self.sensor2_distance_val = int(get_distance_between_coords(self.sensor2_coord,self.sensor2_target_coord))
-                # generate sensor 2 distance from target text       
-                dist_sensor2_text = self.generate_sensor_distance_text(self.sensor2_distance_val)
-                # set sensor 2 distance field
-                self.sensor2_distance.configure(text=dist_sensor2_text,text_color='white')
-            else:
-                sensor2_target_mgrs = None
-                self.sensor2_lob_error_acres = None
-                self.sensor2_target_coord = None
-                self.sensor2_distance.configure(text="N/A",text_color='white')
-            # assess if sensor 3 has non-None values
-            if self.sensor3_mgrs_val != None and self.sensor3_grid_azimuth_val != None and self.sensor3_power_received_dBm_val != None:
-                # calculate sensor 3 target coordinate
-                self.sensor3_target_coord = [np.average([s3lnmc[0],s3lfmc[0]]),np.average([s3lnmc[1],s3lfmc[1]])]
-                # calculate sensor 3 target MGRS
-                sensor3_target_mgrs = convert_coords_to_mgrs(self.sensor3_target_coord)
-                # calculate LOB 3 sensor error (in acres)
-                self.sensor3_lob_error_acres = get_polygon_area(self.sensor3_lob_polygon)
-                # define sensor 3 LOB description
-                sensor3_lob_description = f"EWT 3 at {format_readable_mgrs(self.sensor3_mgrs_val)} with a LOB at bearing {int(self.sensor3_grid_azimuth_val)}° between {self.generate_sensor_distance_text(self.sensor3_min_distance_m)} and {self.generate_sensor_distance_text(self.sensor3_max_distance_m)} with {self.sensor3_lob_error_acres:,.0f} acres of error"
-                # define and plot sensor 3 marker on the map
-                ew_team3_marker = self.map_widget.set_marker(
-                    deg_x=self.sensor3_coord[0], 
-                    deg_y=self.sensor3_coord[1], 
-                    text="", 
-                    image_zoom_visibility=(10, float("inf")),
-                    marker_color_circle='white',
-                    text_color='black',
-                    icon=self.ew_team3_image,
-                    command=self.marker_click,
-                    data=f'EWT 3\n{format_readable_mgrs(self.sensor3_mgrs_val)}\nat {format_readable_DTG(generate_DTG())}')
-                # add sensor 3 marker to EWT marker list
-                self.append_object(ew_team3_marker,"EWT")
-                # define and set sensor 3 LOB area
-                sensor3_lob = self.map_widget.set_polygon(
-                    position_list=[(self.sensor3_coord[0],self.sensor3_coord[1]),(s3lfmc[0],s3lfmc[1])],
-                    fill_color=App.DEFAULT_VALUES['LOB Fill Color'],
-                    outline_color=App.DEFAULT_VALUES['LOB Center Line Color'],
-                    border_width=App.DEFAULT_VALUES['Border Width'],
-                    command=self.polygon_click,
-                    data="LOB Line\n"+sensor3_lob_description)
-                # add sensor 2 LOB area to polygon list
-                self.append_object(sensor3_lob,"LOB")
-                # define and set sensor 2 LOB area
-                sensor3_lob_area = self.map_widget.set_polygon(
-                    position_list=self.sensor3_lob_polygon,
-                    fill_color=App.DEFAULT_VALUES['LOB Fill Color'],
-                    outline_color=App.DEFAULT_VALUES['LOB Area Outline Color'],
-                    border_width=App.DEFAULT_VALUES['Border Width'],
-                    command=self.polygon_click,
-                    data="LOB Area\n"+sensor3_lob_description)
-                # add LOB area to polygon list
-                self.append_object(sensor3_lob_area,"LOB")
-                if plot_ewt3_lob_tgt_bool:
-                    # define and set sensor 3 target marker
-                    target3_marker = self.map_widget.set_marker(
-                        deg_x=self.sensor3_target_coord[0], 
-                        deg_y=self.sensor3_target_coord[1], 
-                        text=f'{format_readable_mgrs(sensor3_target_mgrs)}', 
-                        image_zoom_visibility=(10, float("inf")),
-                        marker_color_circle='white',
-                        icon=self.target_image_LOB,
-                        command=self.marker_click,
-                        data=f'TGT (LOB)\nEWT 3\n{format_readable_mgrs(sensor3_target_mgrs)}\nat {format_readable_DTG(generate_DTG())}')
-                    # add sensor 3 target marker to target marker list
-                    self.append_object(target3_marker,"TGT")
-                # calculate sensor 3 distance to target 3
-                self.sensor3_distance_val = int(get_distance_between_coords(self.sensor3_coord,self.sensor3_target_coord))
-                # generate sensor 3 distance from target text       
-                dist_sensor3_text = self.generate_sensor_distance_text(self.sensor3_distance_val)
-                # set sensor 3 distance field
-                self.sensor3_distance.configure(text=dist_sensor3_text,text_color='white')
-            else:
-                sensor3_target_mgrs = None
-                self.sensor3_lob_error_acres = None
-                self.sensor3_target_coord = None
-                self.sensor3_distance.configure(text="N/A",text_color='white')
+                        data=f'TGT (LOB)\nEWT {sensor_num}\n{format_readable_mgrs(sensor_target_mgrs)}\nat {format_readable_DTG(generate_DTG())}')
+                    # add sensor target marker to target marker list
+                    self.append_object(target_marker,"TGT")
     
-        def plot_cut(l1c,l1r,l1l,l2c,l2r,l2l,multi_cut_bool=False,plot_cut_tgts=True):
+        def plot_cut(cut,multi_cut_bool=False,plot_cut_tgts=True):
             """
-            Detect intersection between lob bounds and other lob's far bound, choose the four closes points for cut polygon'
+            Render a CUT result of the targeting engine
             """
             # define target classification
             self.target_class = '(CUT)'
             # set target label with updated target classification
             self.label_target_grid.configure(text=f'TARGET GRID {self.target_class}'.strip(),text_color='red')
-            # get intersection of LOB centers
-            self.target_coord = get_intersection(l1c, l2c)
-            # get intersection of right-bound LOB errors
-            intersection_l1r_l2r = get_intersection(l1r, l2r)
-            # get intersection of LOB 1 right-bound error and LOB 2 left-bound error
-            intersection_l1r_l2l = get_intersection(l1r, l2l)
-            # get intersection of LOB 1 left-bound error and LOB 2 right-bound error
-            intersection_l1l_l2r = get_intersection(l1l, l2r)
-            # get intersection of left-bound LOB errors 
-            intersection_l1l_l2l = get_intersection(l1l, l2l)
-            '''
-            Assess if the backstops of LOBs intersect with LOB left-right bounds, need to know which LOBs are being assessed
-            '''
-            
-            # define CUT polygon
-            cut_polygon = [intersection_l1r_l2r,intersection_l1r_l2l,intersection_l1l_l2l,intersection_l1l_l2r]
-            # organize CUT polygon
-            cut_polygon = organize_polygon_coords(cut_polygon)
-            # calculate the CUT error (in acres)
-            self.target_error_val = get_polygon_area(cut_polygon)
+            # set CUT target coordinate (intersection of LOB centers)
+            self.target_coord = cut.target_coord
+            # set the CUT error (in acres)
+            self.target_error_val = cut.error_acres
             # define CUT center MGRS grid
             self.target_mgrs = convert_coords_to_mgrs(self.target_coord)
-            # define sensor 1 LOB description
+            # define CUT description
             cut_description = f"Target CUT at {format_readable_mgrs(self.target_mgrs)} with {self.target_error_val:,.0f} acres of error"
             # define and set CUT area
             cut_area = self.map_widget.set_polygon(
-                position_list=cut_polygon,
+                position_list=cut.polygon,
                 fill_color=App.DEFAULT_VALUES['LOB Fill Color'],
                 outline_color=App.DEFAULT_VALUES['CUT Area Outline Color'],
                 border_width=App.DEFAULT_VALUES['Border Width'],
@@ -1906,12 +1764,6 @@ class App(customtkinter.CTk):
                 data=cut_description)
             # add CUT polygon to the polygon list
             self.append_object(cut_area,"CUT")
-            # calculate distance from sensor 1 and CUT intersection (in meters)
-            if self.sensor1_mgrs_val != None: self.sensor1_distance_val = int(get_distance_between_coords(self.sensor1_coord,self.target_coord))
-            # calculate distance from sensor 2 and CUT intersection (in meters)
-            if self.sensor2_mgrs_val != None: self.sensor2_distance_val = int(get_distance_between_coords(self.sensor2_coord,self.target_coord))    
-            # define and set the CUT target marker
-            if self.sensor3_mgrs_val != None: self.sensor3_distance_val = int(get_distance_between_coords(self.sensor3_coord,self.target_coord))    
             if plot_cut_tgts:
                 # define and set the CUT target marker
                 cut_target_marker = self.map_widget.set_marker(
@@ -1925,34 +1777,6 @@ class App(customtkinter.CTk):
                     data=f'TGT (CUT)\n{format_readable_mgrs(self.target_mgrs)}\nat {format_readable_DTG(generate_DTG())}')
                 # add CUT marker to target marker list
                 self.append_object(cut_target_marker,"TGT")
-            # generate sensor 1 distance from target text     
-            if self.sensor1_mgrs_val != None: 
-                # generate sensor 1 distance from target text
-                dist_sensor1_text = self.generate_sensor_distance_text(self.sensor1_distance_val)
-                # set sensor 1 distance field
-                if self.sensor1_distance.cget("text") != '' and multi_cut_bool:
-                    if self.sensor1_distance.cget("text") > dist_sensor1_text:
-                        self.sensor1_distance.configure(text=dist_sensor1_text,text_color='white')
-                else:
-                    self.sensor1_distance.configure(text=dist_sensor1_text,text_color='white')
-            if self.sensor2_mgrs_val != None: 
-                # generate sensor 2 distance from target text
-                dist_sensor2_text = self.generate_sensor_distance_text(self.sensor2_distance_val)
-                # set sensor 2 distance field
-                if self.sensor2_distance.cget("text") != '' and multi_cut_bool:
-                    if self.sensor2_distance.cget("text") > dist_sensor2_text:
-                        self.sensor2_distance.configure(text=dist_sensor2_text,text_color='white')
-                else:
-                    self.sensor2_distance.configure(text=dist_sensor2_text,text_color='white')
-            if self.sensor3_mgrs_val != None:
-                # generate sensor 3 distance from target text
-                dist_sensor3_text = self.generate_sensor_distance_text(self.sensor3_distance_val)
-                # set sensor 3 distance field
-                if self.sensor3_distance.cget("text") != '' and multi_cut_bool:
-                    if self.sensor3_distance.cget("text") > dist_sensor3_text:
-                        self.sensor3_distance.configure(text=dist_sensor3_text,text_color='white')
-                else:
-                    self.sensor3_distance.configure(text=dist_sensor3_text,text_color='white')
             # set target grid field with CUT center MGRS
             if multi_cut_bool: self.target_grid.configure(text="MULTIPLE CUTS")
             if not multi_cut_bool: self.target_grid.configure(text=f'{format_readable_mgrs(self.target_mgrs)}',text_color='yellow')
@@ -1962,119 +1786,17 @@ class App(customtkinter.CTk):
             # set map position at CUT target 
             self.map_widget.set_position(self.target_coord[0],self.target_coord[1])
             
-        def plot_fix(lob1_center,lob1_right_bound,lob1_left_bound,lob2_center,lob2_right_bound,lob2_left_bound,lob3_center,lob3_right_bound,lob3_left_bound):
+        def plot_fix(fix):
             """
-            Still having issues of inconsistency with some assessments of FIX space
-            incorporating alt method as temp solution
+            Render the FIX result of the targeting engine
             """
-            
-            from utilities import adjust_coordinate, get_bearing_between_coordinates
-            # get intersection of LOB 1 & LOB 2 right-bound errors
-            intersection_l1r_l2r = get_intersection(lob1_right_bound, lob2_right_bound)
-            # get intersection of LOB 1 right-bound error and LOB 2 left-bound error
-            intersection_l1r_l2l = get_intersection(lob1_right_bound, lob2_left_bound)
-            # get intersection of LOB 1 left-bound error and LOB 2 right-bound error
-            intersection_l1l_l2r = get_intersection(lob1_left_bound, lob2_right_bound)
-            # get intersection of LOB 1 & LOB 2 left-bound errors 
-            intersection_l1l_l2l = get_intersection(lob1_left_bound, lob2_left_bound)
-            # define LOB 1 & LOB 2 CUT polygon
-            cut12_polygon = [intersection_l1r_l2r,intersection_l1r_l2l,intersection_l1l_l2r,intersection_l1l_l2l]
-            # get intersection of LOB 1 & LOB 3 right-bound errors
-            intersection_l1r_l3r = get_intersection(lob1_right_bound, lob3_right_bound)
-            # get intersection of LOB 1 right-bound error and LOB 3 left-bound error
-            intersection_l1r_l3l = get_intersection(lob1_right_bound, lob3_left_bound)
-            # get intersection of LOB 1 left-bound error and LOB 3 right-bound error
-            intersection_l1l_l3r = get_intersection(lob1_left_bound, lob3_right_bound)
-            # get intersection of LOB 1 & LOB 3 left-bound errors 
-            intersection_l1l_l3l = get_intersection(lob1_left_bound, lob3_left_bound)
-            # define LOB 1 & LOB 3 CUT polygon
-            cut13_polygon = [intersection_l1r_l3r,intersection_l1r_l3l,intersection_l1l_l3r,intersection_l1l_l3l]
-            # get intersection of LOB 2 & LOB 3 right-bound errors
-            intersection_l2r_l3r = get_intersection(lob2_right_bound, lob3_right_bound)
-            # get intersection of LOB 2 right-bound error and LOB 3 left-bound error
-            intersection_l2r_l3l = get_intersection(lob2_right_bound, lob3_left_bound)
-            # get intersection of LOB 2 left-bound error and LOB 3 right-bound error
-            intersection_l2l_l3r = get_intersection(lob2_left_bound, lob3_right_bound)
-            # get intersection of LOB 2 & LOB 3 left-bound errors 
-            intersection_l2l_l3l = get_intersection(lob2_left_bound, lob3_left_bound)
-            # define LOB 2 & LOB 3 CUT polygon
-            cut23_polygon = [intersection_l2r_l3r,intersection_l2r_l3l,intersection_l2l_l3r,intersection_l2l_l3l]
-            # define candidate points
-            points_unadjusted = list(list(cut12_polygon) + list(cut13_polygon) + list(cut23_polygon))
-            # points.append([35.3336198, -116.5212675])
-            center_point = get_center_coord(points_unadjusted)
-            fix_buffer_adjustment_m = 5
-            points = [adjust_coordinate(p,get_bearing_between_coordinates(p,center_point),fix_buffer_adjustment_m) for p in points_unadjusted]           
-            # organize LOB 1 & LOB 2 CUT polygon
-            cut12_polygon = organize_polygon_coords(cut12_polygon)
-            # organize LOB 1 & LOB 3 CUT polygon
-            cut13_polygon = organize_polygon_coords(cut13_polygon)
-            # organize LOB 2 & LOB 3 CUT polygon
-            cut23_polygon = organize_polygon_coords(cut23_polygon) 
-            # define polygons
-            polygons = [cut12_polygon,cut13_polygon,cut23_polygon]
-            # polygons = [self.sensor1_lob_polygon,self.sensor2_lob_polygon,self.sensor3_lob_polygon]
-            # define FIX coords list
-            fix_polygon = []
-            # loop through all CUT intersection points
-            for index_point, point in enumerate(points):
-                # set polygon boolean value to TRUE
-                in_polygon_bool = True
-                # loop through all CUT polygons
-                for index_polygon, poly in enumerate(polygons):
-                    # assess if the point is in the polygon
-                    output = check_if_point_in_polygon(point,poly)
-                    # print("output ", output)
-                    if output == 0 or output == False:
-                        # set polygon boolean value to FALSE
-                        in_polygon_bool = False
-                        # end polygon loop
-                        break
-                # if point is in all CUT polygons
-                if in_polygon_bool:
-                    # append point as a fix coordinate
-                    fix_polygon.append(point)
-                    # print(f"YES: {point} is in the fix\n\n")
-                else:
-                    pass
-                    # print(f"NO: {point} is not in the fixn\n")
-                in_polygon_bool = True
-            if len(fix_polygon) == 0:
-                # plot cuts with the CUT target icon
-                plot_cut(lob1_center,lob1_right_bound,lob1_left_bound,lob2_center,lob2_right_bound,lob2_left_bound,True,True)
-                plot_cut(lob2_center,lob2_right_bound,lob2_left_bound,lob3_center,lob3_right_bound,lob3_left_bound,True,True)
-                plot_cut(lob1_center,lob1_right_bound,lob1_left_bound,lob3_center,lob3_right_bound,lob3_left_bound,True,True)
-                return
-            # organize fix coordinates
-            fix_polygon = organize_polygon_coords(fix_polygon)
-            # assess if the fix polygon is not a polygon
-            if len(fix_polygon) < 3:
-                # alternate method of determining fix
-                int_13 = get_intersection(lob1_center, lob3_center)
-                int_12 = get_intersection(lob1_center, lob2_center)
-                int_23 = get_intersection(lob2_center, lob3_center)
-                fix_polygon = [int_12,int_23,int_13]
-                # plot cuts with the CUT target icon
-                plot_cut(lob1_center,lob1_right_bound,lob1_left_bound,lob2_center,lob2_right_bound,lob2_left_bound,True,True)
-                plot_cut(lob2_center,lob2_right_bound,lob2_left_bound,lob3_center,lob3_right_bound,lob3_left_bound,True,True)
-                plot_cut(lob1_center,lob1_right_bound,lob1_left_bound,lob3_center,lob3_right_bound,lob3_left_bound,True,True)
-            else:
-                # plot cuts without the CUT target icon
-                plot_cut(lob1_center,lob1_right_bound,lob1_left_bound,lob2_center,lob2_right_bound,lob2_left_bound,True,False)
-                plot_cut(lob2_center,lob2_right_bound,lob2_left_bound,lob3_center,lob3_right_bound,lob3_left_bound,True,False)
-                plot_cut(lob1_center,lob1_right_bound,lob1_left_bound,lob3_center,lob3_right_bound,lob3_left_bound,True,False)
             # define target classification
             self.target_class = '(FIX)'
             # set target label with updated target classification
             self.label_target_grid.configure(text=f'TARGET GRID {self.target_class}'.strip(),text_color='red')
-            fix_coord = get_center_coord(fix_polygon)
-            self.target_coord = fix_coord
+            self.target_coord = fix.target_coord
             self.target_mgrs = convert_coords_to_mgrs(self.target_coord)
-            self.sensor1_distance_val = int(get_distance_between_coords(self.sensor1_coord,self.target_coord))
-            self.sensor2_distance_val = int(get_distance_between_coords(self.sensor2_coord,self.target_coord))
-            self.sensor3_distance_val = int(get_distance_between_coords(self.sensor3_coord,self.target_coord))
-            self.target_error_val = get_polygon_area(fix_polygon)
-            fix_description = f"Target FIX at {format_readable_mgrs(self.target_mgrs)} with {self.target_error_val:,.0f} acres of error"
+            self.target_error_val = fix.error_acres
             fix_target_marker = self.map_widget.set_marker(
                 deg_x=self.target_coord[0], 
                 deg_y=self.target_coord[1],
@@ -2086,31 +1808,17 @@ class App(customtkinter.CTk):
                 data=f'TGT {self.target_class}\n{format_readable_mgrs(self.target_mgrs)}\nat {format_readable_DTG(generate_DTG())}')
             # add FIX marker to target marker list
             self.append_object(fix_target_marker,"TGT")
-            # generate sensor 1 distance from target text     
-            dist_sensor1_text = self.generate_sensor_distance_text(self.sensor1_distance_val)
-            # set sensor 1 distance field
-            self.sensor1_distance.configure(text=dist_sensor1_text,text_color='white')
-            # generate sensor 2 distance from target text       
-            dist_sensor2_text = self.generate_sensor_distance_text(self.sensor2_distance_val)
-            # set sensor 2 distance field
-            self.sensor2_distance.configure(text=dist_sensor2_text,text_color='white')
-            # set target grid field with CUT center MGRS
-            dist_sensor3_text = self.generate_sensor_distance_text(self.sensor3_distance_val)
-            # set sensor 2 distance field
-            self.sensor3_distance.configure(text=dist_sensor3_text,text_color='white')
-            # set target grid field with CUT center MGRS
+            # set target grid field with FIX center MGRS
             self.target_grid.configure(text=f'{format_readable_mgrs(self.target_mgrs)}',text_color='yellow')
             # set target error field
             self.target_error.configure(text=f'{self.target_error_val:,.0f} acres',text_color='white')
-            # set map position at CUT target 
+            # set map position at FIX target 
             self.map_widget.set_position(self.target_coord[0],self.target_coord[1])
-            # calculate the FIX error (in acres)
-            self.target_error_val = get_polygon_area(fix_polygon)
             # define sensor FIX description
             fix_description = f"Target FIX with {self.target_error_val:,.0f} acres of error"
-            # define and set CUT area
+            # define and set FIX area
             fix_area = self.map_widget.set_polygon(
-                position_list=fix_polygon,
+                position_list=fix.polygon,
                 fill_color=App.DEFAULT_VALUES['LOB Fill Color'],
                 outline_color=App.DEFAULT_VALUES['FIX Area Outline Color'],
                 border_width=App.DEFAULT_VALUES['Border Width'],
@@ -2126,154 +1834,73 @@ class App(customtkinter.CTk):
         self.sensor3_distance.configure(text='')
         self.target_error.configure(text='')
         self.target_class = ''; self.target_coord = None; self.target_mgrs = None
-        sensor1_lob_near_middle_coord = None; sensor2_lob_near_middle_coord = None; sensor3_lob_near_middle_coord = None
-        sensor1_lob_far_middle_coord = None; sensor2_lob_far_middle_coord = None; sensor3_lob_far_middle_coord = None
         # read the user input fields
         self.read_ewt_input_fields()
         # end function if there is no ewt data
         if self.sensor1_mgrs_val == None and self.sensor2_mgrs_val == None and self.sensor3_mgrs_val == None: return
         # end function if not all data fields were input
         if self.frequency_MHz_val == None or self.min_wattage_val == None or self.max_wattage_val == None: return
+        # define sensor numbers and reports for the targeting engine
+        sensor_nums = []; reports = []
         # if sensor 1 has non-None input values
         if self.sensor1_mgrs_val != None and self.sensor1_grid_azimuth_val != None and self.sensor1_power_received_dBm_val != None:
             # convert sensor 1 mgrs to coords
             self.sensor1_coord = convert_mgrs_to_coords(self.sensor1_mgrs_val)
-            # clear sensor 1 distance
-            self.sensor1_distance.configure(text='')
-            # calculate minimum distance from sensor 1 to TGT (in km)
-            self.sensor1_min_distance_km = get_emission_distance(self.min_wattage_val,self.frequency_MHz_val,self.transmitter_gain_dBi_val,self.sensor1_receiver_gain_dBi,self.sensor1_power_received_dBm_val,self.transmitter_height_m_val,self.sensor1_receiver_height_m_val,self.temp_f_val,self.path_loss_coeff_val,weather_coeff=4/3,pure_pathLoss=True)
-            # convert minimum distance from sensor 1 to TGT to meters
-            self.sensor1_min_distance_m = self.sensor1_min_distance_km * 1000
-            # calculate maximum distance from sensor 1 to TGT (in km)
-            self.sensor1_max_distance_km = get_emission_distance(self.max_wattage_val,self.frequency_MHz_val,self.transmitter_gain_dBi_val,self.sensor1_receiver_gain_dBi,self.sensor1_power_received_dBm_val,self.transmitter_height_m_val,self.sensor1_receiver_height_m_val,self.temp_f_val,self.path_loss_coeff_val,weather_coeff=4/3,pure_pathLoss=True)
-            # calculate minimum distance from sensor 1 to TGT (in km)
-            self.sensor1_max_distance_m = self.sensor1_max_distance_km * 1000
-            # calculate sensor 1 LOB boundaries
-            sensor1_lob_center, sensor1_lob_near_right_coord, sensor1_lob_near_left_coord, sensor1_lob_near_middle_coord, sensor1_lob_far_right_coord, sensor1_lob_far_left_coord, sensor1_lob_far_middle_coord, sensor1_center_coord_list = get_coords_from_LOBs(self.sensor1_coord,self.sensor1_grid_azimuth_val,self.sensor1_error,self.sensor1_min_distance_m,self.sensor1_max_distance_m)
-            # define sensor 1 LOB polygon
-            self.sensor1_lob_polygon = [sensor1_lob_near_right_coord,sensor1_lob_far_right_coord,sensor1_lob_far_left_coord,sensor1_lob_near_left_coord]
-            # organize sensor 1 LOB polygon points
-            self.sensor1_lob_polygon = organize_polygon_coords(self.sensor1_lob_polygon)
-            # define sensor 1 LOB backstop Line
-            self.sensor1_lob_backstop = get_line(sensor1_lob_far_right_coord,sensor1_lob_far_left_coord)
-            # define sensor 1 LOB's center line
-            lob1_center = get_line(self.sensor1_coord, sensor1_lob_far_middle_coord)
-            # define sensor 1 LOB's right-bound error line
-            lob1_right_bound = get_line(sensor1_lob_near_right_coord, sensor1_lob_far_right_coord)
-            # define sensor 1 LOB's left-bound error line
-            lob1_left_bound = get_line(sensor1_lob_near_left_coord, sensor1_lob_far_left_coord)
+            # define sensor 1 report
+            reports.append(SensorReport(self.sensor1_coord,self.sensor1_grid_azimuth_val,self.sensor1_power_received_dBm_val,self.sensor1_error,self.sensor1_receiver_gain_dBi,'EWT 1'))
+            sensor_nums.append(1)
         # if sensor 1 has None input values
         else:
             # set sensor 1 input values to None
-            self.sensor1_mgrs_val = None; self.sensor1_grid_azimuth_val = None; self.sensor1_power_received_dBm_val = None; self.sensor1_lob_polygon = None; self.sensor1_lob_backstop = None
+            self.sensor1_mgrs_val = None; self.sensor1_grid_azimuth_val = None; self.sensor1_power_received_dBm_val = None; self.sensor1_lob_polygon = None
         # if sensor 2 has non-None input values
         if self.sensor2_mgrs_val != None and self.sensor2_grid_azimuth_val != None and self.sensor2_power_received_dBm_val != None:
             # convert sensor 2 MGRS to coordinates
             self.sensor2_coord = convert_mgrs_to_coords(self.sensor2_mgrs_val)
-            # # set map position to the middle of sensor 1 and sensor 2
-            # self.map_widget.set_position(np.average([self.sensor1_coord[0],self.sensor2_coord[0]]),np.average([self.sensor1_coord[1],self.sensor2_coord[1]]))
-            # clear sensor 2 distance 
-            self.sensor2_distance.configure(text='')
-            # calculate sensor 2 minimum distance (in km)
-            self.sensor2_min_distance_km = get_emission_distance(self.min_wattage_val,self.frequency_MHz_val,self.transmitter_gain_dBi_val,self.sensor2_receiver_gain_dBi,self.sensor2_power_received_dBm_val,self.transmitter_height_m_val,self.sensor2_receiver_height_m_val,self.temp_f_val,self.path_loss_coeff_val,weather_coeff=4/3,pure_pathLoss=True)
-            # convert sensor 2 minimum distance to meters
-            self.sensor2_min_distance_m = self.sensor2_min_distance_km * 1000
-            # calculate sensor 2 maximum distance (in km)    
-            self.sensor2_max_distance_km = get_emission_distance(self.max_wattage_val,self.frequency_MHz_val,self.transmitter_gain_dBi_val,self.sensor2_receiver_gain_dBi,self.sensor2_power_received_dBm_val,self.transmitter_height_m_val,self.sensor2_receiver_height_m_val,self.temp_f_val,self.path_loss_coeff_val,weather_coeff=4/3,pure_pathLoss=True)
-            # convert sensor 2 maximum distance to meters
-            self.sensor2_max_distance_m = self.sensor2_max_distance_km * 1000
-            # calculate sensor 2 LOB boundaries
-            sensor2_lob_center, sensor2_lob_near_right_coord, sensor2_lob_near_left_coord, sensor2_lob_near_middle_coord, sensor2_lob_far_right_coord, sensor2_lob_far_left_coord, sensor2_lob_far_middle_coord, sensor2_center_coord_list = get_coords_from_LOBs(self.sensor2_coord,self.sensor2_grid_azimuth_val,self.sensor2_error,self.sensor2_min_distance_m,self.sensor2_max_distance_m)
-            # define sensor 2 LOB polygon
-            self.sensor2_lob_polygon = [sensor2_lob_near_right_coord,sensor2_lob_far_right_coord,sensor2_lob_far_left_coord,sensor2_lob_near_left_coord]
-            # organize sensor 2 LOB polygon
-            self.sensor2_lob_polygon = organize_polygon_coords(self.sensor2_lob_polygon)
-            # define sensor 2 LOB backstop Line
-            self.sensor2_lob_backstop = get_line(sensor2_lob_far_right_coord,sensor2_lob_far_left_coord)
-            # define sensor 2 LOB center-line
-            lob2_center = get_line(self.sensor2_coord, sensor2_lob_far_middle_coord)
-            # define sensor 2 LOB right-bound error line
-            lob2_right_bound = get_line(sensor2_lob_near_right_coord, sensor2_lob_far_right_coord)
-            # define sensor 2 LOB left-bound error line
-            lob2_left_bound = get_line(sensor2_lob_near_left_coord, sensor2_lob_far_left_coord)
+            # define sensor 2 report
+            reports.append(SensorReport(self.sensor2_coord,self.sensor2_grid_azimuth_val,self.sensor2_power_received_dBm_val,self.sensor2_error,self.sensor2_receiver_gain_dBi,'EWT 2'))
+            sensor_nums.append(2)
         # if sensor 2 has None input values
         else:
             # set sensor 2 input values to None
-            self.sensor2_mgrs_val = None; self.sensor2_grid_azimuth_val = None; self.sensor2_power_received_dBm_val = None; self.sensor2_lob_polygon = None; self.sensor2_lob_backstop = None
+            self.sensor2_mgrs_val = None; self.sensor2_grid_azimuth_val = None; self.sensor2_power_received_dBm_val = None; self.sensor2_lob_polygon = None
         # if sensor 3 has non-None input values 
         if self.sensor3_mgrs_val != None and self.sensor3_grid_azimuth_val != None and self.sensor3_power_received_dBm_val != None:
             # convert sensor 3 MGRS to coordinates
             self.sensor3_coord = convert_mgrs_to_coords(self.sensor3_mgrs_val)
-            # clear sensor 3 distance field
-            self.sensor3_distance.configure(text='')
-            # calculate sensor 3 minimum distance (in km)
-            self.sensor3_min_distance_km = get_emission_distance(self.min_wattage_val,self.frequency_MHz_val,self.transmitter_gain_dBi_val,self.sensor3_receiver_gain_dBi,self.sensor3_power_received_dBm_val,self.transmitter_height_m_val,self.sensor3_receiver_height_m_val,self.temp_f_val,self.path_loss_coeff_val,weather_coeff=4/3,pure_pathLoss=True)
-            # convert sensor 3 minimum distance to meters
-            self.sensor3_min_distance_m = self.sensor3_min_distance_km * 1000
-            # calculate sensor 3 maximum distance (in km)    
-            self.sensor3_max_distance_km = get_emission_distance(self.max_wattage_val,self.frequency_MHz_val,self.transmitter_gain_dBi_val,self.sensor3_receiver_gain_dBi,self.sensor3_power_received_dBm_val,self.transmitter_height_m_val,self.sensor3_receiver_height_m_val,self.temp_f_val,self.path_loss_coeff_val,weather_coeff=4/3,pure_pathLoss=True)
-            # convert sensor 3 maximum distance to meters
-            self.sensor3_max_distance_m = self.sensor3_max_distance_km * 1000
-            # calculate sensor 3 LOB boundaries
-            sensor3_lob_center, sensor3_lob_near_right_coord, sensor3_lob_near_left_coord, sensor3_lob_near_middle_coord, sensor3_lob_far_right_coord, sensor3_lob_far_left_coord, sensor3_lob_far_middle_coord, sensor3_center_coord_list = get_coords_from_LOBs(self.sensor3_coord,self.sensor3_grid_azimuth_val,self.sensor3_error,self.sensor3_min_distance_m,self.sensor3_max_distance_m)
-            # define sensor 3 LOB polygon
-            self.sensor3_lob_polygon = [sensor3_lob_near_right_coord,sensor3_lob_far_right_coord,sensor3_lob_far_left_coord,sensor3_lob_near_left_coord]
-            # organize sensor 3 LOB polygon
-            self.sensor3_lob_polygon = organize_polygon_coords(self.sensor3_lob_polygon)
-            # define sensor 3 LOB backstop Line
-            self.sensor3_lob_backstop = get_line(sensor3_lob_far_right_coord,sensor3_lob_far_left_coord)
-            # define sensor 3 LOB center-line
-            lob3_center = get_line(self.sensor3_coord, sensor3_lob_far_middle_coord)
-            # define sensor 3 LOB right-bound error line
-            lob3_right_bound = get_line(sensor3_lob_near_right_coord, sensor3_lob_far_right_coord)
-            # define sensor 3 LOB left-bound error line
-            lob3_left_bound = get_line(sensor3_lob_near_left_coord, sensor3_lob_far_left_coord)
+            # define sensor 3 report
+            reports.append(SensorReport(self.sensor3_coord,self.sensor3_grid_azimuth_val,self.sensor3_power_received_dBm_val,self.sensor3_error,self.sensor3_receiver_gain_dBi,'EWT 3'))
+            sensor_nums.append(3)
         # if sensor 3 has None input values
         else:
             # set sensor 3 input values to None
-            self.sensor3_mgrs_val = None; self.sensor3_grid_azimuth_val = None; self.sensor3_power_received_dBm_val = None; self.sensor3_lob_polygon = None; self.sensor3_lob_backstop = None
-        # assess which LOBs have intersections
-        ewt1_ewt2_intersection_bool = check_for_intersection(self.sensor1_coord,sensor1_lob_far_middle_coord,self.sensor2_coord,sensor2_lob_far_middle_coord)
-        ewt2_ewt3_intersection_bool = check_for_intersection(self.sensor2_coord,sensor2_lob_far_middle_coord,self.sensor3_coord,sensor3_lob_far_middle_coord)
-        ewt1_ewt3_intersection_bool = check_for_intersection(self.sensor1_coord,sensor1_lob_far_middle_coord,self.sensor3_coord,sensor3_lob_far_middle_coord)
-        # EWT 1 & 2 CUT, EWT 3 LOB (TOTAL 1 CUT, 1 LOB)
-        if ewt1_ewt2_intersection_bool and not ewt2_ewt3_intersection_bool and not ewt1_ewt3_intersection_bool:
-            plot_lobs(sensor1_lob_near_middle_coord,sensor1_lob_far_middle_coord,sensor2_lob_near_middle_coord,sensor2_lob_far_middle_coord,sensor3_lob_near_middle_coord,sensor3_lob_far_middle_coord,False,False,True)
-            plot_cut(lob1_center,lob1_right_bound,lob1_left_bound,lob2_center,lob2_right_bound,lob2_left_bound)
-        # EWT 2 & 3 CUT, EWT 1 LOB (TOTAL 1 CUT, 1 LOB)
-        elif not ewt1_ewt2_intersection_bool and ewt2_ewt3_intersection_bool and not ewt1_ewt3_intersection_bool:
-            plot_lobs(sensor1_lob_near_middle_coord,sensor1_lob_far_middle_coord,sensor2_lob_near_middle_coord,sensor2_lob_far_middle_coord,sensor3_lob_near_middle_coord,sensor3_lob_far_middle_coord,True,False,False)
-            plot_cut(lob2_center,lob2_right_bound,lob2_left_bound,lob3_center,lob3_right_bound,lob3_left_bound)
-        # EWT 1 & 3 CUT, EWT 2 LOB (TOTAL 1 CUT, 1 LOB)
-        elif not ewt1_ewt2_intersection_bool and not ewt2_ewt3_intersection_bool and ewt1_ewt3_intersection_bool:
-            plot_lobs(sensor1_lob_near_middle_coord,sensor1_lob_far_middle_coord,sensor2_lob_near_middle_coord,sensor2_lob_far_middle_coord,sensor3_lob_near_middle_coord,sensor3_lob_far_middle_coord,False,True,False)
-            plot_cut(lob1_center,lob1_right_bound,lob1_left_bound,lob3_center,lob3_right_bound,lob3_left_bound)
-        # EWT 1 & 2 CUT, EWT 2 & 3 NO CUT, EWT 1 & 3 CUT (TOTAL 2 CUT)
-        elif ewt1_ewt2_intersection_bool and not ewt2_ewt3_intersection_bool and ewt1_ewt3_intersection_bool:
-            plot_lobs(sensor1_lob_near_middle_coord,sensor1_lob_far_middle_coord,sensor2_lob_near_middle_coord,sensor2_lob_far_middle_coord,sensor3_lob_near_middle_coord,sensor3_lob_far_middle_coord,False,False,False)
-            plot_cut(lob1_center,lob1_right_bound,lob1_left_bound,lob2_center,lob2_right_bound,lob2_left_bound,True,True)
-            plot_cut(lob1_center,lob1_right_bound,lob1_left_bound,lob3_center,lob3_right_bound,lob3_left_bound,True,True)
-        # EWT 1 & 2 CUT, EWT 2 & 3 CUT, EWT 1 & 3 NO CUT (TOTAL 2 CUT)
-        elif ewt1_ewt2_intersection_bool and ewt2_ewt3_intersection_bool and not ewt1_ewt3_intersection_bool:
-            plot_lobs(sensor1_lob_near_middle_coord,sensor1_lob_far_middle_coord,sensor2_lob_near_middle_coord,sensor2_lob_far_middle_coord,sensor3_lob_near_middle_coord,sensor3_lob_far_middle_coord,False,False,False)
-            plot_cut(lob1_center,lob1_right_bound,lob1_left_bound,lob2_center,lob2_right_bound,lob2_left_bound,True,True)
-            plot_cut(lob2_center,lob2_right_bound,lob2_left_bound,lob3_center,lob3_right_bound,lob3_left_bound,True,True) 
-        # EWT 1 & 2 NO CUT, EWT 2 & 3 CUT, EWT 1 & 3 CUT (TOTAL 2 CUT)
-        elif not ewt1_ewt2_intersection_bool and ewt2_ewt3_intersection_bool and ewt1_ewt3_intersection_bool:
-            plot_lobs(sensor1_lob_near_middle_coord,sensor1_lob_far_middle_coord,sensor2_lob_near_middle_coord,sensor2_lob_far_middle_coord,sensor3_lob_near_middle_coord,sensor3_lob_far_middle_coord,False,False,False)
-            plot_cut(lob2_center,lob2_right_bound,lob2_left_bound,lob3_center,lob3_right_bound,lob3_left_bound,True,True)
-            plot_cut(lob1_center,lob1_right_bound,lob1_left_bound,lob3_center,lob3_right_bound,lob3_left_bound,True,True)
-        # No intersections between an EWT LOBs
-        elif not ewt1_ewt2_intersection_bool and not ewt2_ewt3_intersection_bool and not ewt1_ewt3_intersection_bool:
-            plot_lobs(sensor1_lob_near_middle_coord,sensor1_lob_far_middle_coord,sensor2_lob_near_middle_coord,sensor2_lob_far_middle_coord,sensor3_lob_near_middle_coord,sensor3_lob_far_middle_coord,True,True,True)
-            pass
-        # EWT 1, 2, & 3 INTERSECTION (TOTAL 1 FIX, 3 CUT)
-        elif ewt1_ewt2_intersection_bool and ewt2_ewt3_intersection_bool and ewt1_ewt3_intersection_bool:
-            plot_lobs(sensor1_lob_near_middle_coord,sensor1_lob_far_middle_coord,sensor2_lob_near_middle_coord,sensor2_lob_far_middle_coord,sensor3_lob_near_middle_coord,sensor3_lob_far_middle_coord,False,False,False)
-            plot_fix(lob1_center,lob1_right_bound,lob1_left_bound,lob2_center,lob2_right_bound,lob2_left_bound,lob3_center,lob3_right_bound,lob3_left_bound)
-        # Unexpected situation
-        else:
-            print("Unknown case in EW function")
+            self.sensor3_mgrs_val = None; self.sensor3_grid_azimuth_val = None; self.sensor3_power_received_dBm_val = None; self.sensor3_lob_polygon = None
+        # define emitter parameters
+        emitter_params = EmitterParameters(self.frequency_MHz_val,self.min_wattage_val,self.max_wattage_val,float(self.path_loss_coeff_val),self.transmitter_gain_dBi_val)
+        # compute the targeting solution
+        solution = solve(reports,emitter_params)
+        # map the LOB results to their sensor numbers
+        lob_results = dict(zip(sensor_nums,solution.lobs))
+        # set sensor LOB ranges and polygons
+        for sensor_num, lob in lob_results.items():
+            setattr(self,f'sensor{sensor_num}_min_distance_m',lob.min_distance_m)
+            setattr(self,f'sensor{sensor_num}_min_distance_km',lob.min_distance_m / 1000)
+            setattr(self,f'sensor{sensor_num}_max_distance_m',lob.max_distance_m)
+            setattr(self,f'sensor{sensor_num}_max_distance_km',lob.max_distance_m / 1000)
+            setattr(self,f'sensor{sensor_num}_lob_polygon',lob.polygon)
+        # plot the LOBs
+        plot_lobs(lob_results)
+        # plot the CUTs (with the CUT target icon unless there is a FIX)
+        for cut in solution.cuts:
+            plot_cut(cut,len(solution.cuts) > 1,solution.fix is None)
+        # plot the FIX
+        if solution.fix is not None:
+            plot_fix(solution.fix)
+        # set sensor distances to target
+        for sensor_num, lob in lob_results.items():
+            distance_val = int(solution.sensor_distances_m[lob.index])
+            setattr(self,f'sensor{sensor_num}_distance_val',distance_val)
+            getattr(self,f'sensor{sensor_num}_distance').configure(text=self.generate_sensor_distance_text(distance_val),text_color='white')
         self.set_target_field()
         # self.plot_EUD_position()
     
@@ -2855,19 +2482,23 @@ class App(customtkinter.CTk):
         # self.batch_download_radius.delete(0,END)
         # self.search_mgrs.delete(0,END)
         
-    def batch_download(self):
-        from utilities import check_internet_connection
-        if not check_internet_connection(): self.show_info("Function unavailable. No public internet connection.",box_title="Feature Unavailable",icon='info'); return
-        self.show_info("This function has been disabled by the dev",box_title="Function Disabled Notice",icon='info'); return
+    def get_batch_download_inputs(self,show_errors=True):
+        """
+        Reads the batch download center, radius and zoom range inputs
+
+        Parameters
+        ----------
+        show_errors : bool, optional
+            Display a warning for invalid inputs. The default is True.
+
+        Returns
+        -------
+        tuple or None
+            ([min_lon,min_lat,max_lon,max_lat], min_zoom, max_zoom), or None if an input is invalid.
+
+        """
         import re
         from utilities import check_coord_input, check_mgrs_input, convert_coords_to_mgrs, convert_mgrs_to_coords, get_coord_box
-        def append_cmd_to_queue(cmd,file_path=os.path.dirname(os.path.abspath(__file__))+"\\queue_files\\batch_tile_queue.csv"):
-            import csv
-            if cmd == "" or cmd == []: return
-            row_to_append = [cmd]
-            with open(file_path, mode='a', newline='') as file:
-                csv_writer = csv.writer(file)
-                csv_writer.writerow(row_to_append)
         # read center mgrs input
         center_mgrs = self.batch_download_center_mgrs.get().replace(" ","")
         # check if NOT a valid mgrs
@@ -2876,7 +2507,7 @@ class App(customtkinter.CTk):
             center_coord = self.correct_coord_input(center_mgrs)
             if not check_coord_input(center_coord):
                 # display input error warning
-                self.show_info("MGRS / coordiante input is invalid",box_title="Input Error",icon='warning')
+                if show_errors: self.show_info("MGRS / coordiante input is invalid",box_title="Input Error",icon='warning')
                 # end function
                 return
             # convert coordinate to mgrs string
@@ -2890,12 +2521,17 @@ class App(customtkinter.CTk):
         # check if zoom string is valid
         if zoom_string == '' or len(zoom_string) > 5 or re.search(r'[a-zA-Z]+', zoom_string):
             # display error upon invalid zoom string
-            self.show_info("Zoom range is invalid",box_title="Input Error",icon='warning')
+            if show_errors: self.show_info("Zoom range is invalid",box_title="Input Error",icon='warning')
             # end function
             return
         # define zoom range
-        min_zoom = min([int(x.strip()) for x in zoom_string.split('-')])
-        max_zoom = max([int(x.strip()) for x in zoom_string.split('-')])
+        try:
+            zoom_levels = [int(x.strip()) for x in zoom_string.split('-')]
+        except ValueError:
+            if show_errors: self.show_info("Zoom range is invalid",box_title="Input Error",icon='warning')
+            return
+        min_zoom = min(zoom_levels)
+        max_zoom = max(zoom_levels)
         if min_zoom < 0: min_zoom = 0
         if max_zoom > App.MAX_ZOOM: max_zoom = App.MAX_ZOOM
         # read radius input and determine if valid
@@ -2905,43 +2541,84 @@ class App(customtkinter.CTk):
         # if not valid
         except ValueError:
             # display error upon invalid radius input
-            self.show_info("Radius input is invalid",box_title="Input Error",icon='warning')
+            if show_errors: self.show_info("Radius input is invalid",box_title="Input Error",icon='warning')
             # end function
             return
-        # identify tile download filepath
-        get_tiles_file = os.path.join(self.src_directory, "get_tiles.py")
-        # identify remote tile API
-        tile_url = '"https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}.png"'
-        # identify number of threads dedicated to download
-        parallel_threads = 4
         # generate coordinate bbox from input
         coord_bbox = get_coord_box(center_coord,x_dist_m,y_dist_m)
         # string operation on coordinate bbox
-        coord_bbox = coord_bbox.replace(","," ").split()
-        # generate CLI command
-        cmd = f'python "{get_tiles_file}" "{tile_url}" "{self.tile_directory}" --extent {coord_bbox[0]} {coord_bbox[1]} {coord_bbox[2]} {coord_bbox[3]} --minzoom {min_zoom} --maxzoom {max_zoom} --parallel {parallel_threads}'
-        '''
-        
-        Alter queue append to send args, not entire command
-        Add a main function to estimate run time and a main fuction to give status on current batch download queue
-        gui function to do a popup on the batch download details and a verify 
-        
-        '''
-        append_cmd_to_queue(cmd)
-        # # generate command list
-        # cmd_list = ['python',f'"{get_tiles_file}"',f'"{tile_url}"',f'"{self.tile_directory}"','--extent','{coord_bbox[0]}',
-        #             '{coord_bbox[1]}','{coord_bbox[2]}','{coord_bbox[3]}','--minzoom','{min_zoom}','--maxzoom','{max_zoom}',
-        #             '--parallel','{parallel_threads}']
-        # def download_func(cmd_list):
-        #     # subprocess.Popen(cmd_list,start_new_session=True)
-        #     subprocess.run(cmd, shell=True, start_new_session=True)
-        # # run tile download command
-        # # subprocess.run(cmd, shell=True, start_new_session=True)
-        # from multiprocessing import Process
-        # proc_batch_download = Process(target=download_func,args=(cmd_list))
-        # # procs.append(proc_batch_download)
-        # proc_batch_download.start()
-        
+        coord_bbox = [float(x) for x in coord_bbox.split(",")]
+        return coord_bbox, min_zoom, max_zoom
+
+    def estimate_batch_download(self,event=None):
+        """
+        Updates the estimated download time of the batch download inputs
+
+        Parameters
+        ----------
+        event : tkinter event, optional
+            Entry event; the estimate is kept while the inputs are unchanged.
+            The default is None (always re-estimate).
+
+        Returns
+        -------
+        dict or None
+            Download estimate (see batch_jobs.estimate_download), or None if an
+            input is invalid or the estimate failed.
+
+        """
+        from batch_jobs import BATCH_REQUESTS_PER_SEC, estimate_download
+        try:
+            inputs = self.get_batch_download_inputs(show_errors=False)
+            # entry events fire on every "Return" / focus change: skip unchanged inputs
+            if event is not None and inputs is not None and inputs == self.batch_download_estimate_inputs: return self.batch_download_estimate
+            self.batch_download_estimate_inputs = inputs; self.batch_download_estimate = None
+            if inputs is None:
+                self.label_batch_download_time_estimate.configure(text="Est. Download Time: N/A")
+                return
+            coord_bbox, min_zoom, max_zoom = inputs
+            estimate = estimate_download(self.tile_directory,coord_bbox,min_zoom,max_zoom,requests_per_sec=BATCH_REQUESTS_PER_SEC)
+        except Exception as e:
+            # unreadable inputs, tile store or job journals
+            print(f"Batch download estimate failed: {e}")
+            self.batch_download_estimate_inputs = None
+            self.label_batch_download_time_estimate.configure(text="Est. Download Time: N/A")
+            return
+        self.batch_download_estimate = estimate
+        eta_min = estimate['eta_sec'] / 60
+        eta_string = f"{eta_min / 60:,.1f} hr" if eta_min >= 60 else f"{eta_min:,.0f} min" if eta_min >= 1 else f"{estimate['eta_sec']:,.0f} sec"
+        self.label_batch_download_time_estimate.configure(text=f"Est. Download Time: {eta_string} ({estimate['missing']:,} tiles, {estimate['bytes'] / 1024 / 1024:,.1f} MB)")
+        return estimate
+
+    def batch_download(self):
+        from utilities import check_internet_connection
+        if not check_internet_connection(): self.show_info("Function unavailable. No public internet connection.",box_title="Feature Unavailable",icon='info'); return
+        from batch_jobs import BATCH_REQUESTS_PER_SEC, create_job
+        inputs = self.get_batch_download_inputs()
+        if inputs is None: return
+        coord_bbox, min_zoom, max_zoom = inputs
+        # estimate the download before queueing it
+        estimate = self.estimate_batch_download()
+        if estimate is None:
+            self.show_info("Unable to estimate the batch download",box_title="Batch Download",icon='warning')
+            return
+        if estimate['missing'] == 0:
+            self.show_info("Every tile in the batch download area is already downloaded",box_title="Batch Download",icon='info')
+            return
+        # confirm the download with its estimate
+        from CTkMessagebox import CTkMessagebox
+        msgBox = CTkMessagebox(title="Batch Download", icon='question', options=['Queue Download','Cancel'],
+                               message=f"Zoom {min_zoom}-{max_zoom}: {estimate['missing']:,} of {estimate['tiles']:,} tiles missing\n"
+                                       f"{self.label_batch_download_time_estimate.cget('text')}")
+        if msgBox.get() != 'Queue Download': return
+        # identify remote tile API
+        tile_url = 'https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}.png'
+        # identify number of threads dedicated to download
+        parallel_threads = 4
+        # queue a resumable batch job (run by the batch tile download service)
+        job = create_job(tile_url,self.tile_directory,coord_bbox,min_zoom,max_zoom,parallel=parallel_threads,requests_per_sec=BATCH_REQUESTS_PER_SEC)
+        self.show_info(f"Batch download job {job.job_id} queued",box_title="Batch Download",icon='info')
+
     def marker_click(self,marker):
         if "TGT" in marker.data:
             self.show_info(msg=marker.data,box_title='TGT Data',icon='info')
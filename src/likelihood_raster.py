@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+
+"""
+Probability-density geolocation raster
+
+Evaluates the combined bearing likelihood (Gaussian in the angle error of each
+LOB) and range likelihood (flat between the min/max emission distances with
+Gaussian shoulders) over a raster around the sensors. The raster is split into
+row chunks that are evaluated on a process pool, and each chunk is reduced to a
+fixed-size summary (log-likelihood histogram and per-level extents), so
+memory is bounded by the chunk size rather than the raster size.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import os
+import numpy as np
+from geodesy import destination
+from local_frame import get_local_frame
+from polygon_clipping import SQ_METERS_PER_ACRE
+from targeting_engine import EmitterParameters, get_lob_distances_m
+
+# log-likelihood histogram range and resolution (cells below the floor carry ~e^-50 of the peak density)
+LOG_LIKELIHOOD_FLOOR = -50.0
+LOG_LIKELIHOOD_BINS = 500
+# default number of raster cells evaluated per chunk (~8 MB of float64 per work array)
+CHUNK_CELLS = 2 ** 20
+# range-bound shoulder width as a fraction of the bound distance
+RANGE_EDGE_FRACTION = 0.1
+# highest-density region probabilities reported by default
+HDR_LEVELS = (0.5, 0.9)
+
+@dataclass
+class HighDensityRegion:
+    """Smallest raster area containing a given share of the likelihood"""
+    probability: float
+    log_likelihood_threshold: float
+    area_acres: float
+    num_cells: int
+    bounds: tuple
+
+@dataclass
+class LikelihoodRaster:
+    """Summary (and optionally the cells) of a geolocation likelihood raster"""
+    bounds: tuple
+    resolution_m: float
+    shape: tuple
+    peak_coord: list
+    peak_log_likelihood: float
+    regions: list = field(default_factory=list)
+    log_likelihood: np.ndarray = None
+
+def _chunk_log_likelihood(sensors_xy, azimuths, sigmas, min_ranges, max_ranges, x, y):
+    # east/north offsets of every cell from every sensor: shape (sensors, rows, cols)
+    dx = x[None, None, :] - sensors_xy[:, 0, None, None]
+    dy = y[None, :, None] - sensors_xy[:, 1, None, None]
+    ranges = np.hypot(dx, dy)
+    bearing_error = (np.arctan2(dx, dy) - azimuths[:, None, None] + np.pi) % (2 * np.pi) - np.pi
+    log_likelihood = -0.5 * (bearing_error / sigmas[:, None, None]) ** 2
+    # flat inside the emission distance bounds, Gaussian shoulders outside
+    short = np.maximum(min_ranges[:, None, None] - ranges, 0) / (RANGE_EDGE_FRACTION * np.maximum(min_ranges[:, None, None], 1.0))
+    long = np.maximum(ranges - max_ranges[:, None, None], 0) / (RANGE_EDGE_FRACTION * max_ranges[:, None, None])
+    log_likelihood -= 0.5 * (short ** 2 + long ** 2)
+    return log_likelihood.sum(axis=0)
+
+def _chunk_axes(row0, rows, grid):
+    x = grid['x0'] + (np.arange(grid['cols']) + 0.5) * grid['resolution_m']
+    y = grid['y0'] + (np.arange(row0, row0 + rows) + 0.5) * grid['resolution_m']
+    return x, y
+
+def _find_chunk_peak(task) -> tuple:
+    row0, rows, grid, sensors = task
+    log_likelihood = _chunk_log_likelihood(*sensors, *_chunk_axes(row0, rows, grid))
+    peak = int(np.argmax(log_likelihood))
+    return float(log_likelihood.flat[peak]), row0 + peak // grid['cols'], peak % grid['cols']
+
+def _summarize_chunk(task) -> dict:
+    row0, rows, grid, sensors, peak_log_likelihood, keep_cells = task
+    # log-likelihood relative to the raster peak (<= 0)
+    log_likelihood = _chunk_log_likelihood(*sensors, *_chunk_axes(row0, rows, grid)) - peak_log_likelihood
+    # bin every cell by log-likelihood; each bin tracks its likelihood mass and row/col extents
+    bins = np.clip(((log_likelihood - LOG_LIKELIHOOD_FLOOR) / -LOG_LIKELIHOOD_FLOOR * LOG_LIKELIHOOD_BINS).astype(np.int64), -1, LOG_LIKELIHOOD_BINS - 1).ravel()
+    valid = (log_likelihood.ravel() >= LOG_LIKELIHOOD_FLOOR)
+    bins = bins[valid]
+    rows_index, cols_index = np.divmod(np.flatnonzero(valid), grid['cols'])
+    extents = _empty_extents()
+    np.minimum.at(extents[:, 0], bins, rows_index + row0)
+    np.minimum.at(extents[:, 1], bins, cols_index)
+    np.maximum.at(extents[:, 2], bins, rows_index + row0)
+    np.maximum.at(extents[:, 3], bins, cols_index)
+    return {'row0': row0,
+            'counts': np.bincount(bins, minlength=LOG_LIKELIHOOD_BINS),
+            'mass': np.bincount(bins, weights=np.exp(log_likelihood.ravel()[valid]), minlength=LOG_LIKELIHOOD_BINS),
+            'extents': extents,
+            'cells': log_likelihood.astype(np.float32) if keep_cells else None}
+
+def _empty_extents() -> np.ndarray:
+    # per-bin [min row, min col, max row, max col]
+    extents = np.empty((LOG_LIKELIHOOD_BINS, 4), dtype=np.int64)
+    extents[:, :2] = np.iinfo(np.int64).max
+    extents[:, 2:] = -1
+    return extents
+
+def get_raster_bounds(reports, params: EmitterParameters, margin=0.1) -> tuple:
+    """
+    Default raster bounds covering every sensor's maximum emission distance
+
+    Parameters
+    ----------
+    reports : list of SensorReport
+        Sensor reports.
+    params : EmitterParameters
+        Emitter parameters.
+    margin : float, optional
+        Extra fraction of the maximum distance added on each side. The default is 0.1.
+
+    Returns
+    -------
+    tuple
+        (south, west, north, east) in decimal degrees.
+
+    """
+    coords = np.array([r.coord for r in reports], dtype=float)
+    _, max_distances_m = get_lob_distances_m(reports, params)
+    # north, east, south and west extremes of each sensor's reach
+    lat, lon = destination(coords[:, None, 0], coords[:, None, 1], [0, 90, 180, 270], max_distances_m[:, None] * (1 + margin))
+    return float(lat.min()), float(lon.min()), float(lat.max()), float(lon.max())
+
+def compute_likelihood_raster(reports, params: EmitterParameters, bounds=None, resolution_m=10, hdr_levels=HDR_LEVELS,
+                              chunk_cells=CHUNK_CELLS, max_workers=None, keep_cells=False) -> LikelihoodRaster:
+    """
+    Evaluates the emitter location likelihood over a raster
+
+    Parameters
+    ----------
+    reports : list of SensorReport
+        Sensor reports; each report's error_deg is its 1-sigma bearing error.
+    params : EmitterParameters
+        Emitter parameters used for the min/max emission distances.
+    bounds : tuple, optional
+        (south, west, north, east) in decimal degrees. The default covers every
+        sensor's maximum emission distance (see get_raster_bounds).
+    resolution_m : float, optional
+        Raster cell size in meters. The default is 10.
+    hdr_levels : tuple of float, optional
+        Probabilities of the highest-density regions to report. The default is (0.5, 0.9).
+    chunk_cells : int, optional
+        Approximate number of cells evaluated per chunk. The default is 2**20.
+    max_workers : int, optional
+        Number of worker processes; 1 evaluates the chunks in this process.
+        The default is the number of CPUs.
+    keep_cells : bool, optional
+        Keep the full float32 log-likelihood raster relative to the peak
+        (row 0 is the southern edge). The default is False.
+
+    Returns
+    -------
+    LikelihoodRaster
+        Peak coordinate, highest-density regions and (optionally) the raster cells.
+
+    """
+    if len(reports) == 0: return None
+    if bounds is None: bounds = get_raster_bounds(reports, params)
+    south, west, north, east = bounds
+    # metric grid in a local frame centered on the raster, covering the corners of the bounds
+    frame = get_local_frame([(south + north) / 2, (west + east) / 2])
+    corners = frame.to_local([[south, west], [south, east], [north, west], [north, east]])
+    (x0, y0), (x1, y1) = corners.min(axis=0), corners.max(axis=0)
+    grid = {'x0': float(x0),
+            'y0': float(y0),
+            'cols': max(int(np.ceil((x1 - x0) / resolution_m)), 1),
+            'rows': max(int(np.ceil((y1 - y0) / resolution_m)), 1),
+            'resolution_m': float(resolution_m)}
+    coords = np.array([r.coord for r in reports], dtype=float)
+    min_ranges, max_ranges = get_lob_distances_m(reports, params)
+    sensors = (frame.to_local(coords),
+               np.radians(frame.local_azimuth(coords, [r.azimuth for r in reports])),
+               np.radians([r.error_deg for r in reports]),
+               np.asarray(min_ranges, dtype=float),
+               np.asarray(max_ranges, dtype=float))
+    # each chunk holds (sensors x rows x cols) work arrays
+    chunk_rows = max(int(chunk_cells // (grid['cols'] * len(reports))), 1)
+    row_ranges = [(row0, min(chunk_rows, grid['rows'] - row0)) for row0 in range(0, grid['rows'], chunk_rows)]
+    if max_workers is None: max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(row_ranges))
+    counts = np.zeros(LOG_LIKELIHOOD_BINS, dtype=np.int64)
+    mass = np.zeros(LOG_LIKELIHOOD_BINS)
+    extents = _empty_extents()
+    cells = np.empty((grid['rows'], grid['cols']), dtype=np.float32) if keep_cells else None
+    executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    # map yields in order, so at most a few chunk results are held at once
+    run = map if executor is None else lambda f, tasks: executor.map(f, tasks, chunksize=1)
+    try:
+        # first pass: raster peak (reference for the relative log-likelihood bins)
+        peak = max(run(_find_chunk_peak, [(row0, rows, grid, sensors) for row0, rows in row_ranges]), key=lambda p: p[0])
+        # second pass: likelihood mass and extents per log-likelihood bin
+        for summary in run(_summarize_chunk, [(row0, rows, grid, sensors, peak[0], keep_cells) for row0, rows in row_ranges]):
+            counts += summary['counts']
+            mass += summary['mass']
+            extents[:, :2] = np.minimum(extents[:, :2], summary['extents'][:, :2])
+            extents[:, 2:] = np.maximum(extents[:, 2:], summary['extents'][:, 2:])
+            if keep_cells: cells[summary['row0']:summary['row0'] + len(summary['cells'])] = summary['cells']
+    finally:
+        if executor is not None: executor.shutdown()
+    def cell_coord(row, col):
+        return frame.to_geodetic([grid['x0'] + (col + 0.5) * resolution_m, grid['y0'] + (row + 0.5) * resolution_m]).tolist()
+    # highest-density regions: accumulate bins from the most likely down
+    regions = []
+    cumulative_mass = np.cumsum(mass[::-1]) / max(mass.sum(), np.finfo(float).tiny)
+    for probability in hdr_levels:
+        k = min(int(np.searchsorted(cumulative_mass, probability)), LOG_LIKELIHOOD_BINS - 1)
+        included = slice(LOG_LIKELIHOOD_BINS - 1 - k, LOG_LIKELIHOOD_BINS)
+        num_cells = int(counts[included].sum())
+        if num_cells == 0: continue
+        row_min, col_min = extents[included, :2].min(axis=0)
+        row_max, col_max = extents[included, 2:].max(axis=0)
+        region_corners = np.array([cell_coord(row, col) for row in (row_min - 0.5, row_max + 0.5) for col in (col_min - 0.5, col_max + 0.5)])
+        regions.append(HighDensityRegion(probability=probability,
+                                         log_likelihood_threshold=float(LOG_LIKELIHOOD_FLOOR * (1 - included.start / LOG_LIKELIHOOD_BINS)),
+                                         area_acres=num_cells * resolution_m ** 2 / SQ_METERS_PER_ACRE,
+                                         num_cells=num_cells,
+                                         bounds=(*region_corners.min(axis=0).tolist(), *region_corners.max(axis=0).tolist())))
+    return LikelihoodRaster(bounds=tuple(bounds), resolution_m=float(resolution_m), shape=(grid['rows'], grid['cols']),
+                            peak_coord=cell_coord(peak[1], peak[2]), peak_log_likelihood=peak[0], regions=regions,
+                            log_likelihood=cells)
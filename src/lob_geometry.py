@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+
+import numpy as np
+from geodesy import destination
+
+def get_lob_wedges(sensor_coords, azimuths, errors, min_lob_lengths, max_lob_lengths) -> tuple:
+    """
+    Computes LOB wedge points for one or many sensors in a single vectorized pass
+
+    Parameters
+    ----------
+    sensor_coords : array-like of shape (N,2)
+        Sensor coordinates in [lat,lon] format.
+    azimuths : array-like of shape (N,)
+        LOB bearings in degrees.
+    errors : array-like of shape (N,)
+        Sensor bearing error in degrees (applied left and right of the LOB).
+    min_lob_lengths : array-like of shape (N,)
+        Near edge of each LOB in meters.
+    max_lob_lengths : array-like of shape (N,)
+        Far edge of each LOB in meters.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        (center, near_right, near_left, near_center, far_right, far_left, far_center),
+        each of shape (N,2) in [lat,lon] format.
+
+    """
+    sensor_coords = np.atleast_2d(np.asarray(sensor_coords, dtype=float))
+    lat = sensor_coords[:, 0]; lon = sensor_coords[:, 1]
+    azimuths = np.asarray(azimuths, dtype=float) % 360
+    errors = np.asarray(errors, dtype=float)
+    near = np.asarray(min_lob_lengths, dtype=float)
+    far = np.asarray(max_lob_lengths, dtype=float)
+    # stack the left / center / right bearings against the near / far ranges: shape (3,2,N)
+    bearings = np.stack([(azimuths - errors) % 360, azimuths, (azimuths + errors) % 360])[:, None, :]
+    ranges = np.stack([near * np.ones_like(azimuths), far * np.ones_like(azimuths)])[None, :, :]
+    dest_lat, dest_lon = destination(lat, lon, bearings, ranges)
+    points = np.stack([dest_lat, dest_lon], axis=-1)
+    near_left, far_left = points[0, 0], points[0, 1]
+    far_center = points[1, 1]
+    near_right, far_right = points[2, 0], points[2, 1]
+    near_center = (near_right + near_left) / 2
+    center = (near_right + near_left + far_right + far_left) / 4
+    return center, near_right, near_left, near_center, far_right, far_left, far_center
+
+def get_lob_center_line(sensor_coord, azimuth, max_lob_length, interval_m=30) -> np.ndarray:
+    """
+    Samples points along a LOB center line
+
+    Parameters
+    ----------
+    sensor_coord : list
+        Sensor coordinate in [lat,lon] format.
+    azimuth : float
+        LOB bearing in degrees.
+    max_lob_length : float
+        Length of the LOB in meters.
+    interval_m : float, optional
+        Spacing between samples in meters. The default is 30.
+
+    Returns
+    -------
+    np.ndarray
+        Center line samples of shape (N,2) in [lat,lon] format.
+
+    """
+    distances = np.arange(interval_m, max_lob_length + interval_m, interval_m, dtype=float)
+    dest_lat, dest_lon = destination(float(sensor_coord[0]), float(sensor_coord[1]), float(azimuth) % 360, distances)
+    return np.column_stack([dest_lat, dest_lon])
+
+def get_lob_coords(sensor_coord, azimuth, error, min_lob_length, max_lob_length, center_line=False) -> tuple:
+    """
+    Computes the LOB wedge points for a single sensor
+
+    Parameters
+    ----------
+    sensor_coord : list
+        Sensor coordinate in [lat,lon] format.
+    azimuth : float
+        LOB bearing in degrees.
+    error : float
+        Sensor bearing error in degrees.
+    min_lob_length : float
+        Near edge of the LOB in meters.
+    max_lob_length : float
+        Far edge of the LOB in meters.
+    center_line : bool, optional
+        Generate the center line samples. The default is False.
+
+    Returns
+    -------
+    tuple
+        (center, near_right, near_left, near_center, far_right, far_left, far_center, center_coord_list)
+        in [lat,lon] list format, where center_coord_list is an empty list unless center_line is TRUE.
+
+    """
+    wedge = get_lob_wedges([sensor_coord], [azimuth], [error], [min_lob_length], [max_lob_length])
+    coords = [[float(p[0, 0]), float(p[0, 1])] for p in wedge]
+    center_coord_list = get_lob_center_line(sensor_coord, azimuth, max_lob_length).tolist() if center_line else []
+    return (*coords, center_coord_list)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+
+"""
+Local metric frame for LOB / CUT / FIX geometry
+
+Projects [lat,lon] coordinates to east/north meters on the plane tangent to
+the earth at an origin (gnomonic projection, closed form). Great circles -
+and therefore LOB center lines and wedge edges - map to straight lines, so
+line intersections in the frame are exact and polygon areas are in square
+meters (scale error < 0.01% within 50 km of the origin). Points are projected
+once, all line/polygon work is done on NumPy arrays in meters, and results are
+converted back to [lat,lon] only for display.
+"""
+
+from functools import lru_cache
+import numpy as np
+from geodesy import EARTH_RADIUS_M, destination
+
+# decimal places used to key cached frames (~1cm)
+ORIGIN_KEY_DECIMALS = 7
+
+class LocalFrame:
+    """Gnomonic east/north (meters) frame tangent at an origin coordinate"""
+    def __init__(self, origin):
+        self.origin = [float(origin[0]), float(origin[1])]
+        self._lat0 = np.radians(self.origin[0]); self._lon0 = np.radians(self.origin[1])
+        self._sin_lat0 = np.sin(self._lat0); self._cos_lat0 = np.cos(self._lat0)
+
+    def to_local(self, coords) -> np.ndarray:
+        """
+        Projects [lat,lon] coordinates into the frame
+
+        Parameters
+        ----------
+        coords : array-like of shape (...,2)
+            Coordinates in [lat,lon] format.
+
+        Returns
+        -------
+        np.ndarray
+            East/north offsets in meters of shape (...,2).
+
+        """
+        coords = np.asarray(coords, dtype=float)
+        lat = np.radians(coords[..., 0]); d_lon = np.radians(coords[..., 1]) - self._lon0
+        cos_lat = np.cos(lat); sin_lat = np.sin(lat); cos_d_lon = np.cos(d_lon)
+        cos_c = self._sin_lat0 * sin_lat + self._cos_lat0 * cos_lat * cos_d_lon
+        east = EARTH_RADIUS_M * cos_lat * np.sin(d_lon) / cos_c
+        north = EARTH_RADIUS_M * (self._cos_lat0 * sin_lat - self._sin_lat0 * cos_lat * cos_d_lon) / cos_c
+        return np.stack([east, north], axis=-1)
+
+    def to_geodetic(self, xy) -> np.ndarray:
+        """
+        Converts frame offsets back to [lat,lon] coordinates
+
+        Parameters
+        ----------
+        xy : array-like of shape (...,2)
+            East/north offsets in meters.
+
+        Returns
+        -------
+        np.ndarray
+            Coordinates in [lat,lon] format of shape (...,2).
+
+        """
+        xy = np.asarray(xy, dtype=float)
+        east = xy[..., 0]; north = xy[..., 1]
+        rho = np.hypot(east, north)
+        c = np.arctan(rho / EARTH_RADIUS_M)
+        sin_c = np.sin(c); cos_c = np.cos(c)
+        # north / rho -> 0 at the origin (sin_c is 0 there as well)
+        north_over_rho = np.divide(north, rho, out=np.zeros_like(rho), where=rho > 0)
+        lat = np.arcsin(np.clip(cos_c * self._sin_lat0 + north_over_rho * sin_c * self._cos_lat0, -1.0, 1.0))
+        lon = self._lon0 + np.arctan2(east * sin_c, rho * self._cos_lat0 * cos_c - north * self._sin_lat0 * sin_c)
+        lon = (lon + np.pi) % (2 * np.pi) - np.pi
+        return np.stack([np.degrees(lat), np.degrees(lon)], axis=-1)
+
+    def local_azimuth(self, coords, azimuth_degrees) -> np.ndarray:
+        """
+        Frame heading of the great circle leaving a coordinate at an azimuth
+
+        True north at a point away from the origin is rotated in the frame, so
+        bearings are converted with this before any line work in meters.
+
+        Parameters
+        ----------
+        coords : array-like of shape (...,2)
+            Starting coordinates in [lat,lon] format.
+        azimuth_degrees : float or np.ndarray
+            True bearings in degrees from north.
+
+        Returns
+        -------
+        np.ndarray
+            Headings in degrees clockwise from the frame's north axis.
+
+        """
+        coords = np.asarray(coords, dtype=float)
+        # great circles are straight in the frame: any point along the LOB gives its heading
+        lat, lon = destination(coords[..., 0], coords[..., 1], azimuth_degrees, 1000.0)
+        offset = self.to_local(np.stack([lat, lon], axis=-1)) - self.to_local(coords)
+        return np.degrees(np.arctan2(offset[..., 0], offset[..., 1])) % 360
+
+@lru_cache(maxsize=64)
+def _get_frame(lat: float, lon: float) -> LocalFrame:
+    return LocalFrame([lat, lon])
+
+def get_local_frame(origin) -> LocalFrame:
+    """
+    Cached local frame at an origin coordinate
+
+    Parameters
+    ----------
+    origin : list of length 2
+        Frame origin in [lat,lon] format.
+
+    Returns
+    -------
+    LocalFrame
+        Shared frame for the (rounded) origin.
+
+    """
+    return _get_frame(round(float(origin[0]), ORIGIN_KEY_DECIMALS), round(float(origin[1]), ORIGIN_KEY_DECIMALS))
+
+def get_frame_for_coords(coords) -> LocalFrame:
+    """
+    Local frame centered on a set of coordinates
+
+    Parameters
+    ----------
+    coords : array-like of shape (...,2)
+        Coordinates in [lat,lon] format (e.g. sensors and LOB points).
+
+    Returns
+    -------
+    LocalFrame
+        Cached frame at the center of the coordinates' bounding box.
+
+    """
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    return get_local_frame((coords.min(axis=0) + coords.max(axis=0)) / 2)
@@ -1,18 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate, parsedate_to_datetime
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse
-from utilities import read_csv, write_csv
-import os, sys
+from tile_cache import CACHE_BUDGET_MB
+from tile_layers import DEFAULT_LAYER_NAME, TileLayer, get_layers
+from tile_metrics import ServerMetrics
+from tile_queue import get_tile_queue
+from tile_synthesis import synthesize_tile
+import mimetypes, os, shutil, sys, time
 
-def append_tile_to_queue(tile,file_path=os.path.dirname(os.path.abspath(__file__))+"\\queue_files\\dynamic_tile_queue.csv"):
+def append_tile_to_queue(tile,tile_queue=None,store=''):
     """
-    Appends tile row to queue csv file
+    Appends tile to the missing tile queue
 
     Parameters
     ----------
     tile : list
-        Tile data represented as a [z,y,x] list
-    file_path : str, optional
-        csv file path string. The default is os.path.dirname(os.path.abspath(__file__))+"\\queue_files\\dynamic_tile_queue.csv".
+        Tile data represented as a [z,x,y] list (tkintermapview URL order)
+    tile_queue : TileQueue, optional
+        Missing tile queue. The default is the shared queue in queue_files.
+    store : str, optional
+        Location of the tile store the download service writes the tile to.
+        The default is '' (the service's default tile directory).
 
     Returns
     -------
@@ -21,65 +30,296 @@ def append_tile_to_queue(tile,file_path=os.path.dirname(os.path.abspath(__file__
     """
     # end function if tile to append is blank
     if tile == "" or tile == []: return
-    # open csv file
-    if not os.path.isfile(file_path): 
-        with open(file_path, mode='w', newline=''):
-            print("Creating batch queue file...\n")
-    tile_data = {"Z":tile[0],
-                 "Y":tile[2],
-                 "X":tile[1]}
+    if tile_queue is None: tile_queue = get_tile_queue()
     # for tkintermapview, tile segment order is Z, X, Y !!!
-    # print('Tile Data: ',tile_data)
-    queue_data = read_csv(file_path)
-    queue_data.append(tile_data)
-    write_csv(file_path,queue_data)
+    tile_queue.put(tile[0], tile[1], tile[2], store=store)
+
+# tile image signatures (ESRI imagery saved as .png is usually JPEG)
+IMAGE_SIGNATURES = ((b'\x89PNG\r\n\x1a\n', 'image/png'),
+                    (b'\xff\xd8\xff', 'image/jpeg'),
+                    (b'GIF8', 'image/gif'))
+
+def get_tile_content_type(content: bytes, file_path: str) -> str:
+    """
+    Content type of a tile from its leading bytes (falls back to the file extension)
+
+    Parameters
+    ----------
+    content : bytes
+        Tile file contents.
+    file_path : str
+        Tile file path.
+
+    Returns
+    -------
+    str
+        MIME type of the tile.
+
+    """
+    for signature, content_type in IMAGE_SIGNATURES:
+        if content.startswith(signature): return content_type
+    if content[:4] == b'RIFF' and content[8:12] == b'WEBP': return 'image/webp'
+    content_type, _ = mimetypes.guess_type(file_path)
+    return content_type or 'application/octet-stream'
+
+class ThreadPoolHTTPServer(HTTPServer):
+    """
+    HTTP server that handles each connection on a bounded pool of worker threads
+    """
+    # allow a burst of tile loader connections to queue while workers are busy
+    request_queue_size = 128
+
+    def __init__(self, server_address, RequestHandlerClass, workers=32):
+        super().__init__(server_address, RequestHandlerClass)
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="map_server")
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
 
 class SimpleHTTPRequestHandler(BaseHTTPRequestHandler):
+    # persistent (keep-alive) connections: every response sends a Content-Length
+    protocol_version = "HTTP/1.1"
+    # close idle keep-alive connections so they do not hold a worker thread
+    timeout = 5
+    # headers and body are separate writes: avoid Nagle / delayed-ACK stalls on keep-alive connections
+    disable_nagle_algorithm = True
+    # named tile layers (store, tile cache, stand-in synthesis, prefetcher) shared by all worker threads (set by run)
+    layers = {}
+    # layer served at /{z}/{x}/{y}.png (set by run)
+    default_layer = None
+    # request counters and latency histograms served on /metrics and /stats (set by run)
+    metrics = None
+    # client cache lifetime of served tiles
+    max_age_sec = 86400
+
+    def log_message(self, format, *args):
+        # per-request logging to stderr is too slow for tile bursts
+        pass
+
     def do_GET(self):
+        self.route_request()
+
+    def do_HEAD(self):
+        self.route_request()
+
+    def route_request(self):
+        path = urlparse(self.path).path
+        # instrumentation endpoints
+        if path in ('/metrics', '/stats'):
+            self.send_metrics(prometheus=path == '/metrics')
+            return
+        start = time.perf_counter()
+        self.response_status = None; self.response_bytes = 0; self.tile_zoom = None; self.tile_source = None
+        self.send_tile()
+        metrics = SimpleHTTPRequestHandler.metrics
+        if metrics is not None and self.response_status is not None: metrics.record(self.response_status, time.perf_counter() - start, self.response_bytes, self.tile_zoom, self.tile_source)
+
+    def send_response(self, code, message=None):
+        # remember the status for the request metrics
+        self.response_status = code
+        super().send_response(code, message)
+
+    def send_body(self, content: bytes):
+        self.wfile.write(content)
+        self.response_bytes += len(content)
+
+    def send_metrics(self, prometheus=True):
+        # request metrics with the per-layer cache / prefetch and queue figures collected now
+        layer_stats = {name: layer.stats() for name, layer in SimpleHTTPRequestHandler.layers.items()}
+        try:
+            queue_backlog = len(get_tile_queue())
+        except Exception:
+            queue_backlog = None
+        metrics = SimpleHTTPRequestHandler.metrics
+        if metrics is None: metrics = SimpleHTTPRequestHandler.metrics = ServerMetrics()
+        if prometheus:
+            content = metrics.to_prometheus(layer_stats, queue_backlog).encode()
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            content = metrics.to_json(layer_stats, queue_backlog).encode()
+            content_type = 'application/json'
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        if self.command != 'HEAD': self.wfile.write(content)
+
+    def send_tile(self):
         parsed_url = urlparse(self.path)
         path = parsed_url.path
-        # remove leading slash to get the file path
+        # remove leading slash to get the tile path
         if path.startswith("/"):
             path = path[1:]
-        # check if the file exists within the specified directory
-        file_path = os.path.join(SimpleHTTPRequestHandler.directory, path)
-        # check if requested filepath exists
-        if os.path.exists(file_path) and os.path.isfile(file_path):
-            # open and read the requested file
-            with open(file_path, 'rb') as file:
-                content = file.read()
-            # send HTTP OK response
-            self.send_response(200)
-            # set content header request
-            self.send_header('Content-type', 'application/octet-stream')
-            # send end content header
-            self.end_headers()
-            # send requested file as HTTP content
-            self.wfile.write(content)
+        # identify requested tile from request ({layer}/z/x/y.png or z/x/y.png URL path)
+        tile_zxy = path.split('.')[0].split('/')
+        if SimpleHTTPRequestHandler.default_layer is None:
+            SimpleHTTPRequestHandler.default_layer = TileLayer(DEFAULT_LAYER_NAME, SimpleHTTPRequestHandler.directory)
+            SimpleHTTPRequestHandler.layers = {DEFAULT_LAYER_NAME: SimpleHTTPRequestHandler.default_layer}
+        if len(tile_zxy) == 4:
+            layer = SimpleHTTPRequestHandler.layers.get(tile_zxy[0])
+            tile_zxy = tile_zxy[1:]
+        else:
+            layer = SimpleHTTPRequestHandler.default_layer
+        if layer is None or len(tile_zxy) != 3 or not all(t.isdigit() for t in tile_zxy):
+            # not a tile request of a served layer
+            self.send_not_found()
+            return
+        z, x, y = (int(t) for t in tile_zxy)
+        self.tile_zoom = z
+        # feed the access pattern to the layer's prefetcher
+        if layer.prefetcher is not None: layer.prefetcher.observe(z, x, y)
+        store = layer.store
+        # serve hot tiles from the layer's in-memory tile cache
+        cache = layer.cache
+        tile = cache.lookup((z, x, y), lambda: store.tile_version(z, x, y))
+        if tile is not None:
+            content, mtime_ns = tile
+            self.tile_source = 'cache'
+            # send requested tile as HTTP content
+            if self.send_tile_headers(content[:16], path, len(content), mtime_ns): self.send_body(content)
+            return
+        file_path = store.tile_path(z, x, y)
+        if file_path is None:
+            # tiles inside a database (MBTiles): read the tile into memory
+            tile = store.get_tile(z, x, y)
+            if tile is not None:
+                content, mtime_ns = tile
+                cache.put((z, x, y), content, mtime_ns)
+                self.tile_source = 'store'
+                if self.send_tile_headers(content[:16], path, len(content), mtime_ns): self.send_body(content)
+                return
+            file = None
+        else:
+            try:
+                file = open(file_path, 'rb')
+            except (FileNotFoundError, IsADirectoryError, NotADirectoryError, PermissionError):
+                file = None
+        if file is not None:
+            with file:
+                stat = os.fstat(file.fileno())
+                self.tile_source = 'store'
+                if cache.admits((z, x, y), stat.st_size):
+                    # tile requested again: read it once into the cache
+                    content = file.read()
+                    cache.put((z, x, y), content, stat.st_mtime_ns)
+                    if self.send_tile_headers(content[:16], file_path, len(content), stat.st_mtime_ns): self.send_body(content)
+                else:
+                    # first request (or a tile too large to cache): stream the file to the socket without copying it
+                    if self.send_tile_headers(file.read(16), file_path, stat.st_size, stat.st_mtime_ns): self.send_file(file, stat.st_size)
+        else:
+            # stand-in imagery from stored ancestor / child tiles, or 404
+            if not self.send_synthesized_tile(layer, z, x, y): self.send_not_found()
+            # append missing tile to missing tile queue (layers the download service fetches)
+            if layer.tile_queue is not None: append_tile_to_queue(tile_zxy, layer.tile_queue, layer.location)
+
+    def send_synthesized_tile(self, layer, z, x, y) -> bool:
+        # sends a stand-in for a missing tile, returns False if none can be made
+        if not layer.synthesize: return False
+        synthetic_cache = layer.synthetic_cache
+        # stand-ins expire after revalidate_sec so they are rebuilt from newer imagery
+        tile = synthetic_cache.lookup((z, x, y), lambda: None)
+        if tile is not None:
+            content = tile[0]; method = 'cached'
         else:
-            # send HTTP Bad Request response
-            self.send_response(404)
-            # send end content header
+            synthesized = synthesize_tile(layer.store, z, x, y)
+            if synthesized is None: return False
+            content, _, method = synthesized
+            synthetic_cache.put((z, x, y), content, 0)
+        self.send_response(200)
+        self.send_header('Content-Type', get_tile_content_type(content[:16], ''))
+        self.send_header('Content-Length', str(len(content)))
+        # the real tile replaces the stand-in once downloaded: never cache it
+        self.send_header('Cache-Control', 'no-store')
+        self.send_header('X-Tile-Synthesized', method)
+        self.end_headers()
+        self.tile_source = 'synthesized'
+        if self.command != 'HEAD': self.send_body(content)
+        return True
+
+    def send_not_found(self):
+        # send HTTP Not Found response
+        self.send_response(404)
+        self.send_header('Content-Length', '0')
+        # missing tiles may be downloaded at any time: never cache the 404
+        self.send_header('Cache-Control', 'no-store')
+        # send end content header
+        self.end_headers()
+
+    def send_tile_headers(self, head: bytes, file_path, size, mtime_ns) -> bool:
+        # sends the 200 / 304 response headers, returns whether a body should follow
+        # cheap validators from the file modification time and size
+        etag = f'"{mtime_ns:x}-{size:x}"'
+        last_modified = formatdate(mtime_ns / 1e9, usegmt=True)
+        # answer conditional requests for unchanged tiles without a body
+        if self.is_not_modified(etag, mtime_ns):
+            self.send_response(304)
+            self.send_validator_headers(etag, last_modified)
             self.end_headers()
-            # identify missing tile from request
-            missing_tile = file_path.split('\\')[-1].split('.')[0].split('/')
-            # loop through missing tile to verify components
-            for mt in missing_tile:
-                # check if tile component is less than zero / invalid
-                if int(mt) < 0:
-                    # end function
-                    return
-            # append missing tile to missing tile queue
-            append_tile_to_queue(missing_tile)
-
-def run(server_class=HTTPServer, handler_class=SimpleHTTPRequestHandler, host="localhost", port=1234, directory="."):
+            return False
+        # send HTTP OK response
+        self.send_response(200)
+        # set content header request
+        self.send_header('Content-Type', get_tile_content_type(head, file_path))
+        self.send_header('Content-Length', str(size))
+        self.send_validator_headers(etag, last_modified)
+        # send end content header
+        self.end_headers()
+        return self.command != 'HEAD'
+
+    def send_file(self, file, size):
+        # zero-copy sendfile where the platform supports it (socket.sendfile falls back to send() itself)
+        if hasattr(self.connection, 'sendfile'):
+            self.connection.sendfile(file, offset=0, count=size)
+        else:
+            # buffered copy for connections that are not plain sockets
+            file.seek(0)
+            shutil.copyfileobj(file, self.wfile)
+        self.response_bytes += size
+
+    def send_validator_headers(self, etag, last_modified):
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        self.send_header('Cache-Control', f'public, max-age={SimpleHTTPRequestHandler.max_age_sec}')
+
+    def is_not_modified(self, etag, mtime_ns) -> bool:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            candidates = [t.strip().removeprefix('W/') for t in if_none_match.split(',')]
+            return '*' in candidates or etag in candidates
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None: return False
+            # HTTP dates have one-second resolution
+            return mtime_ns // 1_000_000_000 <= int(since.timestamp())
+        return False
+
+def run(server_class=ThreadPoolHTTPServer, handler_class=SimpleHTTPRequestHandler, host="localhost", port=1234, directory=".", workers=32, cache_mb=CACHE_BUDGET_MB, synthesize=True, prefetch=True):
     """
     Run HTTP Map Tile Server with dynamic missing tile identifer
 
     Parameters
     ----------
     server_class : class object, optional
-        The default is HTTPServer.
+        The default is ThreadPoolHTTPServer.
     handler_class : class object, optional
         The default is SimpleHTTPRequestHandler.
     host : str, optional
@@ -87,7 +327,22 @@ def run(server_class=HTTPServer, handler_class=SimpleHTTPRequestHandler, host="l
     port : int, optional
         Logical port to map server. The default is 1234.
     directory : str, optional
-        Base directory of HTTP server. The default is ".".
+        Tile directory (z/x/y.png) or MBTiles file served by the HTTP server, or
+        several layers as comma separated name=location pairs or a JSON layer
+        file (see tile_layers). The default is ".".
+    workers : int, optional
+        Number of worker threads serving connections concurrently. The default is 32.
+    cache_mb : float, optional
+        Memory budget of the in-memory tile caches in MB, split between layers
+        without their own budget; tile files are read into the cache when they
+        are requested again, and streamed from disk with sendfile otherwise.
+        The default is 256.
+    synthesize : bool, optional
+        Serve missing tiles as stand-ins made from stored ancestor / child tiles
+        (requires Pillow). The default is True.
+    prefetch : bool, optional
+        Warm the tile cache (and queue downloads) around the map viewport and
+        at the next zoom level in a background thread. The default is True.
 
     Returns
     -------
@@ -96,14 +351,35 @@ def run(server_class=HTTPServer, handler_class=SimpleHTTPRequestHandler, host="l
     """
     # set base directory
     SimpleHTTPRequestHandler.directory = directory
+    # set tile layers (each with its own store, tile cache budget, stand-in synthesis and prefetcher)
+    layers = get_layers(directory, cache_mb=cache_mb, synthesize=synthesize, prefetch=prefetch)
+    handler_class.layers = {layer.name: layer for layer in layers}
+    handler_class.default_layer = layers[0]
+    for layer in layers: layer.start()
+    # set request metrics (/metrics and /stats)
+    handler_class.metrics = ServerMetrics()
     # set server network attributes
     server_address = (host, port)
     # set HTTP server structure
-    httpd = server_class(server_address, handler_class)
+    if issubclass(server_class, ThreadPoolHTTPServer):
+        httpd = server_class(server_address, handler_class, workers=workers)
+    else:
+        httpd = server_class(server_address, handler_class)
     # display that HTTP server is operational
-    print(f"Server running on {host}:{port}, serving files from directory: {directory}")
+    print(f"Server running on {host}:{port} with {workers} workers")
+    for layer in layers:
+        print(f"Layer '{layer.name}'{' (default)' if layer is layers[0] else ''}: {layer.cache_mb:,.0f} MB tile cache, serving tiles from: {layer.location}")
     # start HTTP server
-    httpd.serve_forever()
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        # display tile cache hit/miss and prefetch counters
+        for layer in layers:
+            layer.close()
+            print(f"Layer '{layer.name}': {layer.stats()}")
 
 if __name__ == "__main__":
     # checks for command-line arguments and set defaults, as required
@@ -119,8 +395,18 @@ if __name__ == "__main__":
         directory = sys.argv[3]
     else:
         directory = "."
+    if len(sys.argv) > 4:
+        workers = int(sys.argv[4])
+    else:
+        workers = 32
+    if len(sys.argv) > 5:
+        cache_mb = float(sys.argv[5])
+    else:
+        cache_mb = CACHE_BUDGET_MB
     # initiates map server
-    run(host=host, port=port, directory=directory)
+    run(host=host, port=port, directory=directory, workers=workers, cache_mb=cache_mb)
 
 # example CLI command
-# python map_server.py localhost 1234 ../map_tiles/ESRI
\ No newline at end of file
+# python map_server.py localhost 1234 ../map_tiles/ESRI 32 256
+# python map_server.py localhost 1234 ../map_tiles/ESRI.mbtiles 32 256
+# python map_server.py localhost 1234 imagery=../map_tiles/ESRI,topo=../map_tiles/topo.mbtiles 32 256
\ No newline at end of file
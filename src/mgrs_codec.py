@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+
+from functools import lru_cache
+import mgrs
+import numpy as np
+
+# maximum number of cached conversions (per direction)
+CACHE_SIZE = 4096
+# decimal places used to key coordinates (~1cm, finer than 1m MGRS precision)
+COORD_KEY_DECIMALS = 7
+
+# shared MGRS converter (avoids building a new object on every conversion)
+_MGRS = mgrs.MGRS()
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _encode(lat: float, lon: float, precision: int) -> str:
+    return str(_MGRS.toMGRS(lat, lon, MGRSPrecision=precision)).strip()
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _decode(milGrid: str) -> tuple:
+    return tuple(_MGRS.toLatLon(milGrid.encode()))
+
+def coords_to_mgrs(coords, precision: int = 5) -> str:
+    """
+    Convert a [lat,lon] coordinate to MGRS using the cached codec
+
+    Parameters
+    ----------
+    coords : list of length 2
+        Grid coordinate. Example: [lat,long].
+    precision : int, optional
+        Significant figures per easting/northing value. The default is 5.
+
+    Returns
+    -------
+    str
+        Location in MGRS notation.
+
+    """
+    return _encode(round(float(coords[0]), COORD_KEY_DECIMALS), round(float(coords[1]), COORD_KEY_DECIMALS), int(precision))
+
+def mgrs_to_coords(milGrid: str) -> list:
+    """
+    Convert an MGRS string to a [lat,lon] coordinate using the cached codec
+
+    Parameters
+    ----------
+    milGrid : str
+        Location in MGRS notation.
+
+    Returns
+    -------
+    list
+        Grid coordinate. Example: [lat,long].
+
+    """
+    return list(_decode(milGrid.replace(" ", "").strip()))
+
+def coords_to_mgrs_batch(coords, precision: int = 5) -> list:
+    """
+    Convert an array of [lat,lon] coordinates to MGRS in one call
+
+    Duplicate coordinates are converted once.
+
+    Parameters
+    ----------
+    coords : array-like of shape (N,2)
+        Grid coordinates in [lat,lon] format.
+    precision : int, optional
+        Significant figures per easting/northing value. The default is 5.
+
+    Returns
+    -------
+    list of str
+        Locations in MGRS notation, in input order.
+
+    """
+    coords = np.round(np.asarray(coords, dtype=float).reshape(-1, 2), COORD_KEY_DECIMALS)
+    if len(coords) == 0: return []
+    unique_coords, inverse = np.unique(coords, axis=0, return_inverse=True)
+    unique_grids = [_encode(float(lat), float(lon), int(precision)) for lat, lon in unique_coords]
+    return [unique_grids[i] for i in inverse.ravel()]
+
+def mgrs_to_coords_batch(milGrids) -> np.ndarray:
+    """
+    Convert a sequence of MGRS strings to coordinates in one call
+
+    Duplicate grids are converted once.
+
+    Parameters
+    ----------
+    milGrids : iterable of str
+        Locations in MGRS notation.
+
+    Returns
+    -------
+    np.ndarray
+        Grid coordinates of shape (N,2) in [lat,lon] format, in input order.
+
+    """
+    grids = [str(g).replace(" ", "").strip() for g in milGrids]
+    lookup = {g: _decode(g) for g in dict.fromkeys(grids)}
+    return np.array([lookup[g] for g in grids], dtype=float).reshape(-1, 2)
+
+def cache_info() -> dict:
+    """
+    Reports the encode/decode cache statistics
+
+    Returns
+    -------
+    dict
+        lru_cache statistics for the encode and decode caches.
+
+    """
+    return {'encode': _encode.cache_info()._asdict(), 'decode': _decode.cache_info()._asdict()}
+
+def clear_cache() -> None:
+    """
+    Clears the encode/decode caches
+
+    Returns
+    -------
+    None.
+
+    """
+    _encode.cache_clear()
+    _decode.cache_clear()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+
+"""
+Monte Carlo uncertainty of LOB / CUT / FIX solutions
+
+Perturbs the bearings, sensor positions and ERP bounds of a set of sensor
+reports in large NumPy batches, intersects every perturbed set of LOBs at once
+(batched least squares in a local east/north frame) and reports CEP50/CEP90
+and an error ellipse for the solution. The ERP bounds only constrain CUT / FIX
+samples when range enforcement is requested. Large sample counts are split into
+batches that run on a process pool.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import os
+import numpy as np
+from fix_solver import confidence_scale
+from local_frame import get_frame_for_coords
+from propagation import range_bounds
+from targeting_engine import EmitterParameters
+
+# default number of samples
+NUM_SAMPLES = 100000
+# samples evaluated per batch (bounds the (samples x sensors) work arrays)
+BATCH_SIZE = 25000
+
+@dataclass
+class UncertaintyEstimate:
+    """Monte Carlo error statistics of a targeting solution"""
+    target_coord: list
+    cep50_m: float
+    cep90_m: float
+    ellipse: dict
+    num_samples: int
+    num_valid: int
+
+def _sample_batch(task) -> np.ndarray:
+    seed, num_samples, sensors, params, position_error_m, erp_error_dB, enforce_range = task
+    sensors_xy, azimuths, sigmas, power_received, receiver_gain = sensors
+    rng = np.random.default_rng(seed)
+    num_sensors = len(azimuths)
+    # perturbed sensor positions and bearings: shape (samples, sensors)
+    positions = sensors_xy + rng.normal(0, position_error_m, (num_samples, num_sensors, 2))
+    theta = azimuths + rng.normal(0, 1, (num_samples, num_sensors)) * sigmas
+    # perturbed ERP bounds (log-normal, in dB) and the resulting range bounds
+    erp_scale = 10 ** (rng.normal(0, erp_error_dB, (num_samples, 2)) / 10)
+    min_ranges_km, max_ranges_km = range_bounds(params.min_erp_watts * erp_scale[:, :1], params.max_erp_watts * erp_scale[:, 1:], params.frequency_MHz,
+                                                params.transmitter_gain_dBi, receiver_gain, power_received, params.path_loss_coeff)
+    min_ranges = min_ranges_km * 1000; max_ranges = max_ranges_km * 1000
+    direction = np.stack([np.sin(theta), np.cos(theta)], axis=-1)
+    if num_sensors == 1:
+        # single LOB: uniform along the perturbed LOB between the perturbed range bounds
+        distance = rng.uniform(min_ranges, max_ranges)
+        return positions[:, 0] + direction[:, 0] * distance
+    # batched least-squares intersection of the perturbed LOBs
+    normals = np.stack([np.cos(theta), -np.sin(theta)], axis=-1)
+    weights = 1 / sigmas ** 2
+    nnT = normals[..., :, None] * normals[..., None, :]
+    A = np.einsum('n,snij->sij', weights, nnT)
+    b = np.einsum('n,snij,snj->si', weights, nnT, positions)
+    determinant = A[:, 0, 0] * A[:, 1, 1] - A[:, 0, 1] * A[:, 1, 0]
+    valid = np.abs(determinant) > 1e-12 * (A[:, 0, 0] + A[:, 1, 1]) ** 2
+    determinant = np.where(valid, determinant, 1)
+    fixes = np.stack([(A[:, 1, 1] * b[:, 0] - A[:, 0, 1] * b[:, 1]) / determinant,
+                      (A[:, 0, 0] * b[:, 1] - A[:, 1, 0] * b[:, 0]) / determinant], axis=-1)
+    # reject intersections behind a sensor (and outside the range bounds if enforced)
+    offsets = fixes[:, None, :] - positions
+    valid &= (np.einsum('sni,sni->sn', offsets, direction) > 0).all(axis=1)
+    if enforce_range:
+        ranges = np.hypot(offsets[..., 0], offsets[..., 1])
+        valid &= ((ranges >= min_ranges) & (ranges <= max_ranges)).all(axis=1)
+    return fixes[valid]
+
+def estimate_uncertainty(reports, params: EmitterParameters, num_samples=NUM_SAMPLES, position_error_m=10, erp_error_dB=1,
+                         enforce_range=False, batch_size=BATCH_SIZE, max_workers=None, seed=None) -> (UncertaintyEstimate,None):
+    """
+    Monte Carlo CEP and error ellipse of the LOB / CUT / FIX solution of a set of reports
+
+    Parameters
+    ----------
+    reports : list of SensorReport
+        Sensor reports; each report's error_deg is its 1-sigma bearing error.
+    params : EmitterParameters
+        Emitter parameters.
+    num_samples : int, optional
+        Number of Monte Carlo samples. The default is 100000.
+    position_error_m : float, optional
+        1-sigma sensor position error (per axis) in meters. The default is 10.
+    erp_error_dB : float, optional
+        1-sigma error of the ERP bounds in dB. It spreads single-LOB samples
+        along the LOB; CUT / FIX samples only depend on it with enforce_range.
+        The default is 1.
+    enforce_range : bool, optional
+        Reject CUT / FIX samples outside any sensor's perturbed emission distance
+        bounds. Without it, CUT / FIX estimates are purely geometric (bearing and
+        position errors) and ignore the ERP uncertainty. The default is False.
+    batch_size : int, optional
+        Samples evaluated per batch. The default is 25000.
+    max_workers : int, optional
+        Number of worker processes; 1 evaluates the batches in this process.
+        The default is the number of CPUs.
+    seed : int, optional
+        Random seed for reproducible estimates. The default is None.
+
+    Returns
+    -------
+    UncertaintyEstimate or None
+        Mean target coordinate, CEP50/CEP90 (meters, about the mean) and the
+        error ellipse at 50% and 90% confidence; None if there are no reports
+        or no valid samples.
+
+    Raises
+    ------
+    ValueError
+        num_samples or batch_size is less than 1.
+
+    """
+    if num_samples < 1 or batch_size < 1: raise ValueError(f'num_samples and batch_size must be at least 1: {num_samples}, {batch_size}')
+    if len(reports) == 0: return None
+    coords = np.array([r.coord for r in reports], dtype=float)
+    frame = get_frame_for_coords(coords)
+    sensors = (frame.to_local(coords),
+               np.radians(frame.local_azimuth(coords, [r.azimuth for r in reports])),
+               np.radians([r.error_deg for r in reports]),
+               np.array([r.power_received_dBm for r in reports], dtype=float),
+               np.array([r.receiver_gain_dBi for r in reports], dtype=float))
+    batch_sizes = [min(batch_size, num_samples - start) for start in range(0, num_samples, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(batch_sizes))
+    tasks = [(s, n, sensors, params, position_error_m, erp_error_dB, enforce_range) for s, n in zip(seeds, batch_sizes)]
+    if max_workers is None: max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(tasks))
+    if max_workers <= 1:
+        samples = [_sample_batch(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            samples = list(executor.map(_sample_batch, tasks))
+    samples = np.concatenate(samples)
+    if len(samples) == 0: return None
+    mean = samples.mean(axis=0)
+    radial = np.hypot(*(samples - mean).T)
+    cep50, cep90 = np.percentile(radial, [50, 90])
+    eigenvalues, eigenvectors = np.linalg.eigh(np.atleast_2d(np.cov(samples.T)))
+    major = eigenvectors[:, 1]
+    ellipse = {'semi_major_m': {p: float(confidence_scale(p) * np.sqrt(max(eigenvalues[1], 0))) for p in (0.5, 0.9)},
+               'semi_minor_m': {p: float(confidence_scale(p) * np.sqrt(max(eigenvalues[0], 0))) for p in (0.5, 0.9)},
+               'orientation_deg': float(np.degrees(np.arctan2(major[0], major[1])) % 180)}
+    target_coord = frame.to_geodetic(mean).tolist()
+    return UncertaintyEstimate(target_coord=target_coord, cep50_m=float(cep50), cep90_m=float(cep90), ellipse=ellipse,
+                               num_samples=int(num_samples), num_valid=len(samples))
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+
+import numpy as np
+from local_frame import get_frame_for_coords
+
+# square meters per acre
+SQ_METERS_PER_ACRE = 4046.856422
+
+def _signed_area(polygon: np.ndarray) -> float:
+    x = polygon[:, 0]; y = polygon[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+def as_ccw_polygon(polygon) -> np.ndarray:
+    """
+    Converts a polygon ring to a counter-clockwise (x,y) array
+
+    Parameters
+    ----------
+    polygon : array-like of shape (N,2)
+        Polygon vertices, without a repeated closing vertex.
+
+    Returns
+    -------
+    np.ndarray
+        Polygon vertices of shape (N,2) in counter-clockwise order.
+
+    """
+    polygon = np.asarray(polygon, dtype=float).reshape(-1, 2)
+    return polygon[::-1].copy() if _signed_area(polygon) < 0 else polygon
+
+def _clip_with_edge(polygon: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # signed distance (scaled) of every vertex from the clip edge, positive = inside
+    d = (b[0] - a[0]) * (polygon[:, 1] - a[1]) - (b[1] - a[1]) * (polygon[:, 0] - a[0])
+    d_next = np.roll(d, -1)
+    inside = d >= 0
+    crossing = inside != (d_next >= 0)
+    # vertex i is emitted at slot 2i, the crossing on edge i->i+1 at slot 2i+1
+    out = np.empty((2 * len(polygon), 2))
+    out[0::2] = polygon
+    if crossing.any():
+        p = polygon[crossing]
+        q = np.roll(polygon, -1, axis=0)[crossing]
+        t = d[crossing] / (d[crossing] - d_next[crossing])
+        out[1::2][crossing] = p + t[:, None] * (q - p)
+    keep = np.empty(2 * len(polygon), dtype=bool)
+    keep[0::2] = inside
+    keep[1::2] = crossing
+    return out[keep]
+
+def clip_convex_polygon(subject, clip) -> np.ndarray:
+    """
+    Intersects a polygon with a convex clip polygon (Sutherland-Hodgman)
+
+    Parameters
+    ----------
+    subject : array-like of shape (N,2)
+        Convex subject polygon vertices.
+    clip : array-like of shape (M,2)
+        Convex clip polygon vertices.
+
+    Returns
+    -------
+    np.ndarray
+        Intersection polygon vertices of shape (K,2) in counter-clockwise order,
+        with K < 3 when the polygons do not overlap.
+
+    """
+    polygon = as_ccw_polygon(subject)
+    clip = as_ccw_polygon(clip)
+    for a, b in zip(clip, np.roll(clip, -1, axis=0)):
+        # skip degenerate clip edges (e.g. a LOB wedge with no minimum range)
+        if a[0] == b[0] and a[1] == b[1]: continue
+        polygon = _clip_with_edge(polygon, a, b)
+        if len(polygon) < 3: return polygon
+    return polygon
+
+def intersect_convex_polygons(polygons) -> np.ndarray:
+    """
+    Intersects any number of convex polygons
+
+    Parameters
+    ----------
+    polygons : list of array-like
+        Convex polygons, each of shape (N,2).
+
+    Returns
+    -------
+    np.ndarray
+        Intersection polygon vertices of shape (K,2), with K < 3 when empty.
+
+    """
+    intersection = as_ccw_polygon(polygons[0])
+    for polygon in polygons[1:]:
+        intersection = clip_convex_polygon(intersection, polygon)
+        if len(intersection) < 3: break
+    return intersection
+
+def get_polygon_area_and_centroid_m(polygon_xy) -> tuple:
+    """
+    Area and centroid of a polygon in a local metric frame
+
+    Parameters
+    ----------
+    polygon_xy : array-like of shape (N,2)
+        Polygon vertices as east/north offsets in meters.
+
+    Returns
+    -------
+    tuple
+        Area in square meters and centroid as an (2,) east/north array.
+
+    """
+    polygon_xy = np.asarray(polygon_xy, dtype=float).reshape(-1, 2)
+    origin = polygon_xy.mean(axis=0)
+    # shift to the vertex mean to keep the shoelace sums well-conditioned
+    x = polygon_xy[:, 0] - origin[0]; y = polygon_xy[:, 1] - origin[1]
+    x_next = np.roll(x, -1); y_next = np.roll(y, -1)
+    cross = x * y_next - x_next * y
+    area = 0.5 * cross.sum()
+    if area == 0:
+        return 0.0, origin
+    centroid = origin + np.array([((x + x_next) * cross).sum(), ((y + y_next) * cross).sum()]) / (6 * area)
+    return float(abs(area)), centroid
+
+def get_polygon_area_and_centroid(polygon, frame=None) -> tuple:
+    """
+    Area (in acres) and centroid of a small [lat,lon] polygon
+
+    Parameters
+    ----------
+    polygon : array-like of shape (N,2)
+        Polygon vertices in [lat,lon] format.
+    frame : LocalFrame, optional
+        Local metric frame used for the computation. The default is a frame
+        centered on the polygon.
+
+    Returns
+    -------
+    tuple
+        Area in acres and centroid coordinate in [lat,lon] format.
+
+    """
+    polygon = np.asarray(polygon, dtype=float).reshape(-1, 2)
+    if frame is None: frame = get_frame_for_coords(polygon)
+    area_m2, centroid = get_polygon_area_and_centroid_m(frame.to_local(polygon))
+    return area_m2 / SQ_METERS_PER_ACRE, frame.to_geodetic(centroid).tolist()
+
+def get_wedge_intersection_m(lob_polygons_xy) -> tuple:
+    """
+    CUT / FIX area from LOB wedge polygons in a local metric frame
+
+    Parameters
+    ----------
+    lob_polygons_xy : list of array-like
+        LOB wedge polygons as east/north offsets in meters.
+
+    Returns
+    -------
+    tuple
+        Intersection polygon (K,2) array, its area in square meters and its
+        centroid (2,) array; (None, 0.0, None) if the wedges do not overlap.
+
+    """
+    intersection = intersect_convex_polygons(lob_polygons_xy)
+    if len(intersection) < 3: return None, 0.0, None
+    area_m2, centroid = get_polygon_area_and_centroid_m(intersection)
+    if area_m2 == 0: return None, 0.0, None
+    return intersection, area_m2, centroid
+
+def get_wedge_intersection(lob_polygons, frame=None) -> tuple:
+    """
+    Exact CUT / FIX area from the finite LOB wedge polygons
+
+    Parameters
+    ----------
+    lob_polygons : list of array-like
+        LOB wedge polygons (near/far, left/right corners) in [lat,lon] format.
+    frame : LocalFrame, optional
+        Local metric frame used for the computation. The default is a frame
+        centered on the wedges.
+
+    Returns
+    -------
+    tuple
+        Intersection polygon as a list of [lat,lon] coordinates, its area in acres and
+        its centroid in [lat,lon] format; (None, 0.0, None) if the wedges do not overlap.
+
+    """
+    if any(p is None for p in lob_polygons): return None, 0.0, None
+    lob_polygons = [np.asarray(p, dtype=float).reshape(-1, 2) for p in lob_polygons]
+    if frame is None: frame = get_frame_for_coords(np.concatenate(lob_polygons))
+    intersection, area_m2, centroid = get_wedge_intersection_m([frame.to_local(p) for p in lob_polygons])
+    if intersection is None: return None, 0.0, None
+    return frame.to_geodetic(intersection).tolist(), area_m2 / SQ_METERS_PER_ACRE, frame.to_geodetic(centroid).tolist()
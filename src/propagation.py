@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+
+"""
+Path-loss propagation model
+
+The path-loss range is log10(d_km) = B / (10 n) - log10(f_MHz), where B is the
+link budget in dB (ERP dBm + transmitter gain + receiver gain - received power
+- 32.4) and n the path-loss coefficient. The functions are array-native, so
+batches of reports are evaluated in one closed-form call.
+"""
+
+import numpy as np
+
+def convert_watts_to_dBm(p_watts):
+    """
+    Converts watts to dBm (array-native)
+
+    Parameters
+    ----------
+    p_watts : float or np.ndarray
+        Power in watts (W).
+
+    Returns
+    -------
+    float or np.ndarray
+        Power in dBm.
+
+    """
+    return 10 * np.log10(1000 * np.asarray(p_watts, dtype=float))
+
+def emission_distance(P_t_watts, f_MHz, G_t, G_r, R_s, path_loss_coeff=3):
+    """
+    Theoretical maximum distance of emission (array-native)
+
+    All inputs broadcast against each other.
+
+    Parameters
+    ----------
+    P_t_watts : float or np.ndarray
+        Power output of transmitter in watts (W).
+    f_MHz : float or np.ndarray
+        Operating frequency in MHz.
+    G_t : float or np.ndarray
+        Transmitter antenna gain in dBi.
+    G_r : float or np.ndarray
+        Receiver antenna gain in dBi.
+    R_s : float or np.ndarray
+        Receiver sensitivity in dBm *OR* power received in dBm.
+    path_loss_coeff : float or np.ndarray, optional
+        Coefficient that considers partial obstructions such as foliage.
+        The default is 3.
+
+    Returns
+    -------
+    float or np.ndarray
+        Theoretical maximum distance in km.
+
+    """
+    path_loss_coeff = np.asarray(path_loss_coeff, dtype=float)
+    return 10 ** ((convert_watts_to_dBm(P_t_watts) + G_t - 32.4 - (10 * path_loss_coeff * np.log10(f_MHz)) + G_r - R_s) / (10 * path_loss_coeff))
+
+def range_bounds(min_erp_watts, max_erp_watts, f_MHz, G_t, G_r, R_s, path_loss_coeff=3) -> tuple:
+    """
+    Minimum and maximum emission distance for batches of reports
+
+    All inputs broadcast against each other, so millions of range bounds
+    (e.g. what-if sweeps or replayed reports) are evaluated in one call.
+
+    Parameters
+    ----------
+    min_erp_watts : float or np.ndarray
+        Minimum assumed effective radiated power in watts (W).
+    max_erp_watts : float or np.ndarray
+        Maximum assumed effective radiated power in watts (W).
+    f_MHz : float or np.ndarray
+        Operating frequency in MHz.
+    G_t : float or np.ndarray
+        Transmitter antenna gain in dBi.
+    G_r : float or np.ndarray
+        Receiver antenna gain in dBi.
+    R_s : float or np.ndarray
+        Power received in dBm.
+    path_loss_coeff : float or np.ndarray, optional
+        Coefficient that considers partial obstructions such as foliage.
+        The default is 3.
+
+    Returns
+    -------
+    tuple of float or np.ndarray
+        Minimum and maximum distance in km.
+
+    """
+    # the ERP enters only through its dBm value: convert the two bounds once
+    receive_dB = np.asarray(G_t, dtype=float) + G_r - R_s - 32.4
+    inverse_n = 1 / (10 * np.asarray(path_loss_coeff, dtype=float))
+    log_f = np.log10(f_MHz)
+    return (10 ** ((convert_watts_to_dBm(min_erp_watts) + receive_dB) * inverse_n - log_f),
+            10 ** ((convert_watts_to_dBm(max_erp_watts) + receive_dB) * inverse_n - log_f))
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+
+"""
+Headless EW targeting engine
+
+Turns LOB 3-line sensor reports plus emitter parameters into plain result
+objects (LOB wedges, CUTs, FIX, errors and distances) without any GUI
+dependency, so solutions can be computed in scripts, CI and background workers.
+The GUI only renders the returned objects.
+"""
+
+from dataclasses import dataclass, field
+from itertools import combinations
+import numpy as np
+from fix_solver import solve_fix
+from lob_geometry import get_lob_wedges
+from local_frame import get_frame_for_coords
+from polygon_clipping import SQ_METERS_PER_ACRE, get_polygon_area_and_centroid_m, get_wedge_intersection_m
+from propagation import range_bounds
+
+@dataclass
+class SensorReport:
+    """LOB 3-line report from a single sensor"""
+    coord: list
+    azimuth: float
+    power_received_dBm: float
+    error_deg: float = 6
+    receiver_gain_dBi: float = 0
+    label: str = ''
+
+@dataclass
+class EmitterParameters:
+    """Assumed emitter characteristics and propagation environment"""
+    frequency_MHz: float
+    min_erp_watts: float
+    max_erp_watts: float
+    path_loss_coeff: float = 4
+    transmitter_gain_dBi: float = 0
+
+@dataclass
+class LOBResult:
+    """LOB wedge of one sensor report"""
+    index: int
+    label: str
+    sensor_coord: list
+    azimuth: float
+    error_deg: float
+    min_distance_m: float
+    max_distance_m: float
+    polygon: list
+    near_center_coord: list
+    far_center_coord: list
+    target_coord: list
+    error_acres: float
+    distance_m: float
+    plot_target: bool = True
+
+@dataclass
+class CutResult:
+    """Intersection of two LOB wedges"""
+    sensors: tuple
+    polygon: list
+    target_coord: list
+    error_acres: float
+    distances_m: dict
+    bounded: bool = True
+
+@dataclass
+class FixResult:
+    """Common area of three or more LOB wedges"""
+    sensors: tuple
+    polygon: list
+    target_coord: list
+    error_acres: float
+    distances_m: dict
+    least_squares: dict = None
+
+@dataclass
+class TargetingSolution:
+    """Complete targeting solution for a set of sensor reports"""
+    target_class: str
+    lobs: list
+    cuts: list = field(default_factory=list)
+    fix: FixResult = None
+    target_coord: list = None
+    error_acres: float = None
+    sensor_distances_m: dict = field(default_factory=dict)
+
+def get_lob_distances_m(reports, params: EmitterParameters) -> tuple:
+    """
+    Minimum and maximum emitter range (pure path-loss) for each report
+
+    Parameters
+    ----------
+    reports : list of SensorReport
+        Sensor reports.
+    params : EmitterParameters
+        Emitter parameters.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        Minimum and maximum distance in meters for each report.
+
+    """
+    power_received = np.array([r.power_received_dBm for r in reports], dtype=float)
+    receiver_gain = np.array([r.receiver_gain_dBi for r in reports], dtype=float)
+    min_distances_km, max_distances_km = range_bounds(params.min_erp_watts, params.max_erp_watts, params.frequency_MHz, params.transmitter_gain_dBi,
+                                                      receiver_gain, power_received, params.path_loss_coeff)
+    return min_distances_km * 1000, max_distances_km * 1000
+
+def _segments_intersect(a1, a2, b1, b2) -> np.ndarray:
+    # vectorized form of utilities.check_for_intersection
+    def ccw(A, B, C):
+        return (C[..., 0] - A[..., 0]) * (B[..., 1] - A[..., 1]) > (B[..., 0] - A[..., 0]) * (C[..., 1] - A[..., 1])
+    return (ccw(a1, b1, b2) != ccw(a2, b1, b2)) & (ccw(a1, a2, b1) != ccw(a1, a2, b2))
+
+def _line_intersection(p1, p2, p3, p4):
+    # intersection of the infinite lines p1-p2 and p3-p4 (see utilities.get_intersection)
+    d1 = np.subtract(p2, p1); d2 = np.subtract(p4, p3)
+    denominator = d1[0] * d2[1] - d1[1] * d2[0]
+    if denominator == 0: return None
+    t = ((p3[0] - p1[0]) * d2[1] - (p3[1] - p1[1]) * d2[0]) / denominator
+    return np.asarray(p1, dtype=float) + t * d1
+
+def _order_polygon(points) -> np.ndarray:
+    points = np.asarray(points, dtype=float)
+    center = points.mean(axis=0)
+    return points[np.argsort(np.arctan2(points[:, 1] - center[1], points[:, 0] - center[0]))]
+
+def _distances_to(sensors_xy, sensors, target_xy) -> dict:
+    return dict(zip(sensors, np.hypot(*(sensors_xy[list(sensors)] - target_xy).T).tolist()))
+
+def _solve_cut(i: int, j: int, geometry: dict, frame) -> (CutResult,None):
+    sensors_xy = geometry['sensors']; far_center_xy = geometry['far_center']; polygons_xy = geometry['polygons']
+    # CUT target is the intersection of the LOB center lines
+    target_xy = _line_intersection(sensors_xy[i], far_center_xy[i], sensors_xy[j], far_center_xy[j])
+    if target_xy is None: return None
+    polygon_xy, area_m2, _ = get_wedge_intersection_m([polygons_xy[i], polygons_xy[j]])
+    bounded = polygon_xy is not None
+    if not bounded:
+        # wedges do not overlap within range: fall back to the LOB bound-line intersections
+        nr1, fr1, fl1, nl1 = polygons_xy[i]; nr2, fr2, fl2, nl2 = polygons_xy[j]
+        corners = [_line_intersection(r1, r2, q1, q2) for (r1, r2) in [(nr1, fr1), (nl1, fl1)] for (q1, q2) in [(nr2, fr2), (nl2, fl2)]]
+        if any(c is None for c in corners): return None
+        polygon_xy = _order_polygon(corners)
+        area_m2, _ = get_polygon_area_and_centroid_m(polygon_xy)
+    return CutResult(sensors=(i, j), polygon=frame.to_geodetic(polygon_xy).tolist(), target_coord=frame.to_geodetic(target_xy).tolist(),
+                     error_acres=area_m2 / SQ_METERS_PER_ACRE, distances_m=_distances_to(sensors_xy, range(len(sensors_xy)), target_xy), bounded=bounded)
+
+def solve(reports, params: EmitterParameters) -> TargetingSolution:
+    """
+    Computes the LOB / CUT / FIX targeting solution for a set of sensor reports
+
+    All line and polygon work is done in one local metric frame centered on
+    the LOBs; results are converted back to [lat,lon] for display.
+
+    Parameters
+    ----------
+    reports : list of SensorReport
+        Sensor reports (any number of sensors).
+    params : EmitterParameters
+        Emitter parameters.
+
+    Returns
+    -------
+    TargetingSolution
+        LOB wedges, CUTs between intersecting LOB pairs and the FIX (if every pair
+        of three or more LOBs intersects and the wedges share a common area).
+
+    """
+    if len(reports) == 0: return TargetingSolution(target_class='', lobs=[])
+    min_distances_m, max_distances_m = get_lob_distances_m(reports, params)
+    sensor_coords = np.array([r.coord for r in reports], dtype=float)
+    azimuths = np.array([r.azimuth for r in reports], dtype=float)
+    errors = np.array([r.error_deg for r in reports], dtype=float)
+    center, near_right, near_left, near_center, far_right, far_left, far_center = get_lob_wedges(sensor_coords, azimuths, errors, min_distances_m, max_distances_m)
+    polygons = np.stack([near_right, far_right, far_left, near_left], axis=1)
+    # project every sensor and wedge point into the session frame once
+    frame = get_frame_for_coords(np.concatenate([sensor_coords, polygons.reshape(-1, 2)]))
+    geometry = {'sensors': frame.to_local(sensor_coords), 'far_center': frame.to_local(far_center), 'polygons': frame.to_local(polygons)}
+    target_xy = (frame.to_local(near_center) + geometry['far_center']) / 2
+    target_coords = frame.to_geodetic(target_xy)
+    target_distances = np.hypot(*(target_xy - geometry['sensors']).T)
+    lobs = []
+    for i, report in enumerate(reports):
+        lobs.append(LOBResult(index=i, label=report.label or f'EWT {i+1}', sensor_coord=sensor_coords[i].tolist(),
+                              azimuth=float(azimuths[i]), error_deg=float(errors[i]),
+                              min_distance_m=float(min_distances_m[i]), max_distance_m=float(max_distances_m[i]),
+                              polygon=polygons[i].tolist(), near_center_coord=near_center[i].tolist(), far_center_coord=far_center[i].tolist(),
+                              target_coord=target_coords[i].tolist(),
+                              error_acres=get_polygon_area_and_centroid_m(geometry['polygons'][i])[0] / SQ_METERS_PER_ACRE,
+                              distance_m=float(target_distances[i])))
+    solution = TargetingSolution(target_class='LOB', lobs=lobs,
+                                 sensor_distances_m={l.index: l.distance_m for l in lobs})
+    # assess which LOB center lines intersect (all pairs at once)
+    pairs = list(combinations(range(len(lobs)), 2))
+    if len(pairs) == 0: return solution
+    pair_index = np.array(pairs)
+    sensors_xy = geometry['sensors']; far_center_xy = geometry['far_center']
+    intersecting = _segments_intersect(sensors_xy[pair_index[:, 0]], far_center_xy[pair_index[:, 0]], sensors_xy[pair_index[:, 1]], far_center_xy[pair_index[:, 1]])
+    for (i, j), intersects in zip(pairs, intersecting):
+        if not intersects: continue
+        cut = _solve_cut(i, j, geometry, frame)
+        if cut is not None: solution.cuts.append(cut)
+    if len(solution.cuts) == 0: return solution
+    # LOB targets are only plotted for LOBs that are not part of a CUT
+    cut_sensors = {s for cut in solution.cuts for s in cut.sensors}
+    for lob in lobs:
+        lob.plot_target = lob.index not in cut_sensors
+    solution.target_class = 'CUT'
+    solution.target_coord = solution.cuts[-1].target_coord
+    solution.error_acres = solution.cuts[-1].error_acres
+    # closest CUT distance for each sensor
+    solution.sensor_distances_m = {l.index: min(c.distances_m[l.index] for c in solution.cuts) for l in lobs}
+    if len(lobs) >= 3 and bool(intersecting.all()):
+        polygon_xy, area_m2, fix_xy = get_wedge_intersection_m(list(geometry['polygons']))
+        if polygon_xy is not None:
+            sensors = tuple(l.index for l in lobs)
+            fix_coord = frame.to_geodetic(fix_xy).tolist()
+            solution.fix = FixResult(sensors=sensors, polygon=frame.to_geodetic(polygon_xy).tolist(), target_coord=fix_coord,
+                                     error_acres=area_m2 / SQ_METERS_PER_ACRE, distances_m=_distances_to(sensors_xy, sensors, fix_xy),
+                                     least_squares=solve_fix(sensor_coords, azimuths, errors))
+            solution.target_class = 'FIX'
+            solution.target_coord = fix_coord
+            solution.error_acres = solution.fix.error_acres
+            solution.sensor_distances_m = dict(solution.fix.distances_m)
+    return solution
+
+def solve_batch(report_sets, params: EmitterParameters) -> list:
+    """
+    Solves many sets of sensor reports with the same emitter parameters
+
+    Parameters
+    ----------
+    report_sets : iterable of list of SensorReport
+        Sensor report sets (e.g. logged or replayed 3-line reports).
+    params : EmitterParameters
+        Emitter parameters.
+
+    Returns
+    -------
+    list of TargetingSolution
+        One solution per report set.
+
+    """
+    return [solve(reports, params) for reports in report_sets]
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+
+"""
+Byte-budgeted in-memory LRU cache of map tiles
+
+Hot tiles are served from memory instead of stat/open/read on every request.
+Tiles are written by the download services in other processes, so a cached
+tile is re-validated against its modification time in the tile store (file
+mtime or MBTiles row) at most once every `revalidate_sec` seconds; missing tiles are never cached, so newly downloaded
+imagery is picked up on the next request. In-process writers call invalidate().
+
+Tile files are only read into the cache when they are requested again: a tile
+missed for the first time is streamed from disk (sendfile) without a copy, so
+tiles viewed once never cost memory or a read.
+"""
+
+from collections import OrderedDict
+import threading, time
+
+# default memory budget of the tile cache
+CACHE_BUDGET_MB = 256
+
+class TileCache:
+    """
+    Thread-safe LRU cache of tile contents with a total byte budget
+    """
+    def __init__(self, max_bytes=CACHE_BUDGET_MB * 1024 * 1024, revalidate_sec=5.0, max_missed=65536):
+        self.max_bytes = int(max_bytes)
+        # single tiles larger than this are served but not cached
+        self.max_entry_bytes = max(self.max_bytes // 8, 0)
+        self.revalidate_sec = revalidate_sec
+        # tiles missed once, oldest first (admitted to the cache on their next miss)
+        self.max_missed = max_missed
+        self._missed = OrderedDict()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """
+        Returns a cached entry (content, mtime_ns, checked_at) or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None: return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def contains(self, key) -> bool:
+        """
+        Whether a key is cached (does not count as a use)
+        """
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key, content: bytes, mtime_ns: int) -> None:
+        """
+        Adds or replaces an entry, evicting least recently used tiles over budget
+        """
+        size = len(content)
+        if not self.accepts(size): return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None: self.current_bytes -= len(old[0])
+            self._entries[key] = (content, mtime_ns, time.monotonic())
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, (evicted, _, _) = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+                self.evictions += 1
+
+    def invalidate(self, key=None) -> None:
+        """
+        Drops one entry (or every entry when key is None)
+        """
+        with self._lock:
+            if key is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                self.current_bytes = 0
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= len(old[0])
+                self.invalidations += 1
+
+    def _record(self, hit: bool) -> None:
+        with self._lock:
+            if hit: self.hits += 1
+            else: self.misses += 1
+
+    def accepts(self, size: int) -> bool:
+        """
+        Whether a tile of the given size is kept in the cache
+        """
+        return size <= self.max_entry_bytes
+
+    def admits(self, key, size: int) -> bool:
+        """
+        Whether a missed tile should be read into the cache (it was missed before)
+
+        The first miss of a tile is only recorded, so tiles requested once are
+        streamed from disk instead of being read into memory.
+        """
+        if not self.accepts(size): return False
+        with self._lock:
+            if self._missed.pop(key, None) is not None: return True
+            self._missed[key] = True
+            if len(self._missed) > self.max_missed: self._missed.popitem(last=False)
+        return False
+
+    def lookup(self, key, get_version):
+        """
+        Cached tile contents, re-validated against the tile store when due
+
+        Parameters
+        ----------
+        key : hashable
+            Cache key, the (z, x, y) tile.
+        get_version : callable
+            Returns the current mtime_ns of the tile in the store (None if it is missing).
+
+        Returns
+        -------
+        tuple or None
+            (content, mtime_ns) of the cached tile, or None on a cache miss.
+
+        """
+        entry = self.get(key)
+        if entry is not None:
+            content, mtime_ns, checked_at = entry
+            if time.monotonic() - checked_at < self.revalidate_sec:
+                self._record(hit=True)
+                return content, mtime_ns
+            # re-validate against the store (a downloader may have replaced the tile)
+            if get_version() == mtime_ns:
+                self.put(key, content, mtime_ns)
+                self._record(hit=True)
+                return content, mtime_ns
+            self.invalidate(key)
+        self._record(hit=False)
+        return None
+
+    def stats(self) -> dict:
+        """
+        Cache counters
+
+        Returns
+        -------
+        dict
+            Hits, misses, hit ratio, evictions, invalidations, entry count and bytes used.
+
+        """
+        with self._lock:
+            entries = len(self._entries); current_bytes = self.current_bytes
+            hits = self.hits; misses = self.misses
+        requests = hits + misses
+        return {'hits': hits,
+                'misses': misses,
+                'hit_ratio': hits / requests if requests else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': entries,
+                'bytes': current_bytes,
+                'max_bytes': self.max_bytes}
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+
+"""
+Shared HTTP(S) client for map tile downloads
+
+urllib.request.urlopen opens a new TCP connection (and TLS handshake) for
+every tile. TileClient keeps a pool of keep-alive connections per host and one
+SSL context, so bulk downloads pay the handshake once per pooled connection.
+Each host gets at most `pool_size` connections; callers beyond that wait for a
+free one.
+"""
+
+from functools import lru_cache
+from urllib.error import HTTPError
+from urllib.parse import urljoin, urlsplit
+import http.client, socket, ssl, threading
+
+# default connections per tile host (matches the parallel downloads of a batch job)
+POOL_SIZE = 8
+USER_AGENT = 'ew_plt_targeting_app tile downloader'
+# connection errors that are retried on a new connection (stale keep-alive connections)
+RETRY_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionError, socket.timeout, ssl.SSLError)
+
+class TileClient:
+    """
+    Thread-safe HTTP(S) client with per-host keep-alive connection pools
+    """
+    def __init__(self, pool_size: int = POOL_SIZE, timeout: float = 5, verify: bool = True, retries: int = 2, max_redirects: int = 3):
+        self.pool_size = max(int(pool_size), 1)
+        self.timeout = timeout
+        self.retries = retries
+        self.max_redirects = max_redirects
+        # one SSL context for every connection (certificate store loaded once)
+        self.ssl_context = ssl.create_default_context()
+        if not verify:
+            self.ssl_context.check_hostname = False
+            self.ssl_context.verify_mode = ssl.CERT_NONE
+        self._pools = {}
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.requests = 0
+
+    def _pool(self, key):
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                # idle connections and a cap on connections per host
+                pool = self._pools[key] = ([], threading.BoundedSemaphore(self.pool_size))
+            return pool
+
+    def _connect(self, scheme, host, port, timeout):
+        with self._lock:
+            self.connections_opened += 1
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self.ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def get(self, url: str, timeout: float = None, headers: dict = None) -> bytes:
+        """
+        Downloads a URL over a pooled connection
+
+        Parameters
+        ----------
+        url : str
+            http(s) URL.
+        timeout : float, optional
+            Socket timeout in seconds. The default is the client timeout.
+        headers : dict, optional
+            Extra request headers. The default is None.
+
+        Raises
+        ------
+        urllib.error.HTTPError
+            Response status other than 200 (after following redirects).
+
+        Returns
+        -------
+        bytes
+            Response body.
+
+        """
+        timeout = self.timeout if timeout is None else timeout
+        for _ in range(self.max_redirects + 1):
+            status, response_headers, data = self._request(url, timeout, headers)
+            if status in (301, 302, 303, 307, 308) and response_headers.get('Location'):
+                url = urljoin(url, response_headers['Location'])
+                continue
+            if status != 200: raise HTTPError(url, status, http.client.responses.get(status, ''), response_headers, None)
+            return data
+        raise HTTPError(url, status, 'Too many redirects', response_headers, None)
+
+    def _request(self, url, timeout, headers):
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        port = parts.port or (443 if scheme == 'https' else 80)
+        path = parts.path or '/'
+        if parts.query: path += '?' + parts.query
+        request_headers = {'User-Agent': USER_AGENT, 'Connection': 'keep-alive', **(headers or {})}
+        idle, slots = self._pool((scheme, parts.hostname, port))
+        with slots:
+            for attempt in range(self.retries + 1):
+                with self._lock:
+                    connection = idle.pop() if idle else None
+                if connection is None: connection = self._connect(scheme, parts.hostname, port, timeout)
+                connection.timeout = timeout
+                if connection.sock is not None: connection.sock.settimeout(timeout)
+                try:
+                    connection.request('GET', path, headers=request_headers)
+                    response = connection.getresponse()
+                    data = response.read()
+                except RETRY_ERRORS:
+                    connection.close()
+                    # the server closed an idle keep-alive connection, or the request timed out
+                    if attempt >= self.retries: raise
+                    continue
+                except Exception:
+                    connection.close()
+                    raise
+                with self._lock:
+                    self.requests += 1
+                    if response.will_close: connection.close()
+                    else: idle.append(connection)
+                return response.status, response.headers, data
+
+    def close(self) -> None:
+        """Closes every idle pooled connection"""
+        with self._lock:
+            for idle, _ in self._pools.values():
+                for connection in idle: connection.close()
+                idle.clear()
+
+    def stats(self) -> dict:
+        """
+        Client counters
+
+        Returns
+        -------
+        dict
+            Requests made and connections opened (requests per connection shows the pool reuse).
+
+        """
+        with self._lock:
+            return {'requests': self.requests,
+                    'connections_opened': self.connections_opened,
+                    'idle_connections': sum(len(idle) for idle, _ in self._pools.values())}
+
+@lru_cache(maxsize=8)
+def get_tile_client(pool_size: int = POOL_SIZE, timeout: float = 5, verify: bool = True) -> TileClient:
+    """
+    Shared (cached) tile client for a pool configuration
+    """
+    return TileClient(pool_size=pool_size, timeout=timeout, verify=verify)
@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+
+"""
+asyncio tile fetch engine with token-bucket rate limiting
+
+Thousands of pending tiles are cheap asyncio tasks. Every request first takes
+a token from the global request bucket (requests/sec) and waits until the
+byte bucket (bytes/sec) is out of debt, then holds one of the per-host slots
+while the pooled TileClient downloads it on a worker thread. The budget is
+spent as fast as it refills, without bursts beyond one second of budget and
+without idle workers sleeping between tiles.
+
+The event loop runs on a background thread: blocking callers run() a batch to
+completion or submit() single tiles from any thread, and all of them share the
+engine's rate budget.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import lru_cache
+from urllib.parse import urlsplit
+from tile_client import POOL_SIZE, TileClient
+import asyncio, threading, time
+
+# default upstream request budget (the previous 100 ms sleep per tile)
+REQUESTS_PER_SEC = 10
+# default maximum tiles pending in a batch
+WINDOW = 1000
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` tokens per second up to `capacity`
+    """
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = float(rate)
+        # one second of budget by default
+        self.capacity = float(capacity if capacity is not None else max(rate, 1.0))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Waits until `amount` tokens are available and takes them"""
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    async def wait_for_credit(self) -> None:
+        """Waits until the bucket is out of debt (for costs only known afterwards)"""
+        while True:
+            self._refill()
+            if self.tokens >= 0: return
+            await asyncio.sleep(-self.tokens / self.rate)
+
+    def consume(self, amount: float) -> None:
+        """Takes tokens after the fact (the bucket may go into debt)"""
+        self._refill()
+        self.tokens -= amount
+
+class FetchEngine:
+    """
+    Rate-limited concurrent tile fetcher
+    """
+    def __init__(self, requests_per_sec: float = REQUESTS_PER_SEC, bytes_per_sec: float = None, per_host: int = POOL_SIZE,
+                 timeout: float = 5, verify: bool = True, client: TileClient = None, max_threads: int = None):
+        # global budgets (None: unlimited)
+        self.request_bucket = TokenBucket(requests_per_sec) if requests_per_sec else None
+        self.byte_bucket = TokenBucket(bytes_per_sec) if bytes_per_sec else None
+        # concurrent requests per upstream host
+        self.per_host = max(int(per_host), 1)
+        self.client = client if client is not None else TileClient(pool_size=self.per_host, timeout=timeout, verify=verify)
+        self._executor = ThreadPoolExecutor(max_workers=max_threads or 4 * self.per_host, thread_name_prefix="tile_fetch")
+        self._host_slots = {}
+        self._loop = None
+        self._thread = None
+        self.requests = 0
+        self.bytes = 0
+        self.started_at = time.monotonic()
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        slot = self._host_slots.get(host)
+        if slot is None: slot = self._host_slots[host] = asyncio.Semaphore(self.per_host)
+        return slot
+
+    async def fetch(self, url: str, process=None, timeout: float = None):
+        """
+        Fetches one URL within the rate limits
+
+        Parameters
+        ----------
+        url : str
+            Tile URL.
+        process : callable, optional
+            Called with the response body on the worker thread (e.g. to write
+            the tile to a store); its return value is returned. The default is None.
+        timeout : float, optional
+            Socket timeout in seconds. The default is the client timeout.
+
+        Returns
+        -------
+        bytes or object
+            Response body, or the return value of process.
+
+        """
+        async with self._host_slot(url):
+            if self.request_bucket is not None: await self.request_bucket.acquire()
+            if self.byte_bucket is not None: await self.byte_bucket.wait_for_credit()
+            def download():
+                data = self.client.get(url, timeout=timeout)
+                return data, (process(data) if process is not None else data)
+            data, result = await asyncio.get_running_loop().run_in_executor(self._executor, download)
+        if self.byte_bucket is not None: self.byte_bucket.consume(len(data))
+        self.requests += 1; self.bytes += len(data)
+        return result
+
+    async def fetch_many(self, items, make_request, window: int = WINDOW, on_done=None) -> dict:
+        """
+        Fetches many tiles with at most `window` pending at a time
+
+        Parameters
+        ----------
+        items : iterable
+            Tiles (consumed lazily).
+        make_request : callable
+            Returns (url, process) for a tile, or None to skip it.
+        window : int, optional
+            Maximum tiles pending. The default is 1000.
+        on_done : callable, optional
+            Called as on_done(item, error) after each tile (error is None on
+            success, 'skipped' for skipped tiles). The default is None.
+
+        Returns
+        -------
+        dict
+            Counts of 'downloaded', 'skipped' and 'failed' tiles, 'elapsed_sec',
+            and 'errors': a list of (item, error message) for failed tiles.
+
+        """
+        results = {'downloaded': 0, 'skipped': 0, 'failed': 0, 'errors': []}
+        t1 = time.monotonic()
+        pending = {}
+
+        def collect(done):
+            for task in done:
+                item = pending.pop(task)
+                error = task.exception()
+                if error is None:
+                    results['downloaded'] += 1
+                else:
+                    results['failed'] += 1
+                    results['errors'].append((item, str(error)))
+                if on_done is not None: on_done(item, error)
+
+        try:
+            for item in items:
+                request = make_request(item)
+                if request is None:
+                    results['skipped'] += 1
+                    if on_done is not None: on_done(item, 'skipped')
+                    continue
+                while len(pending) >= window:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    collect(done)
+                url, process = request
+                pending[asyncio.ensure_future(self.fetch(url, process))] = item
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                collect(done)
+        except asyncio.CancelledError:
+            # a cancelled batch drops its pending tiles (on_done is not called for them)
+            for task in pending: task.cancel()
+            raise
+        results['elapsed_sec'] = time.monotonic() - t1
+        return results
+
+    def run(self, items, make_request, window: int = WINDOW, on_done=None) -> dict:
+        """
+        Blocking fetch_many, see fetch_many
+        """
+        # always the engine's own loop: host slots and buckets belong to it
+        if self._loop is None: self.start()
+        coroutine = self.fetch_many(items, make_request, window=window, on_done=on_done)
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        try:
+            # short waits keep the caller interruptible (KeyboardInterrupt)
+            while True:
+                try: return future.result(timeout=0.5)
+                except FutureTimeoutError: continue
+        except BaseException:
+            future.cancel()
+            raise
+
+    def start(self) -> None:
+        """Runs the engine's event loop on a background thread (run and submit start it)"""
+        if self._loop is not None: return
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="tile_fetch_loop", daemon=True)
+        self._thread.start()
+
+    def submit(self, url: str, process=None, timeout: float = None):
+        """
+        Queues one URL from any thread
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Resolves to the fetch result.
+
+        """
+        if self._loop is None: self.start()
+        return asyncio.run_coroutine_threadsafe(self.fetch(url, process, timeout), self._loop)
+
+    async def _cancel_tasks(self) -> None:
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks: task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self) -> None:
+        if self._loop is not None:
+            # cancel unfinished fetches before stopping the loop
+            asyncio.run_coroutine_threadsafe(self._cancel_tasks(), self._loop).result(timeout=5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop.close(); self._loop = None
+        # running downloads finish (and write their tiles), queued ones are dropped
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.client.close()
+
+    def stats(self) -> dict:
+        """
+        Engine counters
+
+        Returns
+        -------
+        dict
+            Requests, bytes, average requests/sec and bytes/sec since creation.
+
+        """
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return {'requests': self.requests,
+                'bytes': self.bytes,
+                'requests_per_sec': self.requests / elapsed,
+                'bytes_per_sec': self.bytes / elapsed}
+
+@lru_cache(maxsize=4)
+def get_fetch_engine(requests_per_sec: float = REQUESTS_PER_SEC, bytes_per_sec: float = None, per_host: int = POOL_SIZE, verify: bool = True) -> FetchEngine:
+    """
+    Shared (cached) fetch engine: tiles submitted to it share one rate budget
+    """
+    return FetchEngine(requests_per_sec=requests_per_sec, bytes_per_sec=bytes_per_sec, per_host=per_host, verify=verify)
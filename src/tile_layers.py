@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+
+"""
+Named tile layers of the map server
+
+Each layer has its own tile store (directory or MBTiles), tile cache budget,
+stand-in synthesis and prefetcher, and is served under its name:
+
+/{layer}/{z}/{x}/{y}.png   (the first layer is also served at /{z}/{x}/{y}.png)
+
+Layers are given on the command line as a single location, as comma separated
+name=location pairs, or as a JSON file:
+
+{"layers": [{"name": "imagery", "path": "../map_tiles/ESRI", "cache_mb": 192, "queue_missing": true},
+            {"name": "topo", "path": "../map_tiles/topo.mbtiles", "cache_mb": 64}]}
+"""
+
+import json, os
+from tile_cache import CACHE_BUDGET_MB, TileCache
+from tile_prefetch import TilePrefetcher
+from tile_queue import get_tile_queue
+from tile_store import open_tile_store
+
+# name of the layer served from a single tile location
+DEFAULT_LAYER_NAME = 'imagery'
+# URL path segments that cannot name a layer
+RESERVED_LAYER_NAMES = ('metrics', 'stats')
+
+class TileLayer:
+    """
+    Tile store with its own cache budget, stand-in synthesis and prefetcher
+    """
+    def __init__(self, name: str, location: str, cache_mb: float = CACHE_BUDGET_MB, synthesize: bool = True,
+                 prefetch: bool = True, queue_missing: bool = True):
+        if not name or name.isdigit() or '/' in name or name in RESERVED_LAYER_NAMES:
+            raise ValueError(f'Invalid tile layer name: {name!r}')
+        self.name = name
+        self.location = location
+        self.cache_mb = cache_mb
+        self.store = open_tile_store(location)
+        self.cache = TileCache(max_bytes=cache_mb * 1024 * 1024)
+        # stand-in tiles are cached separately so they never evict real tiles
+        self.synthesize = synthesize
+        self.synthetic_cache = TileCache(max_bytes=cache_mb * 1024 * 1024 / 4, revalidate_sec=30.0)
+        # only the layer the dynamic download service fetches (the default one) queues its missing tiles,
+        # recording the layer location so the service downloads them into this store
+        self.tile_queue = get_tile_queue() if queue_missing else None
+        self.prefetcher = TilePrefetcher(self.store, self.cache, tile_queue=self.tile_queue, queue_store=location) if prefetch else None
+
+    def start(self) -> None:
+        if self.prefetcher is not None: self.prefetcher.start()
+
+    def close(self) -> None:
+        if self.prefetcher is not None: self.prefetcher.stop()
+        self.store.close()
+
+    def stats(self) -> dict:
+        """
+        Cache and prefetch stats of the layer
+
+        Returns
+        -------
+        dict
+            Stats dicts by component name ('cache', 'synthetic_cache', 'prefetch').
+
+        """
+        stats = {'cache': self.cache.stats(), 'synthetic_cache': self.synthetic_cache.stats()}
+        if self.prefetcher is not None: stats['prefetch'] = self.prefetcher.stats()
+        return stats
+
+def get_layers(spec: str, cache_mb: float = CACHE_BUDGET_MB, synthesize: bool = True, prefetch: bool = True) -> list:
+    """
+    Tile layers from a command-line layer specification
+
+    Parameters
+    ----------
+    spec : str
+        Tile directory or MBTiles file (one layer), comma separated
+        name=location pairs, or a JSON layer file.
+    cache_mb : float, optional
+        Total tile cache budget in MB, split evenly between layers without
+        their own cache_mb. The default is 256.
+    synthesize : bool, optional
+        Default stand-in synthesis setting of the layers. The default is True.
+    prefetch : bool, optional
+        Default prefetch setting of the layers. The default is True.
+
+    Returns
+    -------
+    list
+        TileLayer objects; the first one is the default layer. Only the default
+        layer queues missing tiles (a JSON file may set its queue_missing to false).
+
+    Raises
+    ------
+    ValueError
+        Invalid or duplicate layer names, or queue_missing set on another layer.
+
+    """
+    if spec.lower().endswith('.json'):
+        with open(spec, mode='r') as file:
+            configs = json.load(file)['layers']
+        # relative layer paths are relative to the JSON file
+        base_dir = os.path.dirname(os.path.abspath(spec))
+        for config in configs: config['path'] = os.path.join(base_dir, config['path'])
+    elif '=' in spec:
+        configs = [dict(zip(('name', 'path'), item.split('=', 1))) for item in spec.split(',') if item.strip()]
+    else:
+        configs = [{'name': DEFAULT_LAYER_NAME, 'path': spec}]
+    # the download service fetches imagery (into the store each tile was queued for): only the default layer can queue missing tiles
+    for config in configs[1:]:
+        if config.get('queue_missing'): raise ValueError(f"Only the default (first) tile layer can queue missing tiles: {config['name']}")
+    num_unbudgeted = sum('cache_mb' not in config for config in configs)
+    budgeted_mb = sum(config.get('cache_mb', 0) for config in configs)
+    default_mb = max(cache_mb - budgeted_mb, 0) / max(num_unbudgeted, 1)
+    layers = []
+    for i, config in enumerate(configs):
+        layers.append(TileLayer(config['name'].strip(), config['path'].strip(),
+                                cache_mb=config.get('cache_mb', default_mb),
+                                synthesize=config.get('synthesize', synthesize),
+                                prefetch=config.get('prefetch', prefetch),
+                                queue_missing=config.get('queue_missing', i == 0)))
+    if len({layer.name for layer in layers}) != len(layers): raise ValueError(f'Duplicate tile layer names: {spec}')
+    return layers
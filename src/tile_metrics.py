@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+
+"""
+Request instrumentation for the map tile server
+
+Every tile request is recorded once, after the response is sent: a counter
+update and a bucketed latency under one lock, about a microsecond. Cache,
+prefetch and queue figures are only collected when /metrics (Prometheus text
+format) or /stats (JSON) is requested.
+"""
+
+from bisect import bisect_left
+import json, threading, time
+
+# upper bounds of the latency histogram buckets (seconds)
+LATENCY_BUCKETS_SEC = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+# component stats that only ever increase (exported as Prometheus counters)
+COUNTER_KEYS = ('hits', 'misses', 'evictions', 'invalidations', 'bursts', 'prefetched', 'queued')
+
+class ServerMetrics:
+    """
+    Thread-safe request counters and latency histograms of the map server
+    """
+    def __init__(self, buckets=LATENCY_BUCKETS_SEC):
+        self.buckets = tuple(buckets)
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        # per HTTP status: [bucket counts (+Inf last), latency sum]
+        self._latency = {}
+        self._not_found = {}
+        self._sources = {}
+        self.bytes_served = 0
+
+    def record(self, status: int, duration_sec: float, num_bytes: int = 0, zoom=None, source=None) -> None:
+        """
+        Records one request
+
+        Parameters
+        ----------
+        status : int
+            HTTP status code sent.
+        duration_sec : float
+            Time taken to handle the request.
+        num_bytes : int, optional
+            Body bytes sent. The default is 0.
+        zoom : int, optional
+            Zoom level of a tile request (404s are counted per zoom). The default is None.
+        source : str, optional
+            Where the tile came from ('cache', 'store' or 'synthesized'). The default is None.
+
+        Returns
+        -------
+        None.
+
+        """
+        bucket = bisect_left(self.buckets, duration_sec)
+        with self._lock:
+            latency = self._latency.get(status)
+            if latency is None: latency = self._latency[status] = [[0] * (len(self.buckets) + 1), 0.0]
+            latency[0][bucket] += 1
+            latency[1] += duration_sec
+            self.bytes_served += num_bytes
+            if status == 404 and zoom is not None: self._not_found[zoom] = self._not_found.get(zoom, 0) + 1
+            if source is not None: self._sources[source] = self._sources.get(source, 0) + 1
+
+    def _snapshot(self):
+        with self._lock:
+            latency = {status: (list(counts), total) for status, (counts, total) in self._latency.items()}
+            return latency, dict(self._not_found), dict(self._sources), self.bytes_served
+
+    def _quantile(self, counts, q: float) -> float:
+        # linear interpolation inside the histogram bucket holding the quantile
+        total = sum(counts)
+        if total == 0: return 0.0
+        rank = q * total; cumulative = 0
+        for i, count in enumerate(counts):
+            if count and cumulative + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def stats(self, layers=None, queue_backlog=None) -> dict:
+        """
+        Metrics as a JSON-serializable dict
+
+        Parameters
+        ----------
+        layers : dict, optional
+            Component stats dicts (e.g. 'cache') by tile layer name. The default is None.
+        queue_backlog : int, optional
+            Tiles waiting in the missing tile queue. The default is None.
+
+        Returns
+        -------
+        dict
+            Request counts and latency quantiles (ms) per status, bytes served,
+            404s per zoom, responses per tile source and layer stats.
+
+        """
+        latency, not_found, sources, bytes_served = self._snapshot()
+        requests = {}
+        for status, (counts, total) in sorted(latency.items()):
+            num_requests = sum(counts)
+            requests[str(status)] = {'count': num_requests,
+                                     'mean_ms': 1000 * total / num_requests if num_requests else 0.0,
+                                     'p50_ms': 1000 * self._quantile(counts, 0.5),
+                                     'p90_ms': 1000 * self._quantile(counts, 0.9),
+                                     'p99_ms': 1000 * self._quantile(counts, 0.99)}
+        stats = {'uptime_sec': time.time() - self.started_at,
+                 'requests': requests,
+                 'bytes_served': bytes_served,
+                 'not_found_by_zoom': {str(z): count for z, count in sorted(not_found.items())},
+                 'responses_by_source': sources,
+                 'queue_backlog': queue_backlog,
+                 'layers': layers or {}}
+        return stats
+
+    def to_json(self, layers=None, queue_backlog=None) -> str:
+        return json.dumps(self.stats(layers, queue_backlog), indent=1)
+
+    def to_prometheus(self, layers=None, queue_backlog=None) -> str:
+        """
+        Metrics in the Prometheus text exposition format
+
+        Parameters
+        ----------
+        layers : dict, optional
+            Component stats dicts (e.g. 'cache') by tile layer name. The default is None.
+        queue_backlog : int, optional
+            Tiles waiting in the missing tile queue. The default is None.
+
+        Returns
+        -------
+        str
+            Metrics text (version 0.0.4).
+
+        """
+        latency, not_found, sources, bytes_served = self._snapshot()
+        lines = ['# HELP tile_request_duration_seconds Tile request latency by HTTP status',
+                 '# TYPE tile_request_duration_seconds histogram']
+        for status, (counts, total) in sorted(latency.items()):
+            cumulative = 0
+            for le, count in zip([f'{b:g}' for b in self.buckets] + ['+Inf'], counts):
+                cumulative += count
+                lines.append(f'tile_request_duration_seconds_bucket{{status="{status}",le="{le}"}} {cumulative}')
+            lines.append(f'tile_request_duration_seconds_sum{{status="{status}"}} {total:.6f}')
+            lines.append(f'tile_request_duration_seconds_count{{status="{status}"}} {cumulative}')
+        lines += ['# HELP tile_bytes_served_total Tile body bytes sent',
+                  '# TYPE tile_bytes_served_total counter',
+                  f'tile_bytes_served_total {bytes_served}',
+                  '# HELP tile_not_found_total Missing tile requests by zoom level',
+                  '# TYPE tile_not_found_total counter']
+        lines += [f'tile_not_found_total{{zoom="{z}"}} {count}' for z, count in sorted(not_found.items())]
+        lines += ['# HELP tile_responses_total Tiles served by source',
+                  '# TYPE tile_responses_total counter']
+        lines += [f'tile_responses_total{{source="{source}"}} {count}' for source, count in sorted(sources.items())]
+        if queue_backlog is not None:
+            lines += ['# HELP tile_queue_backlog Tiles waiting in the missing tile queue',
+                      '# TYPE tile_queue_backlog gauge',
+                      f'tile_queue_backlog {queue_backlog}']
+        # one metric family per component stat, labelled by layer
+        families = {}
+        for layer, components in (layers or {}).items():
+            for component, component_stats in components.items():
+                for key, value in component_stats.items():
+                    if not isinstance(value, (int, float)): continue
+                    name = f'tile_{component}_{key}_total' if key in COUNTER_KEYS else f'tile_{component}_{key}'
+                    families.setdefault(name, []).append(f'{name}{{layer="{layer}"}} {value}')
+        for name, samples in families.items():
+            lines.append(f'# TYPE {name} {"counter" if name.endswith("_total") else "gauge"}')
+            lines += samples
+        return '\n'.join(lines) + '\n'
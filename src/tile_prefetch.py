@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+
+"""
+Access-pattern-driven map tile prefetching
+
+The map requests every tile of its viewport in a burst, so the tiles requested
+in the last moments outline the viewport, and the shift of its center between
+bursts gives the pan direction. A background thread uses these to load the
+tiles the map is likely to need next into the in-memory tile cache:
+
+1. tiles ahead of the pan direction
+2. the ring of tiles around the viewport
+3. the next zoom level under the viewport
+
+Tiles missing from the store are queued for download instead. Work per burst
+is bounded and request threads only append to a deque.
+"""
+
+from collections import OrderedDict, deque
+from tile_store import MAX_ZOOM
+import threading, time
+
+class TilePrefetcher:
+    """
+    Background thread that warms the tile cache around the map viewport
+    """
+    def __init__(self, store, cache, tile_queue=None, queue_store='', ring=1, lead=2, max_tiles=256, max_queued=64,
+                 window_sec=1.0, settle_sec=0.1, revisit_sec=30.0, max_zoom=MAX_ZOOM):
+        self.store = store
+        self.cache = cache
+        # missing tiles are queued for download (into the store at queue_store) when a queue is given
+        self.tile_queue = tile_queue
+        self.queue_store = queue_store
+        # tiles around the viewport, and extra tiles ahead of the pan direction
+        self.ring = ring
+        self.lead = lead
+        # bounds of the work done per request burst
+        self.max_tiles = max_tiles
+        self.max_queued = max_queued
+        # requests within window_sec of the latest one outline the viewport
+        self.window_sec = window_sec
+        # wait for the burst of viewport requests to finish
+        self.settle_sec = settle_sec
+        # tiles are not re-checked within revisit_sec
+        self.revisit_sec = revisit_sec
+        self.max_zoom = max_zoom
+        self._requests = deque(maxlen=1024)
+        self._visited = OrderedDict()
+        self._last_center = None
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.prefetched = 0
+        self.queued = 0
+        self.bursts = 0
+
+    def observe(self, z: int, x: int, y: int) -> None:
+        """Records a tile request (called by request threads)"""
+        self._requests.append((time.monotonic(), z, x, y))
+        self._wakeup.set()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="tile_prefetch", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set(); self._wakeup.set()
+        if self._thread is not None: self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait()
+            if self._stop.wait(self.settle_sec): break
+            self._wakeup.clear()
+            try:
+                self.prefetch()
+            except Exception as e:
+                # never let a bad tile stop the prefetcher
+                print(f'Tile prefetch error: {e}')
+
+    def get_viewport(self):
+        """
+        Viewport outlined by the latest burst of tile requests
+
+        Returns
+        -------
+        tuple or None
+            (z, x_min, y_min, x_max, y_max) at the zoom level of the latest
+            request, or None without recent requests.
+
+        """
+        requests = list(self._requests)
+        if not requests: return None
+        latest, z = requests[-1][0], requests[-1][1]
+        xs = []; ys = []
+        for t, rz, rx, ry in requests:
+            if rz == z and latest - t <= self.window_sec:
+                xs.append(rx); ys.append(ry)
+        return z, min(xs), min(ys), max(xs), max(ys)
+
+    def get_prefetch_tiles(self, viewport, direction=(0, 0)) -> list:
+        """
+        Tiles to prefetch around a viewport, most likely needed first
+
+        Parameters
+        ----------
+        viewport : tuple
+            (z, x_min, y_min, x_max, y_max) viewport tile range.
+        direction : tuple, optional
+            Pan direction (dx, dy) signs. The default is (0, 0).
+
+        Returns
+        -------
+        list
+            (z, x, y) tiles, at most max_tiles.
+
+        """
+        z, x0, y0, x1, y1 = viewport
+        n = 1 << z
+        dx, dy = direction
+        # ring around the viewport, extended ahead of the pan direction
+        ex0 = max(x0 - self.ring - (self.lead if dx < 0 else 0), 0); ex1 = min(x1 + self.ring + (self.lead if dx > 0 else 0), n - 1)
+        ey0 = max(y0 - self.ring - (self.lead if dy < 0 else 0), 0); ey1 = min(y1 + self.ring + (self.lead if dy > 0 else 0), n - 1)
+        cx = (x0 + x1) / 2; cy = (y0 + y1) / 2
+        ring = [(x, y) for x in range(ex0, ex1 + 1) for y in range(ey0, ey1 + 1)
+                if not (x0 <= x <= x1 and y0 <= y <= y1)]
+        # ahead of the pan first, then nearest to the viewport
+        ring.sort(key=lambda t: (-((t[0] - cx) * dx + (t[1] - cy) * dy),
+                                 max(x0 - t[0], t[0] - x1, y0 - t[1], t[1] - y1)))
+        tiles = [(z, x, y) for x, y in ring]
+        # next zoom level: children of the viewport tiles, center first
+        if z < self.max_zoom:
+            children = [(2 * x + i, 2 * y + j) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1) for i in (0, 1) for j in (0, 1)]
+            children.sort(key=lambda t: abs(t[0] / 2 - cx) + abs(t[1] / 2 - cy))
+            tiles.extend((z + 1, x, y) for x, y in children)
+        return tiles[:self.max_tiles]
+
+    def prefetch(self) -> int:
+        """
+        Warms the cache around the current viewport (one request burst)
+
+        Returns
+        -------
+        int
+            Number of tiles loaded into the cache.
+
+        """
+        viewport = self.get_viewport()
+        if viewport is None: return 0
+        z, x0, y0, x1, y1 = viewport
+        center = (z, (x0 + x1) / 2, (y0 + y1) / 2)
+        direction = (0, 0)
+        if self._last_center is not None and self._last_center[0] == z:
+            direction = ((center[1] > self._last_center[1]) - (center[1] < self._last_center[1]),
+                         (center[2] > self._last_center[2]) - (center[2] < self._last_center[2]))
+        self._last_center = center
+        self.bursts += 1
+        now = time.monotonic()
+        num_prefetched = 0; num_queued = 0
+        for tile in self.get_prefetch_tiles(viewport, direction):
+            if self._stop.is_set() or self._wakeup.is_set(): break  # a newer burst supersedes this one
+            visited_at = self._visited.get(tile)
+            if visited_at is not None and now - visited_at < self.revisit_sec: continue
+            self._visited[tile] = now; self._visited.move_to_end(tile)
+            if len(self._visited) > 8 * self.max_tiles: self._visited.popitem(last=False)
+            if self.cache.contains(tile): continue
+            stored = self.store.get_tile(*tile)
+            if stored is not None:
+                if self.cache.accepts(len(stored[0])):
+                    self.cache.put(tile, stored[0], stored[1])
+                    num_prefetched += 1
+            elif self.tile_queue is not None and num_queued < self.max_queued:
+                self.tile_queue.put(*tile, store=self.queue_store)
+                num_queued += 1
+        self.prefetched += num_prefetched; self.queued += num_queued
+        return num_prefetched
+
+    def stats(self) -> dict:
+        """
+        Prefetch counters
+
+        Returns
+        -------
+        dict
+            Request bursts handled, tiles loaded into the cache and tiles queued for download.
+
+        """
+        return {'bursts': self.bursts,
+                'prefetched': self.prefetched,
+                'queued': self.queued}
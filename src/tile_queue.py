@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+
+"""
+Missing map tile queue
+
+The map server enqueues every tile it could not serve; the dynamic tile
+download service drains the queue. Tiles are kept in a small SQLite database
+in WAL mode, so producer and consumer (separate processes) never rewrite a
+shared file. Every enqueue is one primary-key insert and each tile is queued
+once. The producer also keeps an in-memory set of recently queued tiles, so
+repeated misses for the same tile (the map redraws, several clients) do not
+touch the disk at all.
+
+Each tile records the tile store (directory or MBTiles file) it is missing
+from, and the download service writes it into that store. Tiles queued without
+a store go to the service's default tile directory.
+"""
+
+from collections import OrderedDict
+from functools import lru_cache
+import csv, os, sqlite3, threading, time
+
+# default missing tile queue database
+QUEUE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'queue_files', 'dynamic_tile_queue.db')
+# legacy csv queue (imported once by the download service)
+LEGACY_QUEUE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'queue_files', 'dynamic_tile_queue.csv')
+
+class TileQueue:
+    """
+    Durable, deduplicating FIFO queue of (z, x, y) tiles shared between processes
+
+    Tiles are queued per tile store location ('' is the download service's
+    default store); the same tile can be queued for several stores.
+    """
+    def __init__(self, path: str = QUEUE_FILE, retry_sec: float = 300.0, max_tracked: int = 100000, max_attempts: int = 3):
+        self.path = path
+        # a tile queued within retry_sec is not queued again by this process
+        self.retry_sec = retry_sec
+        self.max_tracked = max_tracked
+        # failed downloads are dropped after max_attempts
+        self.max_attempts = max_attempts
+        # recently queued tiles, oldest first
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connections = []
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connection() as connection:
+            columns = [row[1] for row in connection.execute('PRAGMA table_info(queue)')]
+            if columns and 'store' not in columns:
+                # queue without tile stores: its tiles belong to the default store
+                connection.execute('ALTER TABLE queue RENAME TO queue_without_store')
+            connection.execute('''CREATE TABLE IF NOT EXISTS queue (store TEXT NOT NULL DEFAULT '', z INTEGER, x INTEGER, y INTEGER,
+                                                                    enqueued_ns INTEGER, attempts INTEGER DEFAULT 0, PRIMARY KEY (store, z, x, y))''')
+            if columns and 'store' not in columns:
+                connection.execute("INSERT INTO queue SELECT '', z, x, y, enqueued_ns, attempts FROM queue_without_store")
+                connection.execute('DROP TABLE queue_without_store')
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @staticmethod
+    def _store_key(store: str) -> str:
+        # the service may run from another directory: record absolute locations
+        return os.path.abspath(store) if store else ''
+
+    def put(self, z, x, y, store: str = '') -> bool:
+        """
+        Enqueues a tile
+
+        Parameters
+        ----------
+        z, x, y : int or str
+            Tile coordinates (tkintermapview order).
+        store : str, optional
+            Location of the tile store the tile is missing from. The default
+            is '' (the download service's default store).
+
+        Returns
+        -------
+        bool
+            False if the tile was already queued recently.
+
+        """
+        tile = (self._store_key(store), int(z), int(x), int(y))
+        now = time.monotonic()
+        with self._lock:
+            queued_at = self._recent.get(tile)
+            if queued_at is not None and now - queued_at < self.retry_sec: return False
+        with self._connection() as connection:
+            connection.execute('INSERT OR IGNORE INTO queue (store, z, x, y, enqueued_ns) VALUES (?, ?, ?, ?, ?)', (*tile, time.time_ns()))
+        # only tiles that reached the database suppress repeated misses (a failed insert raises first)
+        with self._lock:
+            self._recent[tile] = now; self._recent.move_to_end(tile)
+            # bound memory: forget the oldest tracked tile (the database still deduplicates)
+            if len(self._recent) > self.max_tracked: self._recent.popitem(last=False)
+        return True
+
+    def put_many(self, tiles, store: str = '') -> None:
+        """Enqueues an iterable of (z, x, y) tiles of one store in one transaction"""
+        store = self._store_key(store)
+        with self._connection() as connection:
+            connection.executemany('INSERT OR IGNORE INTO queue (store, z, x, y, enqueued_ns) VALUES (?, ?, ?, ?, ?)',
+                                   [(store, int(z), int(x), int(y), time.time_ns()) for z, x, y in tiles])
+
+    def stores(self) -> list:
+        """Locations of the tile stores with queued tiles ('' is the default store)"""
+        return [row[0] for row in self._connection().execute('SELECT DISTINCT store FROM queue ORDER BY store')]
+
+    def get_batch(self, limit: int = 100, store: str = '') -> list:
+        """
+        Oldest queued tiles of a store (tiles that failed fewer times first)
+
+        Parameters
+        ----------
+        limit : int, optional
+            Maximum number of tiles. The default is 100.
+        store : str, optional
+            Tile store location, as queued. The default is '' (the default store).
+
+        Returns
+        -------
+        list
+            (z, x, y) tuples; the tiles stay queued until done() or fail().
+
+        """
+        return self._connection().execute('SELECT z, x, y FROM queue WHERE store=? ORDER BY attempts, enqueued_ns LIMIT ?',
+                                          (self._store_key(store), limit)).fetchall()
+
+    def done(self, tiles, store: str = '') -> None:
+        """Removes downloaded (z, x, y) tiles of a store from the queue"""
+        store = self._store_key(store)
+        with self._connection() as connection:
+            connection.executemany('DELETE FROM queue WHERE store=? AND z=? AND x=? AND y=?', [(store, *map(int, tile)) for tile in tiles])
+
+    def fail(self, tiles, store: str = '') -> None:
+        """Records failed downloads of a store, dropping tiles that failed max_attempts times"""
+        store = self._store_key(store)
+        rows = [(store, *map(int, tile)) for tile in tiles]
+        with self._connection() as connection:
+            connection.executemany('UPDATE queue SET attempts = attempts + 1 WHERE store=? AND z=? AND x=? AND y=?', rows)
+            connection.execute('DELETE FROM queue WHERE attempts >= ?', (self.max_attempts,))
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM queue').fetchone()[0]
+
+    def import_csv(self, file_path: str = LEGACY_QUEUE_FILE) -> int:
+        """
+        Moves tiles from a legacy csv queue (Z,Y,X columns) into the queue
+
+        Parameters
+        ----------
+        file_path : str, optional
+            csv file path string. The default is LEGACY_QUEUE_FILE.
+
+        Returns
+        -------
+        int
+            Number of tiles read from the csv file (the file is removed).
+
+        """
+        if not os.path.isfile(file_path): return 0
+        with open(file_path, mode='r', newline='') as file:
+            tiles = [(row['Z'], row['X'], row['Y']) for row in csv.DictReader(file)
+                     if all(str(row.get(key, '')).isdigit() for key in ('Z', 'X', 'Y'))]
+        self.put_many(tiles)
+        os.remove(file_path)
+        return len(tiles)
+
+    def close(self) -> None:
+        """Closes the connections of every thread (threads reconnect if used again)"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for connection in connections: connection.close()
+
+@lru_cache(maxsize=4)
+def get_tile_queue(path: str = QUEUE_FILE) -> TileQueue:
+    """
+    Shared (cached) tile queue for a database path
+    """
+    return TileQueue(path)
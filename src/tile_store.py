@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+
+"""
+Pluggable map tile storage
+
+Tiles are addressed by XYZ (z, x, y) coordinates, the tkintermapview order.
+Two backends share one interface:
+
+- DirectoryTileStore: loose z/x/y.png files (the original map_tiles/ESRI layout)
+- MBTilesTileStore: a single SQLite file in the MBTiles layout (TMS tile rows)
+
+open_tile_store() picks the backend from the location (*.mbtiles -> MBTiles).
+The module also converts stores in bulk:
+
+python tile_store.py ../map_tiles/ESRI ../map_tiles/ESRI.mbtiles
+"""
+
+from functools import lru_cache
+import os, sqlite3, sys, threading, time
+
+# tiles written per transaction when migrating or batch writing
+BATCH_SIZE = 1000
+# deepest zoom level requested by the map (App.MAX_ZOOM)
+MAX_ZOOM = 19
+
+class TileStore:
+    """
+    Interface of a map tile store
+    """
+    def has_tile(self, z: int, x: int, y: int) -> bool:
+        return self.tile_version(z, x, y) is not None
+
+    def tile_version(self, z: int, x: int, y: int):
+        """Modification time (ns) of a tile, or None if it is missing"""
+        raise NotImplementedError
+
+    def get_tile(self, z: int, x: int, y: int):
+        """(data, mtime_ns) of a tile, or None if it is missing"""
+        raise NotImplementedError
+
+    def put_tile(self, z: int, x: int, y: int, data: bytes) -> None:
+        self.put_tiles([(z, x, y, data)])
+
+    def put_tiles(self, tiles) -> int:
+        """Writes an iterable of (z, x, y, data) tiles, returns the number written"""
+        raise NotImplementedError
+
+    def iter_tiles(self):
+        """Yields (z, x, y, data) for every stored tile"""
+        raise NotImplementedError
+
+    def count_stored(self, z: int, x_min: int, y_min: int, x_max: int, y_max: int) -> int:
+        """Number of stored tiles in an inclusive tile range"""
+        return sum(self.has_tile(z, x, y) for x in range(x_min, x_max + 1) for y in range(y_min, y_max + 1))
+
+    def tile_path(self, z: int, x: int, y: int):
+        """File path of a tile for zero-copy serving, or None if tiles are not files"""
+        return None
+
+    def close(self) -> None:
+        pass
+
+class DirectoryTileStore(TileStore):
+    """
+    Tiles stored as loose z/x/y files under a root directory
+    """
+    def __init__(self, root: str, ext: str = '.png'):
+        self.root = root
+        self.ext = ext if ext.startswith('.') else '.' + ext
+
+    def tile_path(self, z, x, y) -> str:
+        return os.path.join(self.root, str(z), str(x), str(y) + self.ext)
+
+    def tile_version(self, z, x, y):
+        try:
+            return os.stat(self.tile_path(z, x, y)).st_mtime_ns
+        except OSError:
+            return None
+
+    def get_tile(self, z, x, y):
+        try:
+            with open(self.tile_path(z, x, y), 'rb') as file:
+                return file.read(), os.fstat(file.fileno()).st_mtime_ns
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError, PermissionError):
+            return None
+
+    def put_tiles(self, tiles) -> int:
+        num_tiles = 0
+        for z, x, y, data in tiles:
+            write_filepath = self.tile_path(z, x, y)
+            os.makedirs(os.path.dirname(write_filepath), exist_ok=True)
+            # write to a temporary file first so readers never see a partial tile
+            temp_filepath = f'{write_filepath}.{threading.get_ident()}.tmp'
+            with open(temp_filepath, mode='wb') as file:
+                file.write(data)
+            os.replace(temp_filepath, write_filepath)
+            num_tiles += 1
+        return num_tiles
+
+    def count_stored(self, z, x_min, y_min, x_max, y_max) -> int:
+        # one directory listing per tile column instead of a stat per tile
+        num_tiles = 0
+        for x in range(x_min, x_max + 1):
+            try:
+                names = os.listdir(os.path.join(self.root, str(z), str(x)))
+            except OSError:
+                continue
+            for name in names:
+                y_name, ext = os.path.splitext(name)
+                if ext == self.ext and y_name.isdigit() and y_min <= int(y_name) <= y_max: num_tiles += 1
+        return num_tiles
+
+    def iter_tiles(self):
+        for z_entry in os.scandir(self.root):
+            if not (z_entry.is_dir() and z_entry.name.isdigit()): continue
+            for x_entry in os.scandir(z_entry.path):
+                if not (x_entry.is_dir() and x_entry.name.isdigit()): continue
+                for y_entry in os.scandir(x_entry.path):
+                    y_name, ext = os.path.splitext(y_entry.name)
+                    if ext != self.ext or not y_name.isdigit() or not y_entry.is_file(): continue
+                    with open(y_entry.path, 'rb') as file:
+                        yield int(z_entry.name), int(x_entry.name), int(y_name), file.read()
+
+class MBTilesTileStore(TileStore):
+    """
+    Tiles stored in a single MBTiles (SQLite) file
+
+    MBTiles rows follow the TMS scheme (row 0 at the south), so y is flipped
+    on the way in and out. Each thread uses its own connection; the database
+    runs in WAL mode so the map server can read while a downloader writes.
+    An extra updated_ns column records when each tile was written; it is added
+    to existing files, and files where it cannot be added (a tiles view, or a
+    read-only file) version their tiles by the file modification time.
+    """
+    def __init__(self, path: str, name: str = None, image_format: str = 'png'):
+        self.path = path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        connection = self._connection()
+        tiles_type = connection.execute("SELECT type FROM sqlite_master WHERE name='tiles'").fetchone()
+        try:
+            with connection:
+                connection.execute('CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT)')
+                if tiles_type is None:
+                    connection.execute('CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB, updated_ns INTEGER)')
+                elif tiles_type[0] == 'table' and 'updated_ns' not in self._columns(connection):
+                    # standard 4-column MBTiles file
+                    connection.execute('ALTER TABLE tiles ADD COLUMN updated_ns INTEGER')
+                if tiles_type is None or tiles_type[0] == 'table':
+                    # INSERT OR REPLACE needs a unique tile index
+                    unique_indexes = [row[1] for row in connection.execute('PRAGMA index_list(tiles)') if row[2]]
+                    if not unique_indexes: connection.execute('CREATE UNIQUE INDEX tile_index ON tiles (zoom_level, tile_column, tile_row)')
+                connection.execute("INSERT OR IGNORE INTO metadata VALUES ('name', ?)", (name or os.path.splitext(os.path.basename(path))[0],))
+                connection.execute("INSERT OR IGNORE INTO metadata VALUES ('format', ?)", (image_format,))
+        except sqlite3.OperationalError:
+            # read-only file: tiles can still be read
+            pass
+        self.has_updated_ns = 'updated_ns' in self._columns(connection)
+
+    @staticmethod
+    def _columns(connection) -> list:
+        return [row[1] for row in connection.execute('PRAGMA table_info(tiles)')]
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            try:
+                connection.execute('PRAGMA journal_mode=WAL')
+            except sqlite3.OperationalError:
+                pass
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _file_version(self) -> int:
+        # last write to the database or its write-ahead log
+        versions = [0]
+        for file_path in (self.path, self.path + '-wal'):
+            try:
+                versions.append(os.stat(file_path).st_mtime_ns)
+            except OSError:
+                pass
+        return max(versions)
+
+    @staticmethod
+    def _tile_row(z, y) -> int:
+        return (1 << int(z)) - 1 - int(y)
+
+    def tile_version(self, z, x, y):
+        if not self.has_updated_ns:
+            row = self._connection().execute('SELECT 1 FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?',
+                                             (int(z), int(x), self._tile_row(z, y))).fetchone()
+            return None if row is None else self._file_version()
+        row = self._connection().execute('SELECT updated_ns FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?',
+                                         (int(z), int(x), self._tile_row(z, y))).fetchone()
+        return None if row is None else (row[0] or 0)
+
+    def get_tile(self, z, x, y):
+        if not self.has_updated_ns:
+            row = self._connection().execute('SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?',
+                                             (int(z), int(x), self._tile_row(z, y))).fetchone()
+            return None if row is None else (bytes(row[0]), self._file_version())
+        row = self._connection().execute('SELECT tile_data, updated_ns FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?',
+                                         (int(z), int(x), self._tile_row(z, y))).fetchone()
+        return None if row is None else (bytes(row[0]), row[1] or 0)
+
+    def put_tiles(self, tiles) -> int:
+        connection = self._connection()
+        now_ns = time.time_ns()
+        rows = [(int(z), int(x), self._tile_row(z, y), sqlite3.Binary(data), now_ns) for z, x, y, data in tiles]
+        # one transaction per batch
+        with connection:
+            if self.has_updated_ns:
+                connection.executemany('INSERT OR REPLACE INTO tiles (zoom_level, tile_column, tile_row, tile_data, updated_ns) VALUES (?, ?, ?, ?, ?)', rows)
+            else:
+                connection.executemany('INSERT OR REPLACE INTO tiles (zoom_level, tile_column, tile_row, tile_data) VALUES (?, ?, ?, ?)', [row[:4] for row in rows])
+        return len(rows)
+
+    def count_stored(self, z, x_min, y_min, x_max, y_max) -> int:
+        # one range count on the tile index (rows are flipped, so y_max gives the lowest row)
+        return self._connection().execute('SELECT COUNT(*) FROM tiles WHERE zoom_level=? AND tile_column BETWEEN ? AND ? AND tile_row BETWEEN ? AND ?',
+                                          (int(z), int(x_min), int(x_max), self._tile_row(z, y_max), self._tile_row(z, y_min))).fetchone()[0]
+
+    def iter_tiles(self):
+        for z, x, row, data in self._connection().execute('SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles'):
+            yield z, x, self._tile_row(z, row), bytes(data)
+
+    def close(self) -> None:
+        """Closes the connections of every thread (threads reconnect if used again)"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for connection in connections: connection.close()
+
+def open_tile_store(location: str, ext: str = '.png') -> TileStore:
+    """
+    Opens the tile store at a location
+
+    Parameters
+    ----------
+    location : str
+        Tile directory, or a *.mbtiles file path.
+    ext : str, optional
+        Tile file extension of directory stores. The default is '.png'.
+
+    Returns
+    -------
+    TileStore
+        MBTiles store for *.mbtiles paths, directory store otherwise.
+
+    """
+    if str(location).lower().endswith('.mbtiles'):
+        return MBTilesTileStore(location, image_format=ext.lstrip('.'))
+    return DirectoryTileStore(location, ext)
+
+@lru_cache(maxsize=16)
+def get_tile_store(location: str, ext: str = '.png') -> TileStore:
+    """
+    Shared (cached) tile store for a location, see open_tile_store
+    """
+    return open_tile_store(location, ext)
+
+def migrate_tiles(source: TileStore, destination: TileStore, batch_size: int = BATCH_SIZE, overwrite: bool = False) -> int:
+    """
+    Copies every tile from one store to another in batched transactions
+
+    Parameters
+    ----------
+    source : TileStore
+        Store to read tiles from.
+    destination : TileStore
+        Store to write tiles to.
+    batch_size : int, optional
+        Tiles written per transaction. The default is 1000.
+    overwrite : bool, optional
+        Replace tiles that already exist in the destination. The default is False.
+
+    Returns
+    -------
+    int
+        Number of tiles written.
+
+    """
+    num_tiles = 0; batch = []
+    t1 = time.time()
+    for tile in source.iter_tiles():
+        if not overwrite and destination.has_tile(*tile[:3]): continue
+        batch.append(tile)
+        if len(batch) >= batch_size:
+            num_tiles += destination.put_tiles(batch); batch = []
+            print(f'Migrated {num_tiles:,} tiles ({num_tiles / max(time.time() - t1, 1e-9):,.0f} tiles/sec)')
+    if batch: num_tiles += destination.put_tiles(batch)
+    return num_tiles
+
+if __name__ == "__main__":
+    # python tile_store.py <source> <destination> [batch size]
+    if len(sys.argv) < 3:
+        print('Usage: python tile_store.py <source dir|.mbtiles> <destination dir|.mbtiles> [batch size]')
+        sys.exit(1)
+    batch_size = int(sys.argv[3]) if len(sys.argv) > 3 else BATCH_SIZE
+    source_store = open_tile_store(sys.argv[1]); destination_store = open_tile_store(sys.argv[2])
+    num_migrated = migrate_tiles(source_store, destination_store, batch_size=batch_size)
+    destination_store.close(); source_store.close()
+    print(f'Migration Finished: {num_migrated:,} tiles written to {sys.argv[2]}')
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+
+"""
+Stand-in imagery for missing map tiles
+
+When a tile is not in the tile store, the map server can synthesize one from
+imagery that is stored:
+
+- overzoom: the matching region of the nearest stored ancestor tile, upscaled
+- underzoom: the four child tiles, mosaicked and downsampled
+
+Synthesized tiles are only stand-ins. The map server keeps them in their own
+short-lived cache and always checks the store for real imagery first, so real
+tiles replace them as soon as they are downloaded.
+"""
+
+import io
+from tile_store import MAX_ZOOM
+
+try:
+    from PIL import Image
+except ImportError:
+    # Pillow missing: tiles are not synthesized (404 as before)
+    Image = None
+
+# furthest ancestor used for overzoom (beyond 8 levels a tile is one ancestor pixel or less)
+MAX_OVERZOOM_LEVELS = 8
+TILE_SIZE = 256
+# JPEG quality of synthesized imagery tiles
+JPEG_QUALITY = 85
+
+def _open_image(data: bytes):
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    return image
+
+def _encode_image(image) -> tuple:
+    buffer = io.BytesIO()
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image.save(buffer, format='PNG')
+        return buffer.getvalue(), 'image/png'
+    image.convert('RGB').save(buffer, format='JPEG', quality=JPEG_QUALITY)
+    return buffer.getvalue(), 'image/jpeg'
+
+def overzoom_tile(store, z: int, x: int, y: int, max_levels: int = MAX_OVERZOOM_LEVELS):
+    """
+    Tile cut from the nearest stored ancestor tile and upscaled
+
+    Parameters
+    ----------
+    store : TileStore
+        Tile store to read ancestor tiles from.
+    z, x, y : int
+        Missing tile coordinates.
+    max_levels : int, optional
+        Number of ancestor levels searched. The default is 8.
+
+    Returns
+    -------
+    PIL.Image.Image or None
+        Stand-in tile image, or None without a stored ancestor.
+
+    """
+    for dz in range(1, min(max_levels, z) + 1):
+        tile = store.get_tile(z - dz, x >> dz, y >> dz)
+        if tile is None: continue
+        ancestor = _open_image(tile[0])
+        if ancestor.mode not in ('RGB', 'RGBA'): ancestor = ancestor.convert('RGBA' if ancestor.mode in ('LA', 'P', 'PA') else 'RGB')
+        # region of the ancestor covered by the tile (may be smaller than a pixel)
+        scale = ancestor.width / (1 << dz)
+        left = (x & ((1 << dz) - 1)) * scale; top = (y & ((1 << dz) - 1)) * scale
+        return ancestor.resize((TILE_SIZE, TILE_SIZE), Image.BILINEAR, box=(left, top, left + scale, top + scale))
+    return None
+
+def _get_children(store, z, x, y) -> list:
+    children = []
+    if z >= MAX_ZOOM: return children
+    for dy in (0, 1):
+        for dx in (0, 1):
+            tile = store.get_tile(z + 1, 2 * x + dx, 2 * y + dy)
+            if tile is not None: children.append((dx, dy, _open_image(tile[0])))
+    return children
+
+def _mosaic_children(children):
+    mosaic = Image.new('RGB', (2 * TILE_SIZE, 2 * TILE_SIZE))
+    for dx, dy, child in children:
+        if child.size != (TILE_SIZE, TILE_SIZE): child = child.resize((TILE_SIZE, TILE_SIZE), Image.BILINEAR)
+        mosaic.paste(child.convert('RGB'), (dx * TILE_SIZE, dy * TILE_SIZE))
+    # 2x2 box filter
+    return mosaic.reduce(2)
+
+def underzoom_tile(store, z: int, x: int, y: int, min_children: int = 4):
+    """
+    Tile downsampled from its four stored child tiles
+
+    Parameters
+    ----------
+    store : TileStore
+        Tile store to read child tiles from.
+    z, x, y : int
+        Missing tile coordinates.
+    min_children : int, optional
+        Number of children that must be stored; missing quadrants are left
+        black. The default is 4.
+
+    Returns
+    -------
+    PIL.Image.Image or None
+        Stand-in tile image, or None with too few stored children.
+
+    """
+    children = _get_children(store, z, x, y)
+    if len(children) < max(min_children, 1): return None
+    return _mosaic_children(children)
+
+def synthesize_tile(store, z: int, x: int, y: int, max_zoom: int = MAX_ZOOM):
+    """
+    Stand-in for a missing tile from stored children or ancestors
+
+    All four children give the sharpest result, then the nearest ancestor,
+    then any stored children.
+
+    Parameters
+    ----------
+    store : TileStore
+        Tile store holding the real imagery.
+    z, x, y : int
+        Missing tile coordinates.
+    max_zoom : int, optional
+        Deepest zoom level synthesized. The default is 19 (App.MAX_ZOOM).
+
+    Returns
+    -------
+    tuple or None
+        (content, content_type, method) with method 'underzoom' or 'overzoom',
+        or None if Pillow is unavailable or no source imagery is stored.
+
+    """
+    if Image is None or not 0 <= z <= max_zoom or not (0 <= x < (1 << z) and 0 <= y < (1 << z)): return None
+    try:
+        children = _get_children(store, z, x, y)
+        if len(children) == 4: return (*_encode_image(_mosaic_children(children)), 'underzoom')
+        image = overzoom_tile(store, z, x, y)
+        if image is not None: return (*_encode_image(image), 'overzoom')
+        if children: return (*_encode_image(_mosaic_children(children)), 'underzoom')
+    except OSError:
+        # unreadable source imagery
+        pass
+    return None
@@ -329,31 +329,11 @@ def adjust_coordinate(starting_coord: list,azimuth_degrees: (float,int),shift_m:
         Adjusted coordinate based on input in [lat,lon] format
         
     """
-    # import libraries
-    import math
-    try:
-        # input assertations
-        assert isinstance(starting_coord,list) and len(starting_coord) == 2, 'Coordinate [lat,lon] needs to be a list of length 2.'
-        assert isinstance(shift_m,(float,int)) and shift_m >= 5, 'Adjustment needs to be a float of at least 10m.'
-        assert isinstance(azimuth_degrees,(float,int)) and 0 <= azimuth_degrees <= 360, 'Adjustment needs to be a float betwneen 0 and 360.'
-    except AssertionError as ae:
-        print(f"Assertation Error in Adjust Coordinate method: {ae}")
-        return None
-    # function to generate lat,lon adjustments
-    def func(degrees: (float,int), magnitude: (float,int)) -> tuple: # returns in lat,lon format
-        return magnitude * math.cos(math.radians(degrees)), magnitude * math.sin(math.radians(degrees))
-    # earth radius in meters
-    earth_radius_meters = 6371000.0
-    # define starting lat,lon
-    starting_lat = float(starting_coord[0]); starting_lon = float(starting_coord[1])
-    # define adjustments to lat,lon
-    lat_adjustment_m, lon_adjustment_m = func(azimuth_degrees,shift_m)
-    # generate adjusted latitude
-    new_lat = starting_lat  + (lat_adjustment_m / earth_radius_meters) * (180 / math.pi)
-    # generate adjusted longitude
-    new_lon = starting_lon + (lon_adjustment_m / earth_radius_meters) * (180 / math.pi) / math.cos(starting_lat * math.pi/180)
+    from geodesy import destination
+    # project starting coordinate along the azimuth (great-circle)
+    new_lat, new_lon = destination(float(starting_coord[0]),float(starting_coord[1]),azimuth_degrees,shift_m)
     # return adjusted coordinate
-    return [new_lat,new_lon]
+    return [float(new_lat),float(new_lon)]
 
 def convert_coords_to_mgrs(coords: list,precision:int = 5) -> (str,None):
     """
@@ -372,11 +352,11 @@ def convert_coords_to_mgrs(coords: list,precision:int = 5) -> (str,None):
         Location in MGRS notation.
 
     """
-    import mgrs
+    from mgrs_codec import coords_to_mgrs
     try:
         assert isinstance(coords,list), 'Coordinate input must be a list.'
         assert len(coords) == 2, 'Coordinate input must be of length 2.'
-        return str(mgrs.MGRS().toMGRS(coords[0], coords[1],MGRSPrecision=precision)).strip()
+        return coords_to_mgrs(coords,precision)
     except AssertionError:
         return None
 
@@ -395,11 +375,10 @@ def convert_mgrs_to_coords(milGrid: str) -> (list,None):
         Grid coordinate. Example: [lat,long].
 
     """
-    import mgrs
+    from mgrs_codec import mgrs_to_coords
     try:
         assert isinstance(milGrid,str), 'MGRS must be a string'
-        milGrid = milGrid.replace(" ","").strip()
-        return list(mgrs.MGRS().toLatLon(milGrid.encode()))
+        return mgrs_to_coords(milGrid)
     except AssertionError:
         return None
 
@@ -560,7 +539,6 @@ def get_coord_box(center_coord,x_dist_m,y_dist_m):
         Coodinate string in "min_lon, min_lat, max_lon, max_lat" format.
 
     """
-    from main import adjust_coordinate
     import numpy as np
     diag_dist = np.sqrt(x_dist_m**2 + y_dist_m**2)
     tl_coord = adjust_coordinate(center_coord,315,diag_dist)
@@ -585,16 +563,8 @@ def get_distance_between_coords(coord1,coord2):
         Distance between two coordinates in meters.
 
     """
-    import haversine
-    if isinstance(coord1,tuple):
-        coord1 = list(coord1)
-    if isinstance(coord2,tuple):
-        coord2 = list(coord2)        
-    # assert isinstance(coord1,list), 'Coordinate 1 must be a list.'
-    assert len(coord1) == 2, 'Coordinate 1 must be of length 2.'
-    # assert isinstance(coord2,list), 'Coordinate 2 must be a list.'
-    assert len(coord2) == 2, 'Coordinate 2 must be of length 2.'
-    return haversine.haversine(coord1,coord2,unit=haversine.Unit.METERS)
+    from geodesy import distance
+    return float(distance(coord1[0],coord1[1],coord2[0],coord2[1]))
 
 def get_bearing_between_coordinates(coord_origin: list,coord_tgt: list) -> float:
     """
@@ -613,24 +583,8 @@ def get_bearing_between_coordinates(coord_origin: list,coord_tgt: list) -> float
         Bearing in range [0-360]
 
     """
-    import math
-    import numpy as np
-    # define local variables
-    long1 = coord_origin[1]; lat1 = coord_origin[0]
-    long2 = coord_tgt[1]; lat2 = coord_tgt[0]
-    dLon = (long2 - long1)
-    # translate coordinate formats
-    x = math.cos(math.radians(lat2)) * math.sin(math.radians(dLon))
-    y = math.cos(math.radians(lat1)) * math.sin(math.radians(lat2)) - math.sin(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.cos(math.radians(dLon))
-    # find bearing in radians
-    brng_radians = np.arctan2(x,y)
-    brng_degrees = np.degrees(brng_radians)
-    # adjust negative bearings (below lower bound)
-    while brng_degrees < 0:
-        brng_degrees += 360
-    # adjust large bearings (above upper bound)
-    brng_degrees = brng_degrees % 360
-    return brng_degrees
+    from geodesy import bearing
+    return float(bearing(coord_origin[0],coord_origin[1],coord_tgt[0],coord_tgt[1]))
 
 def get_center_coord(coord_list):
     """
@@ -698,8 +652,8 @@ def emission_distance(P_t_watts,f_MHz,G_t,G_r,R_s,path_loss_coeff=3):
         Theoretical maximum distance in km.
 
     """
-    import math
-    return 10**((convert_watts_to_dBm(P_t_watts)+(G_t)-32.4-(10*path_loss_coeff*math.log10(f_MHz))+(G_r)-R_s)/(10*path_loss_coeff))
+    from propagation import emission_distance as propagation_emission_distance
+    return float(propagation_emission_distance(P_t_watts,f_MHz,G_t,G_r,R_s,path_loss_coeff))
 
 def emission_optical_maximum_distance(t_h,r_h):
     """
@@ -849,6 +803,10 @@ def check_for_intersection(sensor1_coord,end_of_lob1,sensor2_coord,end_of_lob2):
 
     """
     if None in [sensor1_coord,end_of_lob1,sensor2_coord,end_of_lob2]: return False
+    from local_frame import get_frame_for_coords
+    # test in a local metric frame, where the LOBs (great circles) are straight lines
+    frame = get_frame_for_coords([sensor1_coord,end_of_lob1,sensor2_coord,end_of_lob2])
+    sensor1_coord,end_of_lob1,sensor2_coord,end_of_lob2 = frame.to_local([sensor1_coord,end_of_lob1,sensor2_coord,end_of_lob2]).tolist()
     def ccw(A,B,C):
         return (C[0]-A[0]) * (B[1]-A[1]) > (B[0]-A[0]) * (C[1]-A[1])
     return ccw(sensor1_coord,sensor2_coord,end_of_lob2) != ccw(end_of_lob1,sensor2_coord,end_of_lob2) and ccw(sensor1_coord,end_of_lob1,sensor2_coord) != ccw(sensor1_coord,end_of_lob1,end_of_lob2)
@@ -860,40 +818,31 @@ def check_if_point_in_polygon(point,polygon):
     return area.contains(coord_candidate)
 
 def get_polygon_area(shape_coords): # returns area in acres
-    import numpy as np
-    x = [convert_coordinates_to_meters(sc[0]) for sc in shape_coords]
-    y = [convert_coordinates_to_meters(sc[1]) for sc in shape_coords]    
-    return (0.5*np.abs(np.dot(x,np.roll(y,1))-np.dot(y,np.roll(x,1))))/4046.856422
+    from polygon_clipping import get_polygon_area_and_centroid
+    return get_polygon_area_and_centroid(shape_coords)[0]
 
 def get_coords_from_LOBs(sensor_coord,azimuth,error,min_lob_length,max_lob_length):
-    center_coord_list = []
-    right_error_azimuth = (azimuth+error) % 360
-    left_error_azimuth = (azimuth-error) % 360
-    running_coord_left = [list(sensor_coord)[0],list(sensor_coord)[1]]
-    running_coord_center = [list(sensor_coord)[0],list(sensor_coord)[1]]
-    running_coord_right = [list(sensor_coord)[0],list(sensor_coord)[1]]
-    lob_length = 0
-    interval_meters = 30
-    while interval_meters > max_lob_length and interval_meters > 10:
-        interval_meters -= 10
-    near_right_coord = []; near_left_coord = []; far_right_coord = []; far_left_coord = []
-    while lob_length <= max_lob_length:
-        running_coord_left = adjust_coordinate(running_coord_left,left_error_azimuth,interval_meters)
-        running_coord_right = adjust_coordinate(running_coord_right,right_error_azimuth,interval_meters)
-        running_coord_center = adjust_coordinate(running_coord_center,azimuth,interval_meters)
-        center_coord_list.append(running_coord_center)    
-        if lob_length > min_lob_length:
-            if near_right_coord == []: near_right_coord = list(running_coord_right)
-            if near_left_coord == []: near_left_coord = list(running_coord_left)
-        lob_length += interval_meters
-    far_right_coord = running_coord_right
-    far_left_coord = running_coord_left
-    center_coord = get_center_coord([near_right_coord,near_left_coord,far_right_coord,far_left_coord])
-    near_center_coord = get_center_coord([near_right_coord,near_left_coord])
-    center_coord_list = [c for c in center_coord_list if len(c) <= 2]
-    return center_coord, near_right_coord, near_left_coord, near_center_coord, far_right_coord, far_left_coord, running_coord_center, center_coord_list
-
-
+    """
+    Generates the LOB wedge coordinates for a sensor (see lob_geometry.get_lob_coords)
 
+    Parameters
+    ----------
+    sensor_coord : list
+        Sensor coordinate in [lat,lon] format
+    azimuth : float
+        LOB bearing in degrees
+    error : float
+        Sensor bearing error in degrees
+    min_lob_length : float
+        Near edge of the LOB in meters
+    max_lob_length : float
+        Far edge of the LOB in meters
 
+    Returns
+    -------
+    tuple
+        center, near right, near left, near center, far right, far left, far center coordinates and the center-line coordinate list
 
+    """
+    from lob_geometry import get_lob_coords
+    return get_lob_coords(sensor_coord,azimuth,error,min_lob_length,max_lob_length,center_line=True)
@@ -0,0 +1,66 @@
+import os, sys, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+# the app modules are flat scripts in src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from geodesy import bearing
+from targeting_engine import EmitterParameters, SensorReport
+
+# emitter and three sensors about 11 km from it
+TARGET = [35.30, -116.80]
+SENSORS = [[35.25, -116.90], [35.38, -116.88], [35.22, -116.72]]
+
+@pytest.fixture
+def target():
+    return list(TARGET)
+
+@pytest.fixture
+def sensors():
+    return [list(coord) for coord in SENSORS]
+
+@pytest.fixture
+def params():
+    # range bounds (about 4.8-17.6 km) cover the sensor-target distances
+    return EmitterParameters(frequency_MHz=150, min_erp_watts=1, max_erp_watts=50, path_loss_coeff=3)
+
+@pytest.fixture
+def get_reports(target, sensors):
+    """Report factory: exact bearings from each sensor to the target"""
+    def get_reports(report_sensors=sensors, error_deg=2):
+        return [SensorReport(coord=coord, azimuth=float(bearing(*coord, *target)), power_received_dBm=-88, error_deg=error_deg)
+                for coord in report_sensors]
+    return get_reports
+
+class TileServer:
+    """Local HTTP tile server: the body of a tile is its request path, /404/... paths are missing"""
+    def __init__(self):
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server.requests.append(self.path)
+                status = 404 if self.path.startswith('/404/') else 200
+                body = self.path.encode()
+                self.send_response(status)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_port}'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+@pytest.fixture
+def tile_server():
+    server = TileServer()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
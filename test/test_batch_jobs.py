@@ -0,0 +1,118 @@
+import _thread, threading
+import pytest
+import batch_jobs
+from batch_jobs import (count_tiles, create_job, estimate_download, get_throughput, get_tile_range, get_unfinished_jobs, list_jobs,
+                        load_job, lonlat_to_tile, run_job, save_job)
+from tile_fetch import FetchEngine
+from tile_store import open_tile_store
+
+EXTENT = [-78.0, 38.0, -76.0, 40.0]
+
+@pytest.fixture
+def engine():
+    engine = FetchEngine(requests_per_sec=None, per_host=4)
+    yield engine
+    engine.close()
+
+def test_tile_math():
+    assert lonlat_to_tile(0.0, 0.0, 1) == (1, 1)
+    assert lonlat_to_tile(-180.0, 85.1, 3) == (0, 0)
+    assert lonlat_to_tile(180.0, -90.0, 3) == (7, 7)
+    x_min, y_min, x_max, y_max = get_tile_range(EXTENT, 10)
+    assert x_min <= x_max and y_min <= y_max
+    assert count_tiles(EXTENT, 10) == (x_max - x_min + 1) * (y_max - y_min + 1)
+    assert count_tiles(EXTENT, 11) >= 4 * count_tiles(EXTENT, 10) - 4 * (x_max - x_min + y_max - y_min + 2)
+
+def test_journal_round_trip(tmp_path):
+    job = create_job('http://tiles/{z}/{x}/{y}.png', str(tmp_path / 'tiles'), EXTENT, 8, 10, journal_dir=str(tmp_path))
+    job.zooms['9']['done_ahead'] = {3, 1}
+    save_job(job, str(tmp_path))
+    loaded = load_job(job.job_id, str(tmp_path))
+    assert loaded.zooms['9']['done_ahead'] == [1, 3]
+    assert loaded.extent == EXTENT and loaded.num_tiles == sum(count_tiles(EXTENT, z) for z in (8, 9, 10))
+    assert [j.job_id for j in list_jobs(str(tmp_path))] == [job.job_id]
+
+def test_run_downloads_every_tile_once(tmp_path, tile_server, engine):
+    output_dir = str(tmp_path / 'tiles')
+    job = create_job(tile_server.url + '/{z}/{x}/{y}.png', output_dir, EXTENT, 8, 10, journal_dir=str(tmp_path))
+    run_job(job, engine=engine, journal_dir=str(tmp_path))
+    job = load_job(job.job_id, str(tmp_path))
+    assert job.status == 'complete'
+    assert len(tile_server.requests) == len(set(tile_server.requests)) == job.num_tiles
+    assert all(state['cursor'] == state['total'] == state['completed'] for state in job.zooms.values())
+    x_min, y_min, _, _ = get_tile_range(EXTENT, 10)
+    assert open_tile_store(output_dir).get_tile(10, x_min, y_min)[0] == f'/10/{x_min}/{y_min}.png'.encode()
+    assert get_unfinished_jobs(str(tmp_path)) == []
+
+def test_resume_starts_at_the_checkpoint(tmp_path, tile_server, engine):
+    job = create_job(tile_server.url + '/{z}/{x}/{y}.png', str(tmp_path / 'tiles.mbtiles'), EXTENT, 9, 10, journal_dir=str(tmp_path))
+    # checkpoint of an interrupted job: zoom 9 done, zoom 10 done up to tile 10 and tile 12 out of order
+    job.zooms['9'].update(cursor=job.zooms['9']['total'], completed=job.zooms['9']['total'])
+    job.zooms['10'].update(cursor=10, done_ahead=[12], completed=11)
+    job.status = 'interrupted'
+    save_job(job, str(tmp_path))
+    assert [j.job_id for j in get_unfinished_jobs(str(tmp_path))] == [job.job_id]
+    run_job(load_job(job.job_id, str(tmp_path)), engine=engine, journal_dir=str(tmp_path))
+    total = job.zooms['10']['total']
+    x_min, y_min, _, y_max = get_tile_range(EXTENT, 10)
+    height = y_max - y_min + 1
+    expected = {f'/10/{x_min + i // height}/{y_min + i % height}.png' for i in range(10, total) if i != 12}
+    assert len(tile_server.requests) == len(expected)
+    assert set(tile_server.requests) == expected
+    job = load_job(job.job_id, str(tmp_path))
+    assert job.status == 'complete' and job.zooms['10']['cursor'] == total and job.zooms['10']['done_ahead'] == []
+
+def test_interrupted_job_resumes_without_repeats(tmp_path, tile_server):
+    job = create_job(tile_server.url + '/{z}/{x}/{y}.png', str(tmp_path / 'tiles'), EXTENT, 10, 11, parallel=4,
+                     requests_per_sec=50, journal_dir=str(tmp_path))
+    # Ctrl+C while tiles finish on the engine's loop thread and checkpoints are written
+    timer = threading.Timer(1.0, _thread.interrupt_main)
+    timer.start()
+    with pytest.raises(KeyboardInterrupt):
+        run_job(job, checkpoint_sec=0.01, journal_dir=str(tmp_path))
+    timer.cancel()
+    job = load_job(job.job_id, str(tmp_path))
+    assert job.status == 'interrupted'
+    assert 0 < len(tile_server.requests) < job.num_tiles
+    for state in job.zooms.values():
+        assert all(i > state['cursor'] for i in state['done_ahead'])
+        assert state['completed'] + state['skipped'] + state['failed'] == state['cursor'] + len(state['done_ahead'])
+    run_job(job, journal_dir=str(tmp_path))
+    assert len(tile_server.requests) == len(set(tile_server.requests)) == job.num_tiles
+
+def test_failed_tiles_are_journaled(tmp_path, tile_server, engine):
+    job = create_job(tile_server.url + '/404/{z}/{x}/{y}.png', str(tmp_path / 'tiles'), EXTENT, 8, 8, journal_dir=str(tmp_path))
+    run_job(job, engine=engine, journal_dir=str(tmp_path))
+    job = load_job(job.job_id, str(tmp_path))
+    assert job.zooms['8']['failed'] == job.num_tiles == len(job.failed_tiles)
+    assert job.zooms['8']['cursor'] == job.num_tiles
+
+def test_estimate_counts_missing_tiles(tmp_path, tile_server, engine):
+    output_dir = str(tmp_path / 'tiles')
+    job = create_job(tile_server.url + '/{z}/{x}/{y}.png', output_dir, EXTENT, 8, 9, journal_dir=str(tmp_path))
+    # no measurements yet: the request budget and the default tile size
+    estimate = estimate_download(output_dir, EXTENT, 8, 10, requests_per_sec=20, journal_dir=str(tmp_path))
+    assert estimate['missing'] == estimate['tiles'] and not estimate['measured']
+    assert estimate['eta_sec'] == pytest.approx(estimate['missing'] / 20)
+    run_job(job, engine=engine, journal_dir=str(tmp_path))
+    estimate = estimate_download(output_dir, EXTENT, 8, 10, journal_dir=str(tmp_path))
+    assert estimate['zooms'][8]['missing'] == estimate['zooms'][9]['missing'] == 0
+    assert estimate['missing'] == estimate['zooms'][10]['total'] == count_tiles(EXTENT, 10)
+    assert estimate['measured'] and estimate['tiles_per_sec'] > 0
+    # measured tile size: the test server's bodies are their ~20 byte paths
+    assert 10 < estimate['bytes'] / estimate['missing'] < 40
+
+def test_throughput_is_only_reparsed_after_a_journal_write(tmp_path, monkeypatch):
+    job = create_job('http://tiles/{z}/{x}/{y}.png', str(tmp_path / 'tiles'), EXTENT, 8, 8, journal_dir=str(tmp_path))
+    job.zooms['8']['completed'] = 10; job.download_sec = 2.0; job.downloaded_bytes = 1000
+    save_job(job, str(tmp_path))
+    loads = []
+    load_job = batch_jobs.load_job
+    monkeypatch.setattr(batch_jobs, 'load_job', lambda *args: loads.append(args) or load_job(*args))
+    assert get_throughput(str(tmp_path)) == (5.0, 100.0)
+    assert get_throughput(str(tmp_path)) == (5.0, 100.0)
+    assert len(loads) == 1
+    job.zooms['8']['completed'] = 20
+    save_job(job, str(tmp_path))
+    assert get_throughput(str(tmp_path)) == (10.0, 50.0)
+    assert len(loads) == 2
@@ -0,0 +1,35 @@
+import numpy as np
+from fix_solver import confidence_scale, solve_fix
+from geodesy import bearing, distance
+
+def exact_azimuths(target, sensors):
+    sensors = np.asarray(sensors)
+    return bearing(sensors[:, 0], sensors[:, 1], target[0], target[1])
+
+def test_confidence_scale():
+    # 2D chi-square: 39.35% of samples fall inside the 1-sigma ellipse
+    assert np.isclose(confidence_scale(1 - np.exp(-0.5)), 1.0)
+    assert np.isclose(confidence_scale(0.95), 2.4477, atol=1e-4)
+
+def test_exact_bearings_recover_the_target(target, sensors):
+    result = solve_fix(sensors, exact_azimuths(target, sensors), 2.0)
+    assert distance(*result['coord'], *target) < 1.0
+    assert np.allclose(result['residuals_deg'], 0, atol=1e-3)
+    assert all(result['ahead'])
+
+def test_ellipse_is_in_meters_for_a_single_iteration(target, sensors):
+    one = solve_fix(sensors, exact_azimuths(target, sensors), 2.0, iterations=1)
+    five = solve_fix(sensors, exact_azimuths(target, sensors), 2.0, iterations=5)
+    # ~10 km ranges at 2 degrees: hundreds of meters
+    assert 100 < five['ellipse']['semi_major_m'] < 5000
+    assert np.isclose(one['ellipse']['semi_major_m'], five['ellipse']['semi_major_m'], rtol=0.01)
+    assert np.allclose(one['covariance_m2'], five['covariance_m2'], rtol=0.01)
+
+def test_ellipse_grows_with_bearing_error(target, sensors):
+    narrow = solve_fix(sensors, exact_azimuths(target, sensors), 1.0)['ellipse']['semi_major_m']
+    wide = solve_fix(sensors, exact_azimuths(target, sensors), 4.0)['ellipse']['semi_major_m']
+    assert np.isclose(wide / narrow, 4.0, rtol=1e-6)
+
+def test_parallel_or_single_bearings_have_no_fix(sensors):
+    assert solve_fix(sensors[:1], [45.0], 2.0) is None
+    assert solve_fix([[35.0, -117.0], [35.0, -117.0]], [45.0, 45.0], 2.0) is None
@@ -0,0 +1,26 @@
+import numpy as np
+from geodesy import EARTH_RADIUS_M, bearing, bearing_between_coords, destination, destination_coords, distance, distance_between_coords
+
+def test_one_degree_of_latitude():
+    assert np.isclose(distance(0, 0, 1, 0), EARTH_RADIUS_M * np.pi / 180)
+    assert np.isclose(bearing(0, 0, 1, 0), 0)
+    assert np.isclose(bearing(0, 0, 0, 1), 90)
+
+def test_destination_round_trip():
+    lat, lon = destination(35.3, -116.8, [0, 45, 135, 300], 12345.0)
+    assert np.allclose(distance(35.3, -116.8, lat, lon), 12345.0)
+    # the back bearing differs from the reverse azimuth only by the small meridian convergence
+    back = (np.asarray(bearing(lat, lon, 35.3, -116.8)) - np.array([180, 225, 315, 120])) % 360
+    assert np.all(np.minimum(back, 360 - back) < 0.2)
+
+def test_broadcasting_one_sensor_many_bearings():
+    lat, lon = destination(35.3, -116.8, np.arange(0, 360, 10), np.array([[1000.0], [5000.0]]))
+    assert lat.shape == lon.shape == (2, 36)
+    assert np.allclose(distance(35.3, -116.8, lat, lon), [[1000.0], [5000.0]])
+
+def test_coordinate_array_helpers():
+    coords = np.array([[35.3, -116.8], [10.0, 20.0]])
+    moved = destination_coords(coords, 90, 2000.0)
+    assert moved.shape == (2, 2)
+    assert np.allclose(distance_between_coords(coords, moved), 2000.0)
+    assert np.allclose(bearing_between_coords(coords, moved), 90, atol=0.1)
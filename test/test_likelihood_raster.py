@@ -0,0 +1,53 @@
+import numpy as np
+from geodesy import bearing, distance
+from likelihood_raster import compute_likelihood_raster, get_raster_bounds
+
+def get_bounds(target, half_deg=0.05):
+    # ~11 km x 9 km around the target
+    return (target[0] - half_deg, target[1] - half_deg, target[0] + half_deg, target[1] + half_deg)
+
+def test_fix_peak_is_at_the_emitter(get_reports, params, target):
+    raster = compute_likelihood_raster(get_reports(), params, bounds=get_bounds(target), resolution_m=25, max_workers=1)
+    assert distance(*raster.peak_coord, *target) < 2 * 25
+    assert raster.shape[0] > 400 and raster.shape[1] > 300
+
+def test_chunked_evaluation_matches_a_single_chunk(get_reports, params, target):
+    kwargs = dict(bounds=get_bounds(target), resolution_m=50, max_workers=1, keep_cells=True)
+    whole = compute_likelihood_raster(get_reports(), params, chunk_cells=10 ** 8, **kwargs)
+    # chunks of a few rows: every chunk is normalized to the peak of the whole raster
+    chunked = compute_likelihood_raster(get_reports(), params, chunk_cells=3 * 1000, **kwargs)
+    assert chunked.peak_coord == whole.peak_coord
+    assert np.allclose(chunked.log_likelihood, whole.log_likelihood)
+    assert chunked.log_likelihood.max() == 0
+    assert [region.num_cells for region in chunked.regions] == [region.num_cells for region in whole.regions]
+
+def test_high_density_regions_hold_their_probability(get_reports, params, target):
+    raster = compute_likelihood_raster(get_reports(), params, bounds=get_bounds(target), resolution_m=50, max_workers=1, keep_cells=True)
+    half, most = raster.regions
+    assert (half.probability, most.probability) == (0.5, 0.9)
+    assert 0 < half.num_cells < most.num_cells and half.area_acres < most.area_acres
+    # the 50% region lies inside the 90% region, and both contain the peak
+    assert most.bounds[0] <= half.bounds[0] <= raster.peak_coord[0] <= half.bounds[2] <= most.bounds[2]
+    assert most.bounds[1] <= half.bounds[1] <= raster.peak_coord[1] <= half.bounds[3] <= most.bounds[3]
+    likelihood = np.exp(raster.log_likelihood.astype(float))
+    for region in raster.regions:
+        inside = raster.log_likelihood >= region.log_likelihood_threshold
+        # the smallest set of log-likelihood bins reaching the probability (one bin of slack)
+        assert likelihood[inside].sum() / likelihood.sum() >= region.probability - 0.01
+        assert abs(inside.sum() - region.num_cells) <= 0.02 * region.num_cells
+
+def test_process_pool_matches_serial(get_reports, params, target):
+    kwargs = dict(bounds=get_bounds(target), resolution_m=50, chunk_cells=20000, keep_cells=True)
+    serial = compute_likelihood_raster(get_reports(), params, max_workers=1, **kwargs)
+    parallel = compute_likelihood_raster(get_reports(), params, max_workers=2, **kwargs)
+    assert parallel.peak_coord == serial.peak_coord
+    assert np.array_equal(parallel.log_likelihood, serial.log_likelihood)
+    assert [(r.num_cells, r.bounds) for r in parallel.regions] == [(r.num_cells, r.bounds) for r in serial.regions]
+
+def test_single_lob_peaks_along_the_bearing(get_reports, params, sensors):
+    report = get_reports(sensors[:1])[0]
+    bounds = get_raster_bounds([report], params)
+    raster = compute_likelihood_raster([report], params, bounds=bounds, resolution_m=100, max_workers=1)
+    assert bounds[0] < report.coord[0] < bounds[2] and bounds[1] < report.coord[1] < bounds[3]
+    assert abs(float(bearing(*report.coord, *raster.peak_coord)) - report.azimuth) < 1.0
+    assert compute_likelihood_raster([], params) is None
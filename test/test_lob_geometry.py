@@ -0,0 +1,31 @@
+import numpy as np
+from geodesy import bearing, distance
+from lob_geometry import get_lob_center_line, get_lob_coords, get_lob_wedges
+
+def test_wedge_corners_lie_on_the_edge_bearings(sensors):
+    azimuths = [10.0, 355.0, 200.0]
+    center, near_right, near_left, near_center, far_right, far_left, far_center = get_lob_wedges(sensors, azimuths, [3, 3, 5], [500, 500, 1000], [8000, 8000, 12000])
+    lat, lon = np.asarray(sensors).T
+    for corner, offset, expected in [(near_left, -1, [500, 500, 1000]), (far_left, -1, [8000, 8000, 12000]),
+                                     (near_right, 1, [500, 500, 1000]), (far_right, 1, [8000, 8000, 12000])]:
+        assert np.allclose(distance(lat, lon, corner[:, 0], corner[:, 1]), expected, rtol=1e-6)
+        turn = (bearing(lat, lon, corner[:, 0], corner[:, 1]) - np.array(azimuths) - offset * np.array([3, 3, 5]) + 180) % 360 - 180
+        assert np.allclose(turn, 0, atol=1e-3)
+    # the bearing wraps through north without flipping the wedge
+    assert near_left[1, 1] < near_right[1, 1]
+    assert np.allclose(near_center, (near_left + near_right) / 2)
+    assert np.allclose(center, (near_left + near_right + far_left + far_right) / 4)
+    assert np.allclose(bearing(lat, lon, far_center[:, 0], far_center[:, 1]), azimuths, atol=1e-3)
+
+def test_single_lob_matches_the_batch(sensors):
+    coords = get_lob_coords(sensors[0], 45.0, 4.0, 300, 6000, center_line=True)
+    wedge = get_lob_wedges([sensors[0]], [45.0], [4.0], [300], [6000])
+    assert all(np.allclose(coord, points[0]) for coord, points in zip(coords[:7], wedge))
+    assert coords[7] == get_lob_center_line(sensors[0], 45.0, 6000).tolist()
+    assert get_lob_coords(sensors[0], 45.0, 4.0, 300, 6000)[7] == []
+
+def test_center_line_samples_every_interval(sensors):
+    line = get_lob_center_line(sensors[0], 90.0, 300, interval_m=100)
+    assert line.shape == (3, 2)
+    assert np.allclose(distance(*sensors[0], line[:, 0], line[:, 1]), [100, 200, 300])
+    assert np.allclose(bearing(*sensors[0], line[:, 0], line[:, 1]), 90.0, atol=0.01)
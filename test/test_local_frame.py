@@ -0,0 +1,46 @@
+import numpy as np
+from geodesy import destination, distance
+from local_frame import get_frame_for_coords, get_local_frame, LocalFrame
+
+def test_round_trip_and_origin(sensors, target):
+    frame = LocalFrame(target)
+    assert np.allclose(frame.to_local(target), [0, 0])
+    assert np.allclose(frame.to_geodetic([0, 0]), target)
+    xy = frame.to_local(sensors)
+    assert xy.shape == (3, 2)
+    assert np.allclose(frame.to_geodetic(xy), sensors, atol=1e-9)
+
+def test_offsets_are_in_meters(target):
+    frame = LocalFrame(target)
+    # points 20 km away: gnomonic radial scale error stays well under 0.01%
+    lat, lon = destination(target[0], target[1], np.arange(0, 360, 45.0), 20000.0)
+    xy = frame.to_local(np.stack([lat, lon], axis=-1))
+    assert np.allclose(np.hypot(xy[:, 0], xy[:, 1]), 20000.0, rtol=1e-4)
+    # due east and north of the origin lie on the frame axes
+    assert np.allclose(xy[[0, 2], [0, 1]], 0, atol=1e-6)
+    assert xy[2, 0] > 0 and xy[0, 1] > 0
+
+def test_great_circles_are_straight_lines(sensors, target):
+    frame = LocalFrame(target)
+    lat, lon = destination(sensors[0][0], sensors[0][1], 70.0, np.linspace(0, 30000, 7))
+    xy = frame.to_local(np.stack([lat, lon], axis=-1))
+    offsets = xy[1:] - xy[0]
+    cross = offsets[:, 0] * offsets[-1, 1] - offsets[:, 1] * offsets[-1, 0]
+    assert np.allclose(cross / np.hypot(*offsets[-1]), 0, atol=1e-3)
+
+def test_local_azimuth_follows_the_great_circle(sensors, target):
+    frame = LocalFrame(target)
+    # true north is the frame's north axis at the origin, and rotated away from it
+    assert np.allclose(frame.local_azimuth(target, [0.0, 90.0, 270.0]), [0, 90, 270], atol=1e-6)
+    heading = frame.local_azimuth(sensors[0], 45.0)
+    far = destination(sensors[0][0], sensors[0][1], 45.0, 15000.0)
+    offset = frame.to_local(np.array(far)) - frame.to_local(sensors[0])
+    assert np.isclose(heading, np.degrees(np.arctan2(offset[0], offset[1])) % 360, atol=1e-3)
+    assert not np.isclose(heading, 45.0, atol=1e-3)
+
+def test_frames_are_shared_by_origin(sensors):
+    frame = get_local_frame([35.3, -116.8])
+    assert get_local_frame([35.3 + 1e-9, -116.8]) is frame
+    center = get_frame_for_coords(sensors)
+    assert np.allclose(center.origin, [(35.22 + 35.38) / 2, (-116.90 + -116.72) / 2])
+    assert distance(*center.origin, *center.to_geodetic([0, 0])) < 1e-6
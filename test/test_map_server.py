@@ -0,0 +1,109 @@
+import http.client, os, threading
+import pytest
+from map_server import SimpleHTTPRequestHandler, ThreadPoolHTTPServer
+from tile_layers import DEFAULT_LAYER_NAME, TileLayer
+from tile_store import DirectoryTileStore
+
+TILE = b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * 16
+
+class NoSendfileConnection:
+    """Socket wrapper without sendfile (e.g. a TLS connection)"""
+    def __init__(self, connection):
+        self._connection = connection
+
+    def __getattr__(self, name):
+        if name == 'sendfile': raise AttributeError(name)
+        return getattr(self._connection, name)
+
+class BufferedHandler(SimpleHTTPRequestHandler):
+    def setup(self):
+        super().setup()
+        self.connection = NoSendfileConnection(self.connection)
+
+def serve(tmp_path, monkeypatch, handler_class):
+    DirectoryTileStore(str(tmp_path / 'tiles'), '.png').put_tile(3, 2, 1, TILE)
+    layer = TileLayer(DEFAULT_LAYER_NAME, str(tmp_path / 'tiles'), synthesize=False, prefetch=False, queue_missing=False)
+    monkeypatch.setattr(SimpleHTTPRequestHandler, 'layers', {layer.name: layer})
+    monkeypatch.setattr(SimpleHTTPRequestHandler, 'default_layer', layer)
+    sent_files = []
+    send_file = SimpleHTTPRequestHandler.send_file
+    def spy(self, file, size):
+        sent_files.append((hasattr(self.connection, 'sendfile'), size))
+        send_file(self, file, size)
+    monkeypatch.setattr(SimpleHTTPRequestHandler, 'send_file', spy)
+    httpd = ThreadPoolHTTPServer(('127.0.0.1', 0), handler_class, workers=2)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd, layer, sent_files
+
+@pytest.mark.parametrize('handler_class, uses_sendfile', [(SimpleHTTPRequestHandler, True), (BufferedHandler, False)])
+def test_first_request_streams_the_file(tmp_path, monkeypatch, handler_class, uses_sendfile):
+    httpd, layer, sent_files = serve(tmp_path, monkeypatch, handler_class)
+    connection = http.client.HTTPConnection('127.0.0.1', httpd.server_port, timeout=5)
+    try:
+        bodies = []
+        for _ in range(3):
+            connection.request('GET', '/3/2/1.png')
+            response = connection.getresponse()
+            assert response.status == 200 and response.getheader('Content-Type') == 'image/png'
+            assert int(response.getheader('Content-Length')) == len(TILE)
+            bodies.append(response.read())
+        assert bodies == [TILE] * 3
+        # first request: streamed from the file; second: read into the cache; third: served from memory
+        assert sent_files == [(uses_sendfile, len(TILE))]
+        assert layer.cache.stats()['entries'] == 1 and layer.cache.stats()['hits'] == 1
+    finally:
+        connection.close()
+        httpd.shutdown(); httpd.server_close()
+        layer.close()
+
+def test_tiles_too_large_to_cache_are_always_streamed(tmp_path, monkeypatch):
+    httpd, layer, sent_files = serve(tmp_path, monkeypatch, SimpleHTTPRequestHandler)
+    layer.cache.max_entry_bytes = 0
+    connection = http.client.HTTPConnection('127.0.0.1', httpd.server_port, timeout=5)
+    try:
+        for _ in range(2):
+            connection.request('GET', '/3/2/1.png')
+            assert connection.getresponse().read() == TILE
+        assert len(sent_files) == 2 and layer.cache.stats()['entries'] == 0
+    finally:
+        connection.close()
+        httpd.shutdown(); httpd.server_close()
+        layer.close()
+
+def test_conditional_requests_get_304_until_the_tile_changes(tmp_path, monkeypatch):
+    httpd, layer, sent_files = serve(tmp_path, monkeypatch, SimpleHTTPRequestHandler)
+    connection = http.client.HTTPConnection('127.0.0.1', httpd.server_port, timeout=5)
+    def get(headers, method='GET'):
+        connection.request(method, '/3/2/1.png', headers=headers)
+        response = connection.getresponse()
+        return response, response.read()
+    try:
+        response, body = get({})
+        etag = response.getheader('ETag'); last_modified = response.getheader('Last-Modified')
+        assert response.status == 200 and body == TILE
+        assert etag and last_modified and 'max-age' in response.getheader('Cache-Control')
+        for headers in ({'If-None-Match': etag}, {'If-None-Match': f'"other", W/{etag}'}, {'If-None-Match': '*'},
+                        {'If-Modified-Since': last_modified}, {'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'}):
+            response, body = get(headers)
+            assert response.status == 304 and body == b''
+            assert response.getheader('ETag') == etag and response.getheader('Last-Modified') == last_modified
+        # If-None-Match takes precedence; older or invalid dates get the tile
+        for headers in ({'If-None-Match': '"other"', 'If-Modified-Since': last_modified},
+                        {'If-Modified-Since': 'Thu, 01 Jan 1970 00:00:00 GMT'}, {'If-Modified-Since': 'yesterday'}):
+            response, body = get(headers)
+            assert response.status == 200 and body == TILE
+        response, body = get({}, method='HEAD')
+        assert response.status == 200 and body == b'' and response.getheader('ETag') == etag
+        # a replaced tile gets new validators (revalidated against the store)
+        layer.cache.revalidate_sec = 0
+        file_path = layer.store.tile_path(3, 2, 1)
+        with open(file_path, 'wb') as file: file.write(TILE[::-1])
+        os.utime(file_path, ns=(0, 2_000_000_000_000_000_000))
+        response, body = get({'If-None-Match': etag, 'If-Modified-Since': last_modified})
+        assert response.status == 200 and body == TILE[::-1] and response.getheader('ETag') != etag
+        response, body = get({'If-Modified-Since': last_modified})
+        assert response.status == 200 and body == TILE[::-1]
+    finally:
+        connection.close()
+        httpd.shutdown(); httpd.server_close()
+        layer.close()
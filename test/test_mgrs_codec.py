@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+mgrs_codec = pytest.importorskip('mgrs_codec')
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    mgrs_codec.clear_cache()
+    yield
+    mgrs_codec.clear_cache()
+
+def test_round_trip_within_a_meter(sensors):
+    for coord in sensors:
+        grid = mgrs_codec.coords_to_mgrs(coord)
+        assert grid.startswith('11S') and len(grid) == 15
+        decoded = mgrs_codec.mgrs_to_coords(grid)
+        assert np.allclose(decoded, coord, atol=2e-5)
+        # spaced grids decode to the same coordinate
+        spaced = f'{grid[:3]} {grid[3:5]} {grid[5:10]} {grid[10:]}'
+        assert mgrs_codec.mgrs_to_coords(spaced) == decoded
+
+def test_repeated_conversions_hit_the_cache(target):
+    grid = mgrs_codec.coords_to_mgrs(target)
+    # sub-centimeter differences share a cache key
+    assert mgrs_codec.coords_to_mgrs([target[0] + 1e-9, target[1]]) == grid
+    mgrs_codec.mgrs_to_coords(grid); mgrs_codec.mgrs_to_coords(grid)
+    info = mgrs_codec.cache_info()
+    assert (info['encode']['misses'], info['encode']['hits']) == (1, 1)
+    assert (info['decode']['misses'], info['decode']['hits']) == (1, 1)
+    # precision is part of the key
+    assert len(mgrs_codec.coords_to_mgrs(target, precision=3)) == 11
+    assert mgrs_codec.cache_info()['encode']['misses'] == 2
+
+def test_batches_match_single_conversions_and_convert_duplicates_once(sensors):
+    coords = [sensors[2], sensors[0], sensors[2], sensors[1], sensors[0]]
+    grids = mgrs_codec.coords_to_mgrs_batch(coords)
+    assert mgrs_codec.cache_info()['encode']['misses'] == 3
+    assert grids == [mgrs_codec.coords_to_mgrs(coord) for coord in coords]
+    decoded = mgrs_codec.mgrs_to_coords_batch(grids)
+    assert mgrs_codec.cache_info()['decode']['misses'] == 3
+    assert decoded.shape == (5, 2)
+    assert np.allclose(decoded, coords, atol=2e-5)
+    assert mgrs_codec.coords_to_mgrs_batch(np.empty((0, 2))) == []
+    assert mgrs_codec.mgrs_to_coords_batch([]).shape == (0, 2)
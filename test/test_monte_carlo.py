@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from geodesy import distance
+from monte_carlo import estimate_uncertainty
+
+def test_fix_uncertainty_is_centered_on_the_target(get_reports, params, target):
+    estimate = estimate_uncertainty(get_reports(), params, num_samples=20000, max_workers=1, seed=1)
+    assert distance(*estimate.target_coord, *target) < 50
+    assert 0 < estimate.cep50_m < estimate.cep90_m
+    assert estimate.ellipse['semi_major_m'][0.9] > estimate.ellipse['semi_minor_m'][0.9]
+
+def test_fix_ignores_erp_error_unless_range_is_enforced(get_reports, params):
+    low = estimate_uncertainty(get_reports(), params, num_samples=5000, erp_error_dB=0.1, max_workers=1, seed=2)
+    high = estimate_uncertainty(get_reports(), params, num_samples=5000, erp_error_dB=10, max_workers=1, seed=2)
+    assert np.isclose(low.cep50_m, high.cep50_m) and low.num_valid == high.num_valid
+    low = estimate_uncertainty(get_reports(), params, num_samples=5000, erp_error_dB=0.1, enforce_range=True, max_workers=1, seed=2)
+    high = estimate_uncertainty(get_reports(), params, num_samples=5000, erp_error_dB=10, enforce_range=True, max_workers=1, seed=2)
+    assert low.num_valid != high.num_valid
+
+def test_seeded_estimates_are_reproducible_across_workers(get_reports, params):
+    one = estimate_uncertainty(get_reports(), params, num_samples=8000, batch_size=2000, max_workers=1, seed=3)
+    two = estimate_uncertainty(get_reports(), params, num_samples=8000, batch_size=2000, max_workers=2, seed=3)
+    assert np.isclose(one.cep90_m, two.cep90_m)
+
+def test_sample_counts_must_be_positive(get_reports, params):
+    with pytest.raises(ValueError, match='num_samples'):
+        estimate_uncertainty(get_reports(), params, num_samples=0, max_workers=1)
+    with pytest.raises(ValueError, match='batch_size'):
+        estimate_uncertainty(get_reports(), params, num_samples=10, batch_size=0, max_workers=1)
+
+def test_no_valid_samples_is_unavailable(get_reports, params, sensors):
+    reports = get_reports(sensors[:2], error_deg=0.1)
+    # LOBs pointing away from each other never intersect ahead of both sensors
+    reports[1].azimuth = (reports[1].azimuth + 180) % 360
+    assert estimate_uncertainty(reports, params, num_samples=5000, batch_size=1000, max_workers=1, seed=4) is None
@@ -0,0 +1,37 @@
+import numpy as np
+from geodesy import destination
+from polygon_clipping import (SQ_METERS_PER_ACRE, as_ccw_polygon, clip_convex_polygon, get_polygon_area_and_centroid,
+                              get_polygon_area_and_centroid_m, get_wedge_intersection_m, intersect_convex_polygons)
+
+SQUARE = np.array([[0, 0], [2, 0], [2, 2], [0, 2]], dtype=float)
+
+def test_clockwise_rings_are_reversed():
+    clockwise = SQUARE[::-1]
+    assert np.array_equal(as_ccw_polygon(clockwise), SQUARE)
+    assert np.array_equal(as_ccw_polygon(SQUARE), SQUARE)
+
+def test_overlapping_squares():
+    intersection = clip_convex_polygon(SQUARE, SQUARE + 1)
+    area, centroid = get_polygon_area_and_centroid_m(intersection)
+    assert np.isclose(area, 1.0)
+    assert np.allclose(centroid, [1.5, 1.5])
+
+def test_disjoint_polygons_do_not_overlap():
+    assert len(clip_convex_polygon(SQUARE, SQUARE + 5)) < 3
+    assert get_wedge_intersection_m([SQUARE, SQUARE + 5]) == (None, 0.0, None)
+
+def test_common_area_of_many_polygons():
+    triangle = np.array([[0, 0], [4, 0], [0, 4]], dtype=float)
+    intersection = intersect_convex_polygons([SQUARE, SQUARE + 0.5, triangle])
+    polygon, area, centroid = get_wedge_intersection_m([SQUARE, SQUARE + 0.5, triangle])
+    assert np.isclose(area, get_polygon_area_and_centroid_m(intersection)[0])
+    assert np.isclose(area, 2.25)
+
+def test_geodetic_area_in_acres():
+    # 1 km x 1 km square built from great-circle offsets
+    lat0, lon0 = 35.3, -116.8
+    north = destination(lat0, lon0, 0, 1000.0); east = destination(lat0, lon0, 90, 1000.0)
+    square = [[lat0, lon0], [lat0, float(east[1])], [float(north[0]), float(east[1])], [float(north[0]), lon0]]
+    acres, centroid = get_polygon_area_and_centroid(square)
+    assert np.isclose(acres, 1e6 / SQ_METERS_PER_ACRE, rtol=1e-3)
+    assert np.allclose(centroid, [(lat0 + float(north[0])) / 2, (lon0 + float(east[1])) / 2], atol=1e-5)
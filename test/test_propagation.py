@@ -0,0 +1,19 @@
+import numpy as np
+from propagation import convert_watts_to_dBm, emission_distance, range_bounds
+
+def test_watts_to_dBm():
+    assert np.allclose(convert_watts_to_dBm([0.001, 1, 10]), [0, 30, 40])
+
+def test_free_space_distance():
+    # 1 W at 100 MHz, 0 dBi antennas, -60 dBm received: 10 ** ((30 - 32.4 - 40 + 60) / 20) km
+    assert np.isclose(emission_distance(1, 100, 0, 0, -60, path_loss_coeff=2), 10 ** (17.6 / 20))
+
+def test_range_bounds_match_emission_distance():
+    erp = np.array([0.1, 1, 5, 50])
+    frequency = np.array([[30.0], [150.0], [2400.0]])
+    coeff = np.array([[[2]], [[3.5]], [[5]]])
+    min_km, max_km = range_bounds(erp, erp * 10, frequency, 2, 3, -75, path_loss_coeff=coeff)
+    assert min_km.shape == (3, 3, 4)
+    assert np.allclose(min_km, emission_distance(erp, frequency, 2, 3, -75, coeff))
+    assert np.allclose(max_km, emission_distance(erp * 10, frequency, 2, 3, -75, coeff))
+    assert np.all(max_km > min_km)
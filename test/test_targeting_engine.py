@@ -0,0 +1,49 @@
+import numpy as np
+from geodesy import bearing, distance
+from targeting_engine import solve, solve_batch
+
+def test_no_reports(params):
+    solution = solve([], params)
+    assert solution.target_class == '' and solution.lobs == []
+
+def test_single_lob(get_reports, params, sensors):
+    solution = solve(get_reports(sensors[:1]), params)
+    assert solution.target_class == 'LOB'
+    lob = solution.lobs[0]
+    assert lob.label == 'EWT 1' and lob.plot_target
+    assert lob.min_distance_m < lob.distance_m < lob.max_distance_m
+    # the LOB target lies on the bearing to the emitter
+    assert np.isclose(float(bearing(*lob.sensor_coord, *lob.target_coord)), lob.azimuth, atol=0.01)
+    assert lob.error_acres > 0
+
+def test_cut_of_two_lobs(get_reports, params, sensors, target):
+    solution = solve(get_reports(sensors[:2]), params)
+    assert solution.target_class == 'CUT'
+    cut = solution.cuts[0]
+    assert cut.sensors == (0, 1)
+    assert distance(*cut.target_coord, *target) < 300
+    assert not any(lob.plot_target for lob in solution.lobs)
+    assert 0 < cut.error_acres < solution.lobs[0].error_acres
+
+def test_fix_of_three_lobs(get_reports, params, target):
+    solution = solve(get_reports(), params)
+    assert solution.target_class == 'FIX'
+    assert len(solution.cuts) == 3
+    assert distance(*solution.target_coord, *target) < 300
+    assert distance(*solution.fix.least_squares['coord'], *target) < 1
+    # the FIX is the common area of every wedge: no larger than any CUT
+    assert solution.error_acres <= min(cut.error_acres for cut in solution.cuts)
+    assert set(solution.sensor_distances_m) == {0, 1, 2}
+
+def test_diverging_lobs_do_not_cut(get_reports, params, sensors):
+    reports = get_reports(sensors[:2])
+    # point the second LOB away from the first
+    reports[1].azimuth = (reports[1].azimuth + 180) % 360
+    solution = solve(reports, params)
+    assert solution.target_class == 'LOB' and solution.cuts == []
+
+def test_solve_batch_matches_solve(get_reports, params, sensors):
+    report_sets = [get_reports(sensors[:1]), get_reports(sensors[:2]), get_reports()]
+    solutions = solve_batch(report_sets, params)
+    assert [s.target_class for s in solutions] == ['LOB', 'CUT', 'FIX']
+    assert np.allclose(solutions[2].target_coord, solve(report_sets[2], params).target_coord)
@@ -0,0 +1,58 @@
+import asyncio, time
+from tile_fetch import FetchEngine, TokenBucket
+
+def test_token_bucket_rate():
+    bucket = TokenBucket(rate=100, capacity=1)
+
+    async def take(num_tokens):
+        t1 = time.monotonic()
+        for _ in range(num_tokens): await bucket.acquire()
+        return time.monotonic() - t1
+
+    # one token up front, then 100 per second
+    assert 0.18 < asyncio.run(take(21)) < 0.5
+
+def test_token_bucket_debt():
+    bucket = TokenBucket(rate=1000, capacity=1000)
+    bucket.consume(1100)
+
+    async def wait():
+        t1 = time.monotonic()
+        await bucket.wait_for_credit()
+        return time.monotonic() - t1
+
+    assert 0.05 < asyncio.run(wait()) < 0.4
+
+def test_fetch_many_downloads_skips_and_fails(tile_server):
+    engine = FetchEngine(requests_per_sec=None, per_host=4)
+    written = {}
+    done = []
+
+    def make_request(i):
+        if i % 5 == 0: return None
+        prefix = '/404' if i % 7 == 0 else ''
+        return f'{tile_server.url}{prefix}/tile/{i}', lambda data, i=i: written.setdefault(i, data)
+
+    results = engine.run(range(30), make_request, window=8, on_done=lambda i, error: done.append((i, error)))
+    engine.close()
+    assert results['skipped'] == 6
+    assert results['failed'] == 4
+    assert results['downloaded'] == 20
+    assert written[1] == b'/tile/1'
+    assert sorted(i for i, _ in done) == list(range(30))
+    assert sorted(i for i, _ in results['errors']) == [7, 14, 21, 28]
+
+def test_request_rate_limit(tile_server):
+    engine = FetchEngine(requests_per_sec=50, per_host=8)
+    t1 = time.monotonic()
+    engine.run(range(60), lambda i: (f'{tile_server.url}/tile/{i}', None))
+    elapsed = time.monotonic() - t1
+    engine.close()
+    # one second of burst budget, then 50 requests per second
+    assert elapsed > 0.15
+    assert engine.stats()['requests'] == 60
+
+def test_submit_from_caller_thread(tile_server):
+    engine = FetchEngine(requests_per_sec=None)
+    assert engine.submit(f'{tile_server.url}/tile/a').result(timeout=5) == b'/tile/a'
+    engine.close()
@@ -0,0 +1,41 @@
+import json
+import pytest
+import tile_layers
+from tile_layers import DEFAULT_LAYER_NAME, get_layers
+from tile_queue import TileQueue
+
+@pytest.fixture(autouse=True)
+def temporary_queue(tmp_path, monkeypatch):
+    # never touch the app's queue database
+    monkeypatch.setattr(tile_layers, 'get_tile_queue', lambda: TileQueue(str(tmp_path / 'queue.db')))
+
+def write_layer_file(tmp_path, layers):
+    path = tmp_path / 'layers.json'
+    path.write_text(json.dumps({'layers': layers}))
+    return str(path)
+
+def test_single_location_is_the_default_layer(tmp_path):
+    layers = get_layers(str(tmp_path / 'tiles.mbtiles'), prefetch=False)
+    assert [layer.name for layer in layers] == [DEFAULT_LAYER_NAME]
+    assert layers[0].tile_queue is not None
+    for layer in layers: layer.close()
+
+def test_json_layers_split_the_cache_budget(tmp_path):
+    spec = write_layer_file(tmp_path, [{'name': 'imagery', 'path': 'imagery', 'queue_missing': False},
+                                       {'name': 'topo', 'path': 'topo.mbtiles', 'cache_mb': 64},
+                                       {'name': 'roads', 'path': 'roads'}])
+    layers = get_layers(spec, cache_mb=256, prefetch=False)
+    assert [layer.cache_mb for layer in layers] == [96, 64, 96]
+    assert all(layer.tile_queue is None for layer in layers)
+    for layer in layers: layer.close()
+
+def test_only_the_default_layer_queues_missing_tiles(tmp_path):
+    spec = write_layer_file(tmp_path, [{'name': 'imagery', 'path': 'imagery'},
+                                       {'name': 'topo', 'path': 'topo.mbtiles', 'queue_missing': True}])
+    with pytest.raises(ValueError, match='topo'):
+        get_layers(spec, prefetch=False)
+
+@pytest.mark.parametrize('name', ['12', 'metrics', 'a/b'])
+def test_invalid_layer_names(tmp_path, name):
+    with pytest.raises(ValueError):
+        get_layers(f'{name}={tmp_path}', prefetch=False)
@@ -0,0 +1,57 @@
+import json
+import pytest
+from tile_metrics import ServerMetrics
+
+@pytest.fixture
+def metrics():
+    metrics = ServerMetrics(buckets=(0.001, 0.01, 0.1))
+    for duration in (0.0005, 0.002, 0.003, 0.05, 2.0):
+        metrics.record(200, duration, 100, zoom=12, source='cache')
+    metrics.record(404, 0.0002, zoom=15); metrics.record(404, 0.0003, zoom=15); metrics.record(404, 0.0004, zoom=9)
+    metrics.record(304, 0.0001, source='store')
+    return metrics
+
+LAYERS = {'imagery': {'cache': {'hits': 7, 'misses': 3, 'hit_ratio': 0.7, 'bytes': 4096}, 'prefetch': {'queued': 2, 'state': 'idle'}},
+          'topo': {'cache': {'hits': 1, 'misses': 0, 'hit_ratio': 1.0, 'bytes': 512}}}
+
+def test_prometheus_histogram_is_cumulative(metrics):
+    lines = metrics.to_prometheus().splitlines()
+    buckets = [line for line in lines if line.startswith('tile_request_duration_seconds_bucket{status="200"')]
+    assert buckets == ['tile_request_duration_seconds_bucket{status="200",le="0.001"} 1',
+                       'tile_request_duration_seconds_bucket{status="200",le="0.01"} 3',
+                       'tile_request_duration_seconds_bucket{status="200",le="0.1"} 4',
+                       'tile_request_duration_seconds_bucket{status="200",le="+Inf"} 5']
+    assert 'tile_request_duration_seconds_sum{status="200"} 2.055500' in lines
+    assert 'tile_request_duration_seconds_count{status="404"} 3' in lines
+    assert 'tile_bytes_served_total 500' in lines
+    assert ['tile_not_found_total{zoom="9"} 1', 'tile_not_found_total{zoom="15"} 2'] == [line for line in lines if line.startswith('tile_not_found_total{')]
+    assert 'tile_responses_total{source="cache"} 5' in lines and 'tile_responses_total{source="store"} 1' in lines
+    # the queue gauge is only exported when the backlog is known
+    assert not any(line.startswith('tile_queue_backlog') for line in lines)
+    assert 'tile_queue_backlog 42' in metrics.to_prometheus(queue_backlog=42).splitlines()
+
+def test_prometheus_layer_families(metrics):
+    text = metrics.to_prometheus(LAYERS)
+    assert text.endswith('\n')
+    lines = text.splitlines()
+    # one TYPE line per family, followed by a sample per layer
+    start = lines.index('# TYPE tile_cache_hits_total counter')
+    assert lines[start + 1:start + 3] == ['tile_cache_hits_total{layer="imagery"} 7', 'tile_cache_hits_total{layer="topo"} 1']
+    assert '# TYPE tile_cache_hit_ratio gauge' in lines and 'tile_cache_bytes{layer="topo"} 512' in lines
+    assert 'tile_prefetch_queued_total{layer="imagery"} 2' in lines
+    assert not any('state' in line for line in lines)
+    assert sum(line.startswith('# TYPE tile_cache_hits_total') for line in lines) == 1
+
+def test_json_stats(metrics):
+    stats = json.loads(metrics.to_json(LAYERS, queue_backlog=5))
+    assert sorted(stats['requests']) == ['200', '304', '404']
+    ok = stats['requests']['200']
+    assert ok['count'] == 5 and ok['mean_ms'] == pytest.approx(411.1)
+    # quantiles interpolate within the histogram buckets
+    assert 1 <= ok['p50_ms'] <= 10 and ok['p50_ms'] <= ok['p90_ms'] <= ok['p99_ms'] <= 100
+    assert stats['not_found_by_zoom'] == {'9': 1, '15': 2}
+    assert stats['responses_by_source'] == {'cache': 5, 'store': 1}
+    assert stats['bytes_served'] == 500 and stats['queue_backlog'] == 5
+    assert stats['layers'] == LAYERS and stats['uptime_sec'] >= 0
+    empty = ServerMetrics().stats()
+    assert empty['requests'] == {} and empty['layers'] == {} and empty['queue_backlog'] is None
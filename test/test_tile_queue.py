@@ -0,0 +1,104 @@
+import csv, sqlite3, threading
+import pytest
+from tile_queue import TileQueue
+
+def test_put_deduplicates_recent_tiles(tmp_path):
+    queue = TileQueue(str(tmp_path / 'queue.db'))
+    assert queue.put(3, 1, 2)
+    assert not queue.put('3', '1', '2')
+    assert len(queue) == 1
+    queue.close()
+
+def test_dedup_window_evicts_oldest_tiles_only(tmp_path):
+    queue = TileQueue(str(tmp_path / 'queue.db'), max_tracked=3)
+    for x in range(3): assert queue.put(5, x, 0)
+    # a fourth tile evicts only the oldest one
+    assert queue.put(5, 3, 0)
+    assert len(queue._recent) == 3
+    assert ('', 5, 0, 0) not in queue._recent
+    for x in (1, 2, 3): assert not queue.put(5, x, 0)
+    queue.close()
+
+def test_batches_done_and_fail(tmp_path):
+    queue = TileQueue(str(tmp_path / 'queue.db'), max_attempts=2)
+    queue.put_many([(1, 0, 0), (1, 1, 0), (1, 0, 1)])
+    batch = queue.get_batch(2)
+    assert batch == [(1, 0, 0), (1, 1, 0)]
+    queue.done([batch[0]])
+    queue.fail([batch[1]])
+    # tiles that failed fewer times come first
+    assert queue.get_batch(10) == [(1, 0, 1), (1, 1, 0)]
+    queue.fail([(1, 1, 0)])
+    assert queue.get_batch(10) == [(1, 0, 1)]
+    queue.close()
+
+def test_import_legacy_csv(tmp_path):
+    csv_path = tmp_path / 'dynamic_tile_queue.csv'
+    with open(csv_path, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Z', 'Y', 'X'])
+        writer.writerow(['4', '6', '5'])
+        writer.writerow(['bad', '', ''])
+    queue = TileQueue(str(tmp_path / 'queue.db'))
+    assert queue.import_csv(str(csv_path)) == 1
+    assert queue.get_batch() == [(4, 5, 6)]
+    assert not csv_path.exists()
+    queue.close()
+
+def test_close_closes_every_thread_connection(tmp_path):
+    queue = TileQueue(str(tmp_path / 'queue.db'))
+    threads = [threading.Thread(target=queue.put, args=(2, x, 0)) for x in range(3)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    connections = list(queue._connections)
+    assert len(connections) == 4
+    queue.close()
+    for connection in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute('SELECT 1')
+    # usable again after close
+    assert len(queue) == 3
+    queue.close()
+
+def test_failed_insert_is_not_suppressed(tmp_path):
+    queue = TileQueue(str(tmp_path / 'queue.db'))
+    locker = sqlite3.connect(str(tmp_path / 'queue.db'), timeout=0)
+    locker.execute('BEGIN EXCLUSIVE')
+    queue._connection().execute('PRAGMA busy_timeout=0')
+    with pytest.raises(sqlite3.OperationalError):
+        queue.put(7, 1, 1)
+    locker.rollback(); locker.close()
+    # the tile never reached the database, so the next miss queues it
+    assert queue.put(7, 1, 1)
+    assert len(queue) == 1
+    queue.close()
+
+def test_tiles_are_queued_per_store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    queue = TileQueue(str(tmp_path / 'queue.db'))
+    mbtiles = str(tmp_path / 'imagery.mbtiles')
+    assert queue.put(3, 1, 2)
+    assert queue.put(3, 1, 2, store=mbtiles)
+    queue.put_many([(4, 0, 0)], store='imagery.mbtiles')
+    # relative and absolute locations of one store are the same store
+    assert queue.stores() == ['', mbtiles]
+    assert queue.get_batch(10, mbtiles) == [(3, 1, 2), (4, 0, 0)]
+    queue.done([(3, 1, 2)], mbtiles)
+    assert queue.get_batch(10) == [(3, 1, 2)]
+    assert queue.get_batch(10, mbtiles) == [(4, 0, 0)]
+    queue.close()
+
+def test_queue_without_stores_is_migrated(tmp_path):
+    path = str(tmp_path / 'queue.db')
+    connection = sqlite3.connect(path)
+    connection.execute('''CREATE TABLE queue (z INTEGER, x INTEGER, y INTEGER, enqueued_ns INTEGER,
+                                              attempts INTEGER DEFAULT 0, PRIMARY KEY (z, x, y))''')
+    connection.execute('INSERT INTO queue VALUES (5, 6, 7, 1, 2)')
+    connection.commit(); connection.close()
+    queue = TileQueue(path)
+    # queued tiles belong to the default store and keep their attempts
+    assert queue.stores() == ['']
+    assert queue.get_batch() == [(5, 6, 7)]
+    queue.fail([(5, 6, 7)])
+    assert len(queue) == 0
+    queue.close()
@@ -0,0 +1,101 @@
+import sqlite3, threading
+from tile_store import DirectoryTileStore, MBTilesTileStore, migrate_tiles, open_tile_store
+
+def make_standard_mbtiles(path):
+    # the 4-column schema of the MBTiles spec
+    connection = sqlite3.connect(path)
+    connection.executescript('''
+        CREATE TABLE metadata (name TEXT, value TEXT);
+        CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB);
+        CREATE UNIQUE INDEX tile_index ON tiles (zoom_level, tile_column, tile_row);
+    ''')
+    # z=3, x=2, TMS row 1 is XYZ y=6
+    connection.execute('INSERT INTO tiles VALUES (3, 2, 1, ?)', (b'standard',))
+    connection.commit()
+    connection.close()
+
+def test_directory_round_trip(tmp_path):
+    store = DirectoryTileStore(str(tmp_path), '.png')
+    assert not store.has_tile(4, 5, 6)
+    store.put_tile(4, 5, 6, b'tile')
+    data, version = store.get_tile(4, 5, 6)
+    assert data == b'tile' and version == store.tile_version(4, 5, 6)
+    assert store.tile_path(4, 5, 6).endswith('6.png')
+    assert list(store.iter_tiles()) == [(4, 5, 6, b'tile')]
+
+def test_mbtiles_round_trip_flips_rows(tmp_path):
+    path = str(tmp_path / 'tiles.mbtiles')
+    store = open_tile_store(path)
+    assert isinstance(store, MBTilesTileStore)
+    store.put_tile(3, 2, 6, b'tile')
+    assert store.get_tile(3, 2, 6)[0] == b'tile'
+    store.close()
+    # stored in the TMS row
+    row = sqlite3.connect(path).execute('SELECT tile_row FROM tiles WHERE zoom_level=3 AND tile_column=2').fetchone()
+    assert row == (1,)
+
+def test_mbtiles_standard_schema(tmp_path):
+    path = str(tmp_path / 'topo.mbtiles')
+    make_standard_mbtiles(path)
+    store = open_tile_store(path)
+    assert store.has_tile(3, 2, 6)
+    assert store.get_tile(3, 2, 6)[0] == b'standard'
+    assert store.tile_version(3, 2, 6) is not None
+    store.put_tile(3, 2, 5, b'new')
+    assert store.get_tile(3, 2, 5)[0] == b'new'
+    assert store.tile_version(3, 2, 5) > 0
+    # overwrite keeps one row per tile
+    store.put_tile(3, 2, 5, b'newer')
+    assert store.get_tile(3, 2, 5)[0] == b'newer'
+    assert store.count_stored(3, 0, 0, 7, 7) == 2
+    store.close()
+
+def test_mbtiles_tiles_view_is_readable(tmp_path):
+    path = str(tmp_path / 'view.mbtiles')
+    connection = sqlite3.connect(path)
+    connection.executescript('''
+        CREATE TABLE map (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_id TEXT);
+        CREATE TABLE images (tile_id TEXT, tile_data BLOB);
+        CREATE VIEW tiles AS SELECT zoom_level, tile_column, tile_row, tile_data FROM map JOIN images USING (tile_id);
+        INSERT INTO map VALUES (0, 0, 0, 'a');
+        INSERT INTO images VALUES ('a', x'01');
+    ''')
+    connection.commit()
+    connection.close()
+    store = open_tile_store(path)
+    assert store.get_tile(0, 0, 0)[0] == b'\x01'
+    assert store.tile_version(0, 0, 0) > 0
+    assert store.tile_version(1, 0, 0) is None
+    store.close()
+
+def test_mbtiles_close_closes_every_thread_connection(tmp_path):
+    store = open_tile_store(str(tmp_path / 'tiles.mbtiles'))
+    store.put_tile(0, 0, 0, b'tile')
+    threads = [threading.Thread(target=store.get_tile, args=(0, 0, 0)) for _ in range(3)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    connections = list(store._connections)
+    assert len(connections) == 4
+    store.close()
+    for connection in connections:
+        try:
+            connection.execute('SELECT 1')
+        except sqlite3.ProgrammingError:
+            continue
+        raise AssertionError('connection left open')
+    # usable again after close
+    assert store.get_tile(0, 0, 0)[0] == b'tile'
+    store.close()
+
+def test_count_stored_matches_has_tile(tmp_path):
+    directory = DirectoryTileStore(str(tmp_path / 'tiles'), '.png')
+    tiles = [(5, x, y, b'%d' % (x * y)) for x in range(3, 9) for y in range(10, 14) if (x + y) % 3]
+    directory.put_tiles(tiles)
+    mbtiles = MBTilesTileStore(str(tmp_path / 'tiles.mbtiles'))
+    assert migrate_tiles(directory, mbtiles) == len(tiles)
+    for store in (directory, mbtiles):
+        for tile_range in ((4, 10, 7, 12), (0, 0, 31, 31), (8, 13, 8, 13)):
+            x_min, y_min, x_max, y_max = tile_range
+            expected = sum(store.has_tile(5, x, y) for x in range(x_min, x_max + 1) for y in range(y_min, y_max + 1))
+            assert store.count_stored(5, *tile_range) == expected
+    mbtiles.close()
@@ -0,0 +1,44 @@
+import io
+import pytest
+from tile_store import DirectoryTileStore
+from tile_synthesis import MAX_OVERZOOM_LEVELS, overzoom_tile, synthesize_tile
+
+Image = pytest.importorskip('PIL.Image')
+
+def make_tile(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (256, 256), color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+class CountingStore(DirectoryTileStore):
+    def __init__(self, root):
+        super().__init__(root, '.png')
+        self.lookups = 0
+
+    def get_tile(self, z, x, y):
+        self.lookups += 1
+        return super().get_tile(z, x, y)
+
+def test_overzoom_uses_the_nearest_ancestor(tmp_path):
+    store = CountingStore(str(tmp_path))
+    store.put_tile(4, 3, 5, make_tile('red'))
+    content, content_type, method = synthesize_tile(store, 6, 12, 21)
+    assert method == 'overzoom' and content_type == 'image/jpeg'
+    assert Image.open(io.BytesIO(content)).size == (256, 256)
+
+def test_overzoom_search_is_capped(tmp_path):
+    store = CountingStore(str(tmp_path))
+    store.put_tile(2, 1, 1, make_tile('blue'))
+    # 8 levels up is found, 9 levels up is not searched
+    assert overzoom_tile(store, 2 + MAX_OVERZOOM_LEVELS, 1 << MAX_OVERZOOM_LEVELS, 1 << MAX_OVERZOOM_LEVELS) is not None
+    store.lookups = 0
+    assert overzoom_tile(store, 3 + MAX_OVERZOOM_LEVELS, 2 << MAX_OVERZOOM_LEVELS, 2 << MAX_OVERZOOM_LEVELS) is None
+    assert store.lookups == MAX_OVERZOOM_LEVELS == 8
+
+def test_underzoom_mosaics_four_children(tmp_path):
+    store = CountingStore(str(tmp_path))
+    for dx in (0, 1):
+        for dy in (0, 1): store.put_tile(5, 2 + dx, 4 + dy, make_tile((0, 200, 0)))
+    content, _, method = synthesize_tile(store, 4, 1, 2)
+    assert method == 'underzoom'
+    assert abs(Image.open(io.BytesIO(content)).getpixel((128, 128))[1] - 200) < 5